@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trwały katalog plików (SQLite) dla folderów input/, mockup/ i output/
+
+Każdy plik ma w katalogu wiersz: ścieżkę względną, klucz dopasowania (nazwa
+bazowa małymi literami - reguła z asset_index.py), rozmiar, mtime, wymiary
+obrazu z nagłówka i - na żądanie - skrót SHA-256 zawartości.
+
+refresh() przechodzi folder przez os.scandir i porównuje rozmiar i mtime
+z katalogiem: nagłówki i skróty są czytane tylko dla plików nowych lub
+zmienionych, a wiersze plików, których już nie ma, są usuwane. Na folderach
+sieciowych kolejne przebiegi kosztują więc jeden listing zamiast ponownego
+otwierania tysięcy plików.
+
+Z katalogu korzystają check_files_existence.py, check_file_completeness.py,
+plan_jobs.py, render_mockups.py i convert to webp/converter_clean.py
+(folder_index() zwraca zwykły asset_index.FolderIndex). Generatory JSX nie
+czytają SQLite - dostają rozwiązane ścieżki przez jobs.json z plan_jobs.py.
+
+    python3 asset_catalog.py                   # odśwież input/, mockup/, output/
+    python3 asset_catalog.py input --hash      # z odświeżeniem skrótów
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from asset_index import FolderIndex
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+catalog_file = project_folder / ".cache" / "asset_catalog.sqlite"
+default_folders = [project_folder / "input", project_folder / "mockup", project_folder / "output"]
+
+SCHEMA_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+# Rozszerzenia, dla których wymiary są czytane z nagłówka (bez dekodowania pikseli)
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".psd", ".psb", ".tif", ".tiff", ".webp"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    folder   TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash     TEXT,
+    width    INTEGER,
+    height   INTEGER,
+    PRIMARY KEY (folder, name)
+);
+CREATE INDEX IF NOT EXISTS assets_key ON assets (folder, key);
+CREATE TABLE IF NOT EXISTS folders (
+    folder       TEXT PRIMARY KEY,
+    refreshed_at TEXT NOT NULL
+);
+"""
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def header_dimensions(path):
+    """(szerokość, wysokość) z nagłówka obrazu albo (None, None)"""
+    if Path(path).suffix.lower() not in IMAGE_SUFFIXES:
+        return None, None
+    try:
+        # Image.open czyta tylko nagłówek; piksele są dekodowane dopiero przy load()
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _scan(folder, recursive):
+    """Zwraca {ścieżka względna (posix): os.stat_result} plików folderu (bez ukrytych)"""
+    found = {}
+    pending = [("", folder)]
+    while pending:
+        prefix, directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_file():
+                        found[prefix + entry.name] = entry.stat()
+                    elif recursive and entry.is_dir():
+                        pending.append((f"{prefix}{entry.name}/", entry.path))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return found
+
+
+class AssetCatalog:
+    """Katalog plików w bazie SQLite (jedna baza na projekt, wiele folderów)"""
+
+    def __init__(self, path=catalog_file):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS assets; DROP TABLE IF EXISTS folders;")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _folder_key(folder):
+        return str(Path(folder).resolve())
+
+    def refresh(self, folder, recursive=False, hashes=False):
+        """
+        Uzgadnia katalog z zawartością folderu. Nagłówki (i skróty, z hashes)
+        są czytane tylko dla nowych i zmienionych plików; z hashes uzupełniane
+        są też brakujące skróty. Zwraca statystyki {files, added, updated, removed, hashed}.
+        """
+        folder_key = self._folder_key(folder)
+        known = {
+            name: (size, mtime_ns, file_digest)
+            for name, size, mtime_ns, file_digest in self.db.execute(
+                "SELECT name, size, mtime_ns, hash FROM assets WHERE folder = ?", (folder_key,)
+            )
+            # Odświeżenie bez podfolderów nie dotyka wierszy z podfolderów
+            if recursive or "/" not in name
+        }
+        found = _scan(folder_key, recursive)
+        stats = {"files": len(found), "added": 0, "updated": 0, "removed": 0, "hashed": 0}
+
+        with self.db:
+            for name, stat in found.items():
+                previous = known.get(name)
+                unchanged = previous is not None and previous[:2] == (stat.st_size, stat.st_mtime_ns)
+                if unchanged and (previous[2] or not hashes):
+                    continue
+                path = os.path.join(folder_key, name)
+                if unchanged:
+                    self.db.execute("UPDATE assets SET hash = ? WHERE folder = ? AND name = ?",
+                                    (file_hash(path), folder_key, name))
+                    stats["hashed"] += 1
+                    continue
+                width, height = header_dimensions(path)
+                file_digest = file_hash(path) if hashes else None
+                stats["hashed"] += 1 if hashes else 0
+                stats["updated" if previous else "added"] += 1
+                self.db.execute(
+                    "INSERT OR REPLACE INTO assets (folder, name, key, size, mtime_ns, hash, width, height) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (folder_key, name, Path(name).stem.lower(), stat.st_size, stat.st_mtime_ns,
+                     file_digest, width, height),
+                )
+            removed = [name for name in known if name not in found]
+            self.db.executemany("DELETE FROM assets WHERE folder = ? AND name = ?",
+                                [(folder_key, name) for name in removed])
+            stats["removed"] = len(removed)
+            self.db.execute("INSERT OR REPLACE INTO folders (folder, refreshed_at) VALUES (?, ?)",
+                            (folder_key, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        return stats
+
+    def names(self, folder, recursive=False):
+        """Nazwy (ścieżki względne) plików folderu według katalogu, posortowane"""
+        rows = self.db.execute("SELECT name FROM assets WHERE folder = ? ORDER BY name", (self._folder_key(folder),))
+        return [name for (name,) in rows if recursive or "/" not in name]
+
+    def folder_index(self, folder, refresh=True):
+        """asset_index.FolderIndex folderu zbudowany z katalogu (domyślnie po odświeżeniu)"""
+        if refresh:
+            self.refresh(folder)
+        return FolderIndex(folder, names=self.names(folder))
+
+    def find_by_keys(self, folder, keys, recursive=True):
+        """Pliki, których klucz (nazwa bazowa małymi literami) jest w keys: {klucz: [ścieżki względne]}"""
+        wanted = {key.lower() for key in keys}
+        matches = {}
+        rows = self.db.execute("SELECT key, name FROM assets WHERE folder = ? ORDER BY name", (self._folder_key(folder),))
+        for key, name in rows:
+            if key in wanted and (recursive or "/" not in name):
+                matches.setdefault(key, []).append(name)
+        return matches
+
+    def info(self, folder, name):
+        """Wiersz katalogu pliku jako słownik albo None"""
+        cursor = self.db.execute("SELECT * FROM assets WHERE folder = ? AND name = ?", (self._folder_key(folder), name))
+        row = cursor.fetchone()
+        return dict(zip((column[0] for column in cursor.description), row)) if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odświeża katalog plików projektu (SQLite).")
+    parser.add_argument("folders", nargs="*", default=[str(folder) for folder in default_folders],
+                        help="Foldery do odświeżenia (domyślnie input, mockup, output)")
+    parser.add_argument("--catalog", default=str(catalog_file), help="Plik bazy katalogu")
+    parser.add_argument("--recursive", action="store_true", help="Uwzględnij podfoldery")
+    parser.add_argument("--hash", action="store_true", help="Policz skróty SHA-256 zawartości")
+    args = parser.parse_args()
+
+    print(f"🗂️  Katalog plików: {args.catalog}")
+    with AssetCatalog(args.catalog) as catalog:
+        for folder in args.folders:
+            if not Path(folder).is_dir():
+                print(f"⚠️  Brak folderu: {folder}")
+                continue
+            stats = catalog.refresh(folder, args.recursive, args.hash)
+            print(f"   📁 {folder}: {stats['files']} plików (nowe: {stats['added']}, zmienione: {stats['updated']}, "
+                  f"usunięte: {stats['removed']}, skróty: {stats['hashed']})")
+    print("✅ Katalog aktualny")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wspólna reguła dopasowania plików wejściowych i mockupów
+
+Każdy folder jest skanowany raz, a dopasowanie to wyszukanie w słowniku:
+
+- wejścia: klucz z config.json pasuje do pliku o tej samej nazwie bazowej,
+  bez względu na rozszerzenie i wielkość liter ('1.png' -> '1.JPEG'), tak jak
+  findActualInputFile w main_mockup_generator.jsx,
+- mockupy: pełna nazwa pliku bez względu na wielkość liter (jak File.exists
+  na macOS).
+
+Z tej reguły korzystają plan_jobs.py, render_mockups.py i skrypty
+sprawdzające kompletność plików. Listę plików może dostarczyć trwały katalog
+(asset_catalog.py) zamiast skanu folderu.
+"""
+
+import os
+from pathlib import Path
+
+
+class FolderIndex:
+    """Indeks plików jednego folderu: nazwa bazowa i pełna nazwa (małymi literami) -> nazwa pliku"""
+
+    def __init__(self, folder_path, names=None):
+        """names: gotowa lista plików (np. z asset_catalog.py) zamiast skanu folderu"""
+        self.folder = Path(folder_path)
+        self.files = sorted(names) if names is not None else []
+        if names is None and self.folder.is_dir():
+            with os.scandir(self.folder) as it:
+                self.files = sorted(entry.name for entry in it if entry.is_file() and not entry.name.startswith("."))
+
+        self.by_stem = {}
+        self.by_name = {}
+        # Kilka plików o tej samej nazwie bazowej (np. '1.png' i '1.jpg') - wygrywa pierwszy alfabetycznie
+        self.ambiguous = {}
+        for name in self.files:
+            stem = Path(name).stem.lower()
+            if stem in self.by_stem:
+                self.ambiguous.setdefault(stem, [self.by_stem[stem]]).append(name)
+            else:
+                self.by_stem[stem] = name
+            self.by_name.setdefault(name.lower(), name)
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def match_stem(self, key):
+        """Plik pasujący do klucza po nazwie bazowej (reguła dla wejść) albo None"""
+        return self.by_stem.get(Path(key).stem.lower())
+
+    def match_name(self, name):
+        """Plik o tej samej pełnej nazwie, bez względu na wielkość liter (reguła dla mockupów) albo None"""
+        return self.by_name.get(name.lower())
+
+    def path(self, name):
+        return (self.folder / name).resolve()
+
+
+def resolve_input(key, input_index):
+    return input_index.match_stem(key)
+
+
+def resolve_mockup(name, mockup_index):
+    return mockup_index.match_name(name)
+
+
+def missing_and_extra(mappings, input_index, mockup_index):
+    """
+    Porównuje mapowania z config.json z zawartością folderów według wspólnej reguły.
+    Zwraca (brakujące wejścia, brakujące mockupy, dodatkowe wejścia, dodatkowe mockupy).
+    """
+    missing_inputs, missing_mockups = set(), set()
+    used_inputs, used_mockups = set(), set()
+    for key, mockup_list in mappings.items():
+        actual = resolve_input(key, input_index)
+        if actual:
+            used_inputs.add(actual)
+        else:
+            missing_inputs.add(key)
+        for mockup_file in mockup_list:
+            actual = resolve_mockup(mockup_file, mockup_index)
+            if actual:
+                used_mockups.add(actual)
+            else:
+                missing_mockups.add(mockup_file)
+    extra_inputs = set(input_index.files) - used_inputs
+    extra_mockups = set(mockup_index.files) - used_mockups
+    return missing_inputs, missing_mockups, extra_inputs, extra_mockups
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deterministyczny syntetyczny korpus do benchmarków
+
+Generuje offline (bez prawdziwych eksportów) obrazy o rozdzielczościach
+typowych dla mockupów i grafik wejściowych:
+
+- photo - JPG 3000x3000, gładkie tło w stylu zdjęcia produktu z drobnym szumem,
+- flat  - PNG 3000x3000, płaska grafika (kilka jednolitych kształtów),
+- alpha - PNG RGBA 4500x5400, grafika na przezroczystym tle (jak pliki z input/).
+
+oraz projekty dla narzędzi planujących: eksport produktów export.csv (jak
+z WooCommerce), extracted_images.txt, config.json i foldery input/ i mockup/
+z pustymi plikami dla zadanej liczby kombinacji.
+
+Każdy obraz ma własne ziarno wyliczone z (seed, rodzaj, numer), więc ten sam
+zestaw parametrów daje zawsze ten sam korpus. Gotowy korpus jest używany
+ponownie, dopóki parametry (corpus.json) się nie zmienią.
+"""
+
+import csv
+import json
+import shutil
+import zlib
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Ścieżki do folderów
+benchmarks_folder = Path(__file__).resolve().parent
+corpus_folder = benchmarks_folder / ".corpus"
+
+# rodzaj: (szerokość, wysokość, rozszerzenie)
+IMAGE_KINDS = {
+    "photo": (3000, 3000, "jpg"),
+    "flat": (3000, 3000, "png"),
+    "alpha": (4500, 5400, "png"),
+}
+DEFAULT_SEED = 1234
+JPEG_QUALITY = 92
+# Syntetyczne projekty: każde wejście używa MOCKUPS_PER_INPUT mockupów z puli MOCKUP_POOL
+MOCKUP_POOL = 40
+MOCKUPS_PER_INPUT = 5
+EXPORT_BASE_URL = "https://blessyou.pl//wp-content/uploads/my-images/art/"
+# Opis produktu w eksporcie (wiersze eksportu są dużo dłuższe niż same URLe)
+EXPORT_DESCRIPTION = "Koszulka z nadrukiem, 100% bawełna, gramatura 180 g/m2. " * 8
+
+
+def _rng(seed, kind, index):
+    return np.random.default_rng([seed, zlib.crc32(kind.encode("utf-8")), index])
+
+
+def _photo(rng, width, height):
+    # Gładkie pole barw: mała losowa siatka powiększona dwusześciennie + delikatny szum
+    coarse = rng.integers(40, 220, size=(6, 6, 3), dtype=np.uint8)
+    base = np.asarray(Image.fromarray(coarse, "RGB").resize((width, height), Image.BICUBIC), dtype=np.int16)
+    noise = rng.normal(0, 6, size=(height, width, 1)).astype(np.int16)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), "RGB")
+
+
+def _shapes(rng, image, count):
+    draw = ImageDraw.Draw(image)
+    width, height = image.size
+    for _ in range(count):
+        x0, x1 = sorted(rng.integers(0, width, size=2))
+        y0, y1 = sorted(rng.integers(0, height, size=2))
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3)) + (255,)
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+    return image
+
+
+def _flat(rng, width, height):
+    background = tuple(int(c) for c in rng.integers(200, 256, size=3)) + (255,)
+    return _shapes(rng, Image.new("RGBA", (width, height), background), 12).convert("RGB")
+
+
+def _alpha(rng, width, height):
+    art = _shapes(rng, Image.new("RGBA", (width // 2, height // 2), (0, 0, 0, 0)), 8)
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    image.paste(art, (width // 4, height // 4))
+    return image
+
+
+GENERATORS = {"photo": _photo, "flat": _flat, "alpha": _alpha}
+
+
+def _reuse(folder, params):
+    """True, jeśli korpus w folderze powstał z tych samych parametrów"""
+    try:
+        with open(folder / "corpus.json", "r", encoding="utf-8") as f:
+            return json.load(f) == params
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+
+def _mark(folder, params):
+    with open(folder / "corpus.json", "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+
+
+def build_image_corpus(count=4, scale=1.0, seed=DEFAULT_SEED, root=corpus_folder):
+    """
+    Tworzy (lub używa ponownie) korpus count obrazów każdego rodzaju,
+    rozdzielczości przemnożone przez scale. Zwraca folder korpusu.
+    """
+    params = {"count": count, "scale": scale, "seed": seed, "kinds": IMAGE_KINDS}
+    folder = Path(root) / f"images_{count}x_{scale:g}_{seed}"
+    if _reuse(folder, json.loads(json.dumps(params))):
+        return folder
+
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True)
+    for kind, (width, height, extension) in IMAGE_KINDS.items():
+        size = (max(16, round(width * scale)), max(16, round(height * scale)))
+        for index in range(count):
+            image = GENERATORS[kind](_rng(seed, kind, index), *size)
+            path = folder / f"{kind}_{index:03d}.{extension}"
+            if extension == "jpg":
+                image.save(path, quality=JPEG_QUALITY)
+            else:
+                image.save(path)
+    _mark(folder, params)
+    return folder
+
+
+def build_project(combinations, seed=DEFAULT_SEED, root=corpus_folder):
+    """
+    Tworzy (lub używa ponownie) syntetyczny projekt z zadaną liczbą kombinacji:
+    export.csv, extracted_images.txt, config.json, input/ i mockup/ (puste
+    pliki - narzędzia planujące patrzą tylko na nazwy). Zwraca folder projektu.
+    """
+    params = {"combinations": combinations, "seed": seed, "export": "csv-v1",
+              "mockup_pool": MOCKUP_POOL, "mockups_per_input": MOCKUPS_PER_INPUT}
+    folder = Path(root) / f"project_{combinations}_{seed}"
+    if _reuse(folder, params):
+        return folder
+
+    shutil.rmtree(folder, ignore_errors=True)
+    (folder / "input").mkdir(parents=True)
+    (folder / "mockup").mkdir()
+
+    rng = _rng(seed, "project", combinations)
+    mockups = [f"mockup{index:03d}" for index in range(MOCKUP_POOL)]
+    mappings = {}
+    remaining = combinations
+    index = 0
+    while remaining > 0:
+        used = min(MOCKUPS_PER_INPUT, remaining)
+        chosen = rng.choice(MOCKUP_POOL, size=used, replace=False)
+        mappings[f"art{index:05d}"] = [mockups[i] for i in sorted(chosen)]
+        remaining -= used
+        index += 1
+
+    with open(folder / "extracted_images.txt", "w", encoding="utf-8") as f:
+        f.write(f"Liczba unikalnych obrazów: {combinations}\n\n")
+        for input_name, mockup_names in mappings.items():
+            for mockup_name in mockup_names:
+                f.write(f"{input_name}_{mockup_name}\n")
+
+    # Jeden produkt na wejście; obrazy w jednej komórce, rozdzielone ", "
+    with open(folder / "export.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Name", "Description", "Images"])
+        for product_id, (input_name, mockup_names) in enumerate(mappings.items(), start=1):
+            writer.writerow([product_id, f"Produkt {input_name}", EXPORT_DESCRIPTION, ", ".join(
+                f"{EXPORT_BASE_URL}{input_name}_{mockup_name}.webp" for mockup_name in mockup_names
+            )])
+
+    config = {f"{name}.png": [f"{mockup}.psd" for mockup in mockup_names] for name, mockup_names in mappings.items()}
+    with open(folder / "config.json", "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    for input_key in config:
+        (folder / "input" / input_key).touch()
+    for mockup in mockups:
+        (folder / "mockup" / f"{mockup}.psd").touch()
+    _mark(folder, params)
+    return folder
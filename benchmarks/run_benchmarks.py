@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarki konwertera WebP i narzędzi planujących
+
+Mierzy na deterministycznym korpusie (corpus.py):
+
+- converter    - convert to webp/converter.py od początku do końca: obrazy/s,
+                 enkodowania na obraz, szczytowe RSS największego procesu,
+- ingest       - csv_ingest.py + process_extracted_to_config.py (export.csv -> config.json),
+- config       - process_extracted_to_config.py (extracted_images.txt -> config.json),
+- plan         - plan_jobs.compile_plan (skan folderów, dopasowanie, kolejność),
+- existence    - sprawdzenie istnienia plików (jak check_files_existence.py),
+
+dla projektów z 10, 1000 i 10000 kombinacji. Wyniki trafiają do
+benchmarks/results/<data>.json; z --baseline są porównywane z zapisaną bazą
+(--save-baseline zapisuje bieżący wynik jako bazę).
+
+    python3 benchmarks/run_benchmarks.py --scale 0.25
+    python3 benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+benchmarks_folder = Path(__file__).resolve().parent
+project_folder = benchmarks_folder.parent
+sys.path.insert(0, str(project_folder))
+
+import csv_ingest  # noqa: E402
+import process_extracted_to_config  # noqa: E402
+from asset_index import FolderIndex, missing_and_extra  # noqa: E402
+from corpus import DEFAULT_SEED, build_image_corpus, build_project  # noqa: E402
+from plan_jobs import compile_plan, load_config  # noqa: E402
+
+# Ścieżki do plików
+converter_script = project_folder / "convert to webp" / "converter.py"
+results_folder = benchmarks_folder / "results"
+baseline_file = benchmarks_folder / "baseline.json"
+
+PROJECT_SIZES = (10, 1000, 10000)
+# Zmiana metryki czasu o więcej niż tyle procent względem bazy jest oznaczana
+REGRESSION_THRESHOLD = 10.0
+# Metryki, dla których większa wartość jest lepsza
+HIGHER_IS_BETTER = ("images_per_second", "combinations_per_second")
+
+
+def timed(function, repeats):
+    """Uruchamia function repeats razy; zwraca (najlepszy czas, mediana) w sekundach"""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), statistics.median(durations)
+
+
+def repeats_for(combinations):
+    return 3 if combinations >= 10000 else 5
+
+
+# ============================================================================
+# NARZĘDZIA PLANUJĄCE
+# ============================================================================
+
+def bench_config(project, combinations):
+    output = Path(tempfile.mkdtemp()) / "config.json"
+
+    def run():
+        mappings = process_extracted_to_config.parse_extracted_images(project / "extracted_images.txt")
+        process_extracted_to_config.create_config_json(mappings, output)
+
+    best, median = timed(run, repeats_for(combinations))
+    shutil.rmtree(output.parent, ignore_errors=True)
+    return {"best_seconds": round(best, 5), "median_seconds": round(median, 5),
+            "combinations_per_second": round(combinations / best, 1)}
+
+
+def bench_ingest(project, combinations):
+    output = Path(tempfile.mkdtemp()) / "config.json"
+
+    def run():
+        mappings, _ = csv_ingest.mappings_from_csv(project / "export.csv")
+        process_extracted_to_config.create_config_json(mappings, output, "export.csv")
+
+    best, median = timed(run, repeats_for(combinations))
+    shutil.rmtree(output.parent, ignore_errors=True)
+    return {"best_seconds": round(best, 5), "median_seconds": round(median, 5),
+            "combinations_per_second": round(combinations / best, 1)}
+
+
+def bench_plan(project, combinations):
+    mappings = load_config(project / "config.json")
+    best, median = timed(
+        lambda: compile_plan(mappings, "mockup", project / "input", project / "mockup"), repeats_for(combinations)
+    )
+    return {"best_seconds": round(best, 5), "median_seconds": round(median, 5),
+            "combinations_per_second": round(combinations / best, 1)}
+
+
+def bench_existence(project, combinations):
+    mappings = load_config(project / "config.json")
+
+    def run():
+        missing_and_extra(mappings, FolderIndex(project / "input"), FolderIndex(project / "mockup"))
+
+    best, median = timed(run, repeats_for(combinations))
+    return {"best_seconds": round(best, 5), "median_seconds": round(median, 5),
+            "combinations_per_second": round(combinations / best, 1)}
+
+
+# ============================================================================
+# KONWERTER
+# ============================================================================
+
+def _peak_child_rss_bytes():
+    """Szczytowe RSS największego zakończonego procesu potomnego albo None (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux podaje KB, macOS bajty
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bench_converter(corpus, workers=None, search="bisect"):
+    """Konwertuje cały korpus w nowym procesie (--force) i czyta jego raport przebiegu"""
+    output = Path(tempfile.mkdtemp(prefix="bench_webp_"))
+    report_path = output / "report.jsonl"
+    command = [sys.executable, str(converter_script), str(corpus), str(output / "webp"),
+               "--force", "--search", search, "--report", str(report_path)]
+    if workers:
+        command += ["--workers", str(workers)]
+
+    images = sum(1 for path in corpus.iterdir() if path.suffix in (".jpg", ".png"))
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=converter_script.parent, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    peak_rss = _peak_child_rss_bytes()
+
+    try:
+        if completed.returncode != 0:
+            error_lines = (completed.stderr or completed.stdout).strip().splitlines()
+            errors = [line for line in error_lines if "Error" in line] or error_lines
+            return {"skipped": errors[-1].strip() if errors else f"exit code {completed.returncode}"}
+        with open(report_path, "r", encoding="utf-8") as f:
+            summary = json.loads(f.read().strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(output, ignore_errors=True)
+
+    converted = summary.get("converted", 0)
+    return {
+        "images": images,
+        "converted": converted,
+        "errors": summary.get("errors", 0),
+        "wall_seconds": round(wall, 3),
+        "images_per_second": round(converted / wall, 3) if wall else 0.0,
+        "encodes_per_image": round(summary.get("encodes", 0) / converted, 2) if converted else 0.0,
+        "proxy_encodes_per_image": round(summary.get("proxy_encodes", 0) / converted, 2) if converted else 0.0,
+        "oversize": summary.get("oversize", 0),
+        "bytes_out": summary.get("bytes_out", 0),
+        "peak_rss_mb": round(peak_rss / 1024 ** 2, 1) if peak_rss else None,
+    }
+
+
+# ============================================================================
+# WYNIKI
+# ============================================================================
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_folder,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline):
+    """Wypisuje zmiany metryk względem bazy; zwraca liczbę regresji"""
+    regressions = 0
+    for name, metrics in results["results"].items():
+        base_metrics = baseline.get("results", {}).get(name)
+        if not base_metrics:
+            continue
+        for key, value in metrics.items():
+            base = base_metrics.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base * 100
+            worse = -change if key in HIGHER_IS_BETTER else change
+            timing = key.endswith("_seconds") or key in HIGHER_IS_BETTER
+            marker = ""
+            if timing and worse > REGRESSION_THRESHOLD:
+                marker = "  ❌ regresja"
+                regressions += 1
+            elif timing and worse < -REGRESSION_THRESHOLD:
+                marker = "  ✅ poprawa"
+            print(f"   {name}.{key}: {base} -> {value} ({change:+.1f}%){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki konwertera i narzędzi planujących.")
+    parser.add_argument("--images", type=int, default=4, help="Liczba obrazów każdego rodzaju w korpusie")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Skala rozdzielczości korpusu (np. 0.25 dla szybkiego przebiegu)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Ziarno korpusu")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in PROJECT_SIZES),
+                        help="Liczby kombinacji syntetycznych projektów")
+    parser.add_argument("--workers", type=int, default=None, help="Liczba procesów konwertera")
+    parser.add_argument("--search", default="bisect", help="Tryb wyszukiwania jakości konwertera")
+    parser.add_argument("--skip-converter", action="store_true", help="Pomiń benchmark konwertera")
+    parser.add_argument("--output", default=None, help="Plik wyników (domyślnie benchmarks/results/<data>.json)")
+    parser.add_argument("--baseline", default=None, help="Porównaj z zapisaną bazą (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Zapisz wynik jako bazę ({baseline_file})")
+    args = parser.parse_args()
+
+    print("🚀 Benchmarki...")
+    results = {
+        "meta": {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "images_per_kind": args.images,
+            "scale": args.scale,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    for combinations in (int(size) for size in args.sizes.split(",") if size.strip()):
+        project = build_project(combinations, args.seed)
+        for name, bench in (("ingest", bench_ingest), ("config", bench_config), ("plan", bench_plan),
+                            ("existence", bench_existence)):
+            metrics = bench(project, combinations)
+            results["results"][f"{name}_{combinations}"] = metrics
+            print(f"   📋 {name} ({combinations} kombinacji): {metrics['best_seconds'] * 1000:.1f} ms "
+                  f"({metrics['combinations_per_second']:.0f} kombinacji/s)")
+
+    if not args.skip_converter:
+        corpus = build_image_corpus(args.images, args.scale, args.seed)
+        print(f"   🖼️  Korpus: {corpus}")
+        metrics = bench_converter(corpus, args.workers, args.search)
+        results["results"]["converter"] = metrics
+        if "skipped" in metrics:
+            print(f"   ⚠️  Konwerter pominięty: {metrics['skipped']}")
+        else:
+            print(f"   🖼️  converter: {metrics['images_per_second']} obrazów/s, "
+                  f"{metrics['encodes_per_image']} enkodowań/obraz, szczytowe RSS: {metrics['peak_rss_mb']} MB")
+
+    output = Path(args.output) if args.output else results_folder / f"{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"✅ Wyniki: {output}")
+
+    if args.save_baseline:
+        shutil.copyfile(output, baseline_file)
+        print(f"📌 Zapisano bazę: {baseline_file}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n📊 Porównanie z bazą {args.baseline} ({baseline['meta'].get('commit')}):")
+        regressions = compare(results, baseline)
+        print(f"{'❌' if regressions else '✅'} Regresji: {regressions}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import json
 import os
 
+from asset_catalog import AssetCatalog
+from asset_index import missing_and_extra
+
 def check_file_completeness():
     """
     Checks for missing input and mockup files based on the config.json file.
@@ -20,30 +23,24 @@ def check_file_completeness():
         print(f"BŁĄD: Plik konfiguracyjny {config_path} jest uszkodzony lub niepoprawnie sformatowany.")
         return
 
-    expected_input_files = set(config_data.keys())
-    
-    expected_mockup_files = set()
-    for mockup_list in config_data.values():
-        if isinstance(mockup_list, list):
-            for mockup_file in mockup_list:
-                expected_mockup_files.add(mockup_file)
+    mappings = {
+        key: value for key, value in config_data.items()
+        if not key.startswith('_') and isinstance(value, list)
+    }
+    expected_input_files = set(mappings.keys())
+    expected_mockup_files = {mockup_file for mockup_list in mappings.values() for mockup_file in mockup_list}
 
-    # 2. Get lists of actual files from directories
-    try:
-        actual_input_files = set(os.listdir(input_dir))
-    except FileNotFoundError:
+    # 2. Index actual files in each directory (incremental asset catalog, see asset_catalog.py)
+    if not os.path.isdir(input_dir):
         print(f"BŁĄD: Folder 'input' nie został znaleziony w ścieżce: {input_dir}")
-        actual_input_files = set()
-
-    try:
-        actual_mockup_files = set(os.listdir(mockup_dir))
-    except FileNotFoundError:
+    if not os.path.isdir(mockup_dir):
         print(f"BŁĄD: Folder 'mockup' nie został znaleziony w ścieżce: {mockup_dir}")
-        actual_mockup_files = set()
+    with AssetCatalog() as catalog:
+        input_index = catalog.folder_index(input_dir)
+        mockup_index = catalog.folder_index(mockup_dir)
 
-    # 3. Compare lists and find missing files
-    missing_input_files = expected_input_files - actual_input_files
-    missing_mockup_files = expected_mockup_files - actual_mockup_files
+    # 3. Compare using the shared matching rule (see asset_index.py)
+    missing_input_files, missing_mockup_files, _, _ = missing_and_extra(mappings, input_index, mockup_index)
 
     # 4. Generate and save the report to a file
     report_path = os.path.join(os.path.dirname(__file__), 'file_completeness_report.txt')
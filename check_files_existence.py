@@ -9,39 +9,22 @@ import os
 from pathlib import Path
 from collections import defaultdict
 
+from asset_catalog import AssetCatalog
+from asset_index import missing_and_extra
+
 # Ścieżki do folderów
 project_folder = Path("/Users/damianaugustyn/Documents/projects/Smart PS replacer")
 config_file = project_folder / "config.json"
 input_folder = project_folder / "input"
 mockup_folder = project_folder / "mockup"
 
-def get_folder_files(folder_path):
-    """Zwraca zbiór nazw plików w folderze (bez rozszerzeń dla porównania)"""
-    files = set()
-    if folder_path.exists():
-        for file_path in folder_path.iterdir():
-            if file_path.is_file():
-                files.add(file_path.name)
-    return files
-
 def load_config_mappings(config_path):
     """Ładuje mapowania z config.json"""
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
 
-    input_files = set()
-    mockup_files = set()
-
-    for key, values in config.items():
-        if not key.startswith('_'):  # Pomijamy metadane
-            # Klucz to plik wejściowy (np. "1.png")
-            input_files.add(key)
-
-            # Wartości to lista mockupów (np. ["canvas.psd", "frame.psd"])
-            for mockup in values:
-                mockup_files.add(mockup)
-
-    return input_files, mockup_files
+    # Pomijamy metadane; klucz to plik wejściowy (np. "1.png"), wartości to lista mockupów
+    return {key: values for key, values in config.items() if not key.startswith('_')}
 
 def check_files_existence():
     """Sprawdza istnienie wszystkich plików"""
@@ -51,27 +34,26 @@ def check_files_existence():
     print(f"📄 Config: {config_file}")
     print()
 
-    # Wczytaj pliki z folderów
-    input_files_in_folder = get_folder_files(input_folder)
-    mockup_files_in_folder = get_folder_files(mockup_folder)
+    # Wczytaj pliki z folderów z katalogu plików (odświeżanego przyrostowo, asset_catalog.py)
+    with AssetCatalog() as catalog:
+        input_index = catalog.folder_index(input_folder)
+        mockup_index = catalog.folder_index(mockup_folder)
 
     # Wczytaj mapowania z config.json
-    input_files_in_config, mockup_files_in_config = load_config_mappings(config_file)
+    mappings = load_config_mappings(config_file)
+    mockup_files_in_config = {mockup for values in mappings.values() for mockup in values}
 
     print("📊 Statystyki:")
-    print(f"   Plików wejściowych w config.json: {len(input_files_in_config)}")
-    print(f"   Plików wejściowych w folderze input: {len(input_files_in_folder)}")
+    print(f"   Plików wejściowych w config.json: {len(mappings)}")
+    print(f"   Plików wejściowych w folderze input: {len(input_index.files)}")
     print(f"   Plików mockup w config.json: {len(mockup_files_in_config)}")
-    print(f"   Plików mockup w folderze mockup: {len(mockup_files_in_folder)}")
+    print(f"   Plików mockup w folderze mockup: {len(mockup_index.files)}")
     print()
 
-    # Sprawdź pliki wejściowe
-    missing_input_files = input_files_in_config - input_files_in_folder
-    extra_input_files = input_files_in_folder - input_files_in_config
-
-    # Sprawdź pliki mockup
-    missing_mockup_files = mockup_files_in_config - mockup_files_in_folder
-    extra_mockup_files = mockup_files_in_folder - mockup_files_in_config
+    # Porównaj według wspólnej reguły dopasowania (asset_index.py):
+    # wejścia po nazwie bazowej, mockupy po pełnej nazwie, bez względu na wielkość liter
+    missing_input_files, missing_mockup_files, extra_input_files, extra_mockup_files = \
+        missing_and_extra(mappings, input_index, mockup_index)
 
     # Wyniki
     all_good = True
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kompilator szablonów mockupów: PSD -> skompilowany artefakt NumPy
+
+Parsowanie PSD (100+ MB) w poszukiwaniu smart obiektu 'Frame 1' i warstw nad
+nim i pod nim jest najdroższą częścią renderowania szablonu. Ten skrypt robi
+to raz na plik i zapisuje wynik w mockup/.compiled/<nazwa_mockupu>/:
+
+    meta.json   - źródło (mtime, rozmiar, SHA-256), rozmiar dokumentu,
+                  rozmiar ramki, narożniki smart obiektu, lista nakładek
+    under.npy   - spłaszczone warstwy pod smart obiektem (uint8 RGB)
+    mask.npy    - maska smart obiektu (uint8), jeśli jest
+    over_N.npy  - spłaszczone warstwy nad smart obiektem, pogrupowane
+                  według trybu mieszania (uint8 RGBA)
+
+Tablice są wczytywane przez np.load(mmap_mode='r'), więc szablon ładuje się
+w milisekundach. Artefakt jest unieważniany, gdy zmieni się zawartość PSD:
+przy zmienionym mtime liczony jest hash i dopiero różny hash wymusza
+ponowną kompilację.
+
+Artefakt jest budowany w katalogu tymczasowym danego procesu i podmieniany
+pod wyłączną blokadą pliku <nazwa>.lock; odczyt trzyma blokadę współdzieloną.
+Renderery kompilują nieaktualne szablony w procesie nadrzędnym przed
+rozesłaniem zadań (compile_stale_templates), a blokada chroni przypadki,
+gdy mimo to kilka procesów trafi na ten sam szablon.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+try:
+    from psd_tools import PSDImage
+    from psd_tools.constants import Tag
+except ImportError:  # psd-tools jest potrzebne tylko do kompilacji, nie do wczytywania
+    PSDImage = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: bez blokady, szablony kompiluje wtedy tylko proces nadrzędny
+    fcntl = None
+
+# Ścieżki do folderów
+project_folder = Path(__file__).resolve().parent
+mockup_folder = project_folder / "mockup"
+compiled_folder = mockup_folder / ".compiled"
+
+SMART_OBJECT_TARGET = "Frame 1"
+COMPILED_VERSION = 1
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Tryby mieszania PSD obsługiwane przez renderer; pozostałe traktujemy jak 'normal'
+PSD_BLEND_MODES = {"multiply": "multiply", "screen": "screen"}
+
+
+def file_sha256(path):
+    """Liczy SHA-256 pliku, czytając go kawałkami"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compiled_dir_for(psd_path, compiled_dir=compiled_folder):
+    return Path(compiled_dir) / Path(psd_path).stem
+
+
+def _read_meta(target_dir):
+    try:
+        with open(target_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return meta if meta.get("version") == COMPILED_VERSION else None
+
+
+def is_compiled_fresh(psd_path, compiled_dir=compiled_folder):
+    """
+    Sprawdza, czy artefakt odpowiada obecnej wersji PSD.
+    Zmieniony mtime przy tym samym hashu tylko odświeża zapisany mtime.
+    """
+    target_dir = compiled_dir_for(psd_path, compiled_dir)
+    meta = _read_meta(target_dir)
+    if not meta:
+        return False
+    stat = os.stat(psd_path)
+    if meta["source_mtime_ns"] == stat.st_mtime_ns and meta["source_size"] == stat.st_size:
+        return True
+    if meta["source_size"] != stat.st_size or meta["source_sha256"] != file_sha256(psd_path):
+        return False
+    meta["source_mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_json(target_dir / "meta.json", meta)
+    except OSError:
+        pass  # artefakt właśnie podmienia inny proces; odświeżymy mtime następnym razem
+    return True
+
+
+@contextmanager
+def _template_lock(target_dir, shared=False):
+    """Blokada artefaktu: wyłączna przy kompilacji i podmianie, współdzielona przy odczycie"""
+    if fcntl is None:
+        yield
+        return
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(target_dir.with_name(target_dir.name + ".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_json(path, data):
+    # Nazwa z PID-em: dwa procesy zapisujące ten sam plik nie podmieniają sobie pliku tymczasowego
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# PARSOWANIE PSD
+# ============================================================================
+
+def _find_smart_object(psd, target):
+    """Zwraca warstwę smart obiektu o nazwie target (pierwszą znalezioną)"""
+    for layer in psd.descendants():
+        if layer.kind == "smartobject" and layer.name == target:
+            return layer
+    return None
+
+
+def _frame_size(layer, quad):
+    """Rozmiar zawartości smart obiektu; gdy brak go w deskryptorze, liczony z narożników"""
+    # Rozmiar ('Sz  ') zapisuje tylko deskryptor SoLd/SoLE; PlLd/plLd mają same narożniki
+    for tag in (Tag.SMART_OBJECT_LAYER_DATA1, Tag.SMART_OBJECT_LAYER_DATA2):
+        config = layer.tagged_blocks.get_data(tag)
+        descriptor = getattr(config, "data", None)
+        if descriptor is not None and b"Sz  " in descriptor:
+            size = descriptor[b"Sz  "]
+            return [int(round(float(size[b"Wdth"]))), int(round(float(size[b"Hght"])))]
+    width = np.hypot(*(quad[1] - quad[0]))
+    height = np.hypot(*(quad[3] - quad[0]))
+    return [int(round(width)), int(round(height))]
+
+
+def _smart_object_geometry(psd, target, psd_name):
+    """Warstwa smart obiektu, jej narożniki (4x2) i rozmiar ramki"""
+    layer = _find_smart_object(psd, target)
+    if layer is None:
+        raise ValueError(f"Brak warstwy smart obiektu '{target}' w {psd_name}")
+    box = layer.smart_object.transform_box
+    if box is None:
+        raise ValueError(f"Smart obiekt '{target}' w {psd_name} nie ma zapisanych narożników")
+    quad = np.asarray(box, dtype=np.float64).reshape(4, 2)
+    return layer, quad, _frame_size(layer, quad)
+
+
+def template_geometry(psd_path, target=SMART_OBJECT_TARGET, compiled_dir=compiled_folder):
+    """
+    Rozmiar dokumentu, rozmiar ramki i narożniki smart obiektu bez składania
+    warstw. Aktualny artefakt jest używany bez otwierania PSD; w przeciwnym
+    razie psd-tools czyta tylko rekordy warstw. Zwraca słownik z kluczami
+    source ('compiled' albo 'psd'), size, frame i quad.
+    """
+    psd_path = Path(psd_path)
+    if is_compiled_fresh(psd_path, compiled_dir):
+        meta = _read_meta(compiled_dir_for(psd_path, compiled_dir))
+        if meta.get("target") == target:
+            return {"source": "compiled", "size": meta["size"], "frame": meta["frame"], "quad": meta["quad"]}
+    if PSDImage is None:
+        raise RuntimeError("Odczyt szablonów PSD wymaga pakietu psd-tools (pip install psd-tools)")
+    psd = PSDImage.open(psd_path)
+    _, quad, frame = _smart_object_geometry(psd, target, psd_path.name)
+    return {"source": "psd", "size": [psd.width, psd.height], "frame": frame, "quad": quad.tolist()}
+
+
+def _is_visible(layer):
+    """Warstwa jest widoczna tylko gdy ona i wszyscy jej rodzice są widoczni"""
+    while layer is not None and hasattr(layer, "visible"):
+        if not layer.visible:
+            return False
+        layer = layer.parent
+    return True
+
+
+def _layer_rgba(layer, size):
+    """Renderuje pojedynczą warstwę do tablicy RGBA o rozmiarze całego dokumentu"""
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    image = layer.composite()
+    if image is not None:
+        canvas.paste(image.convert("RGBA"), (layer.left, layer.top))
+    return np.asarray(canvas, dtype=np.float32) / 255.0
+
+
+def _merge_overlays(layers, size, clip_coverage):
+    """
+    Spłaszcza warstwy nad smart obiektem w jak najmniej nakładek: kolejne
+    warstwy w tym samym trybie są łączone w jedną. Warstwy przycięte do smart
+    obiektu (clipping mask) są ograniczane do jego obszaru.
+    """
+    groups = []
+    for layer, clipped in layers:
+        mode = PSD_BLEND_MODES.get(str(getattr(layer.blend_mode, "name", "")).lower(), "normal")
+        rgba = _layer_rgba(layer, size)
+        rgba[..., 3] *= layer.opacity / 255.0
+        if clipped:
+            rgba[..., 3] *= clip_coverage
+        if groups and groups[-1][0] == mode:
+            groups[-1] = (mode, _combine(groups[-1][1], rgba, mode))
+        else:
+            groups.append((mode, _as_overlay(rgba, mode)))
+    return [(mode, np.clip(arr * 255.0 + 0.5, 0, 255).astype(np.uint8)) for mode, arr in groups]
+
+
+def _as_overlay(rgba, mode):
+    """
+    Sprowadza warstwę do postaci, w której da się ją łączyć z kolejnymi:
+    multiply -> współczynnik (1 - a + a*rgb) z alfą 1, screen -> a*rgb z alfą 1.
+    """
+    if mode == "normal":
+        return rgba
+    alpha = rgba[..., 3:4]
+    if mode == "multiply":
+        color = 1.0 - alpha + alpha * rgba[..., :3]
+    else:
+        color = alpha * rgba[..., :3]
+    return np.concatenate([color, np.ones_like(alpha)], axis=-1)
+
+
+def _combine(below, above, mode):
+    """Łączy dwie nakładki w tym samym trybie mieszania w jedną"""
+    above = _as_overlay(above, mode)
+    if mode == "multiply":
+        below[..., :3] *= above[..., :3]
+    elif mode == "screen":
+        below[..., :3] = 1.0 - (1.0 - below[..., :3]) * (1.0 - above[..., :3])
+    else:
+        alpha_above = above[..., 3:4]
+        alpha_below = below[..., 3:4]
+        alpha_out = alpha_above + alpha_below * (1.0 - alpha_above)
+        color = above[..., :3] * alpha_above + below[..., :3] * alpha_below * (1.0 - alpha_above)
+        below[..., :3] = np.divide(color, alpha_out, out=np.zeros_like(color), where=alpha_out > 0)
+        below[..., 3:4] = alpha_out
+    return below
+
+
+def _smart_object_mask(layer, size):
+    """Maska smart obiektu (maska warstwy i krycie) jako uint8 HxW, albo None"""
+    opacity = layer.opacity / 255.0
+    if not layer.has_mask() and opacity >= 1.0:
+        return None
+    mask = np.full((size[1], size[0]), opacity, dtype=np.float32)
+    if layer.has_mask():
+        full = Image.new("L", size, layer.mask.background_color)
+        mask_image = layer.mask.topil()
+        if mask_image is not None:
+            full.paste(mask_image, (layer.mask.left, layer.mask.top))
+        mask *= np.asarray(full, dtype=np.float32) / 255.0
+    return np.clip(mask * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+
+def compile_template(psd_path, compiled_dir=compiled_folder, target=SMART_OBJECT_TARGET):
+    """Kompiluje jeden plik PSD do mockup/.compiled/<nazwa>/ i zwraca ścieżkę artefaktu"""
+    if PSDImage is None:
+        raise RuntimeError("Kompilacja szablonów wymaga pakietu psd-tools (pip install psd-tools)")
+    with _template_lock(compiled_dir_for(psd_path, compiled_dir)):
+        return _compile_locked(Path(psd_path), compiled_dir, target)
+
+
+def ensure_compiled(psd_path, compiled_dir=compiled_folder, target=SMART_OBJECT_TARGET):
+    """
+    Kompiluje szablon, jeśli artefakt jest nieaktualny. Zwraca True, gdy
+    kompilował; procesy czekające na tę samą blokadę zastają gotowy artefakt.
+    """
+    if is_compiled_fresh(psd_path, compiled_dir):
+        return False
+    if PSDImage is None:
+        raise RuntimeError("Kompilacja szablonów wymaga pakietu psd-tools (pip install psd-tools)")
+    with _template_lock(compiled_dir_for(psd_path, compiled_dir)):
+        if is_compiled_fresh(psd_path, compiled_dir):
+            return False
+        _compile_locked(Path(psd_path), compiled_dir, target)
+        return True
+
+
+def _compile_locked(psd_path, compiled_dir, target):
+    stat = os.stat(psd_path)
+    source_sha256 = file_sha256(psd_path)
+    psd = PSDImage.open(psd_path)
+    size = (psd.width, psd.height)
+
+    smart_object, quad, frame = _smart_object_geometry(psd, target, psd_path.name)
+
+    # Warstwy w psd-tools są ułożone od dołu do góry
+    layers = [layer for layer in psd.descendants() if not layer.is_group()]
+    position = next(i for i, layer in enumerate(layers) if layer is smart_object)
+    clipped_to_smart_object = set(id(layer) for layer in smart_object.clip_layers)
+    below = set(id(layer) for layer in layers[:position])
+    above = [
+        (layer, id(layer) in clipped_to_smart_object)
+        for layer in layers[position + 1:]
+        if _is_visible(layer)
+    ]
+
+    # Grupy przepuszczamy, żeby zachować ich tryby mieszania; filtrujemy same warstwy
+    under = psd.composite(
+        layer_filter=lambda layer: layer.is_group() or (id(layer) in below and _is_visible(layer))
+    )
+    under_rgb = np.asarray(under.convert("RGB"), dtype=np.uint8)
+
+    coverage_image = Image.new("L", size, 0)
+    ImageDraw.Draw(coverage_image).polygon([tuple(point) for point in quad], fill=255)
+    clip_coverage = np.asarray(coverage_image, dtype=np.float32) / 255.0
+    overlays = _merge_overlays(above, size, clip_coverage)
+    mask = _smart_object_mask(smart_object, size)
+
+    # Zapis do katalogu tymczasowego procesu i podmiana, żeby odczyt nie trafił na połowę artefaktu
+    target_dir = compiled_dir_for(psd_path, compiled_dir)
+    tmp_dir = target_dir.with_name(f"{target_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    np.save(tmp_dir / "under.npy", under_rgb)
+    if mask is not None:
+        np.save(tmp_dir / "mask.npy", mask)
+    overlay_meta = []
+    for i, (mode, array) in enumerate(overlays):
+        np.save(tmp_dir / f"over_{i}.npy", array)
+        overlay_meta.append({"file": f"over_{i}.npy", "blend": mode, "opacity": 1.0})
+
+    _write_json(tmp_dir / "meta.json", {
+        "version": COMPILED_VERSION,
+        "source": psd_path.name,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "source_sha256": source_sha256,
+        "target": target,
+        "size": list(size),
+        "frame": frame,
+        "quad": quad.tolist(),
+        "base": "under.npy",
+        "mask": "mask.npy" if mask is not None else None,
+        "overlays": overlay_meta,
+    })
+    old_dir = target_dir.with_name(f"{target_dir.name}.{os.getpid()}.old")
+    if target_dir.exists():
+        os.replace(target_dir, old_dir)
+    os.replace(tmp_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return target_dir
+
+
+def load_compiled_template(psd_path, compiled_dir=compiled_folder, compile_stale=True):
+    """
+    Wczytuje skompilowany szablon (tablice jako memmapy tylko do odczytu),
+    w razie potrzeby najpierw go kompilując. Zwraca słownik w formacie
+    render_mockups.load_template.
+    """
+    if compile_stale:
+        ensure_compiled(psd_path, compiled_dir)
+    elif not is_compiled_fresh(psd_path, compiled_dir):
+        raise FileNotFoundError(f"Brak aktualnego skompilowanego szablonu dla {Path(psd_path).name}")
+
+    target_dir = compiled_dir_for(psd_path, compiled_dir)
+    # Memmapy otwarte pod blokadą zostają ważne także po późniejszej podmianie katalogu
+    with _template_lock(target_dir, shared=True):
+        return _load_arrays(psd_path, target_dir)
+
+
+def _load_arrays(psd_path, target_dir):
+    meta = _read_meta(target_dir)
+    if meta is None:
+        raise FileNotFoundError(f"Brak skompilowanego szablonu dla {Path(psd_path).name}")
+    return {
+        "size": tuple(meta["size"]),
+        "frame": tuple(meta["frame"]),
+        "quad": np.asarray(meta["quad"], dtype=np.float64),
+        "base": np.load(target_dir / meta["base"], mmap_mode="r"),
+        "mask": np.load(target_dir / meta["mask"], mmap_mode="r") if meta["mask"] else None,
+        "overlays": [
+            (np.load(target_dir / overlay["file"], mmap_mode="r"), overlay["blend"], overlay["opacity"])
+            for overlay in meta["overlays"]
+        ],
+    }
+
+
+def _compile_if_stale(psd_path, compiled_dir, force):
+    start = time.time()
+    try:
+        if force:
+            compile_template(psd_path, compiled_dir)
+        elif not ensure_compiled(psd_path, compiled_dir):
+            return psd_path, "aktualny", time.time() - start
+        return psd_path, "skompilowany", time.time() - start
+    except Exception as e:
+        return psd_path, f"BŁĄD: {e}", time.time() - start
+
+
+def compile_stale_templates(psd_paths, compiled_dir=compiled_folder, workers=None, force=False):
+    """
+    Kompiluje nieaktualne szablony (równolegle, gdy jest ich kilka) i zwraca
+    (ścieżka, status, czas) w kolejności ukończenia. Status błędu zaczyna
+    się od 'BŁĄD'. Aktualne szablony sprawdzamy na miejscu, bez puli.
+    """
+    stale = []
+    for psd_path in psd_paths:
+        start = time.time()
+        try:
+            fresh = not force and is_compiled_fresh(psd_path, compiled_dir)
+        except OSError:
+            fresh = False  # błąd odczytu PSD zgłosi kompilacja
+        if fresh:
+            yield psd_path, "aktualny", time.time() - start
+        else:
+            stale.append(psd_path)
+    if len(stale) == 1:
+        yield _compile_if_stale(stale[0], compiled_dir, force)
+    elif stale:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_compile_if_stale, p, compiled_dir, force) for p in stale]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompiluje szablony PSD z folderu mockup do artefaktów NumPy.")
+    parser.add_argument("--mockup", default=str(mockup_folder), help="Folder z plikami PSD")
+    parser.add_argument("--compiled", default=None, help="Folder na artefakty (domyślnie mockup/.compiled)")
+    parser.add_argument("--force", action="store_true", help="Kompiluj ponownie także aktualne szablony")
+    parser.add_argument("--workers", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args()
+
+    compiled_dir = Path(args.compiled) if args.compiled else Path(args.mockup) / ".compiled"
+    psd_files = sorted(p for p in Path(args.mockup).iterdir() if p.suffix.lower() == ".psd")
+    if not psd_files:
+        print(f"❌ Brak plików PSD w {args.mockup}")
+        return
+
+    print(f"🚀 Kompilowanie {len(psd_files)} szablonów do {compiled_dir}...")
+    errors = 0
+    for psd_path, status, elapsed in compile_stale_templates(psd_files, compiled_dir, args.workers, args.force):
+        errors += status.startswith("BŁĄD")
+        print(f"   {psd_path.name}: {status} ({elapsed:.2f}s)")
+
+    print(f"\n✅ Gotowe: {len(psd_files) - errors} z {len(psd_files)} szablonów")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Single-image conversion shared by converter.py, converter_clean.py and
+service.py: the encoder settings and their manifest fingerprint, the worker
+initializer and `process_image`, which runs in the pool for every source
+(decode, dimension profile, encode cascade, manifest entry, report record).
+The scripts differ only in how they pick the files to convert.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# tracing.py is shared with the mockup tools in the parent folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import tracing
+
+import manifest
+from encoders import DEFAULT_FORMATS, ENCODERS
+from rate_control import build_quality_ladder
+from run_report import make_record
+from variants import Variant, encode_cascade, variant_path
+from decode import open_image
+from profiles import apply_profile, decode_limits
+from scheduler import configure_worker, peak_rss_bytes, reset_peak_rss
+
+
+TARGET_SIZE_KB = 125
+MAX_ITERATIONS = 14
+LOSSLESS_FIRST = True
+QUALITY_LADDER = build_quality_ladder(MAX_ITERATIONS)
+# Everything that changes the encoded output; a change re-encodes every file.
+ENCODER_SETTINGS = {
+    "format": "webp",
+    "target_size_kb": TARGET_SIZE_KB,
+    "quality_ladder": QUALITY_LADDER,
+    "lossless": LOSSLESS_FIRST,
+}
+SETTINGS_FINGERPRINT = manifest.settings_fingerprint(ENCODER_SETTINGS)
+
+
+def write_log(output_dir, source_path, final_size, final_quality, target_kb=TARGET_SIZE_KB):
+    """Appends a message to the log file. Only the parent process writes it."""
+    log_file_path = os.path.join(output_dir, "log.txt")
+    with open(log_file_path, "a") as f:
+        final_size_kb = round(final_size / 1024, 2)
+        f.write(
+            f"File '{source_path}' could not be compressed to {target_kb}kb. "
+            f"Saved with size: {final_size_kb}kb at quality: {final_quality}.\n"
+        )
+
+
+def log_oversize(output_dir, record):
+    """Writes the log.txt note for every output of a record that missed its budget."""
+    for output in record["outputs"]:
+        if not output["fits"]:
+            write_log(output_dir, Path(output_dir) / output["path"], output["bytes"],
+                      output["quality"], output["target_kb"])
+
+
+def init_worker(memory_limit_bytes, threads, trace_path=None):
+    """ProcessPoolExecutor initializer: ImageMagick limits and, with --trace, span recording."""
+    configure_worker(memory_limit_bytes, threads)
+    tracing.init_worker(trace_path)
+
+
+def process_image(source_path_str, input_dir_str, output_dir_str, search_mode="bisect",
+                  manifest_entry=None, force=False, variants=None, formats=DEFAULT_FORMATS, profile=None):
+    """
+    Processes a single image: converts it to WebP, attempting to get it
+    under TARGET_SIZE_KB. Returns (source, status, size_kb, encodes,
+    proxy_encodes, entry, record): full-size encodes and the cheap
+    downscaled-proxy encodes spent on the file, its new manifest entry
+    (None on error) and its run report record (see run_report.py).
+
+    With variants (from variants.parse_variants) one WebP per profile is
+    written from a single decode instead; size_kb and the encode counts
+    are then totals over all variants.
+
+    formats names the encoder backends (see encoders.py); with more than
+    one, each output is encoded in all of them and the smallest result
+    that fits the budget is kept.
+
+    profile (a profiles.DimensionProfile) caps the size of the decoded
+    image before anything is encoded.
+
+    If manifest_entry shows the source was already converted with the
+    current settings, the file is skipped before decoding unless force is set.
+    """
+    with tracing.span(Path(source_path_str).name, "file", source=source_path_str):
+        return _convert(source_path_str, input_dir_str, output_dir_str, search_mode,
+                        manifest_entry, force, variants, formats, profile)
+
+
+def _convert(source_path_str, input_dir_str, output_dir_str, search_mode,
+             manifest_entry, force, variants, formats, profile):
+    source_path = Path(source_path_str)
+    input_dir = Path(input_dir_str)
+    output_dir = Path(output_dir_str)
+    
+    relative_path = source_path.relative_to(input_dir)
+    output_path = output_dir / relative_path.with_suffix(".webp")
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    settings = dict(ENCODER_SETTINGS)
+    if tuple(formats) != DEFAULT_FORMATS:
+        settings["format"] = list(formats)
+    if variants:
+        settings["variants"] = [list(v) for v in variants]
+        # Profiles wider than the source are written once, named after the real width (variants.py)
+        settings["oversized_variants"] = "source_width"
+    else:
+        variants = [Variant("full", None, TARGET_SIZE_KB)]
+    if profile:
+        settings["profile"] = list(profile)
+    fingerprint = manifest.settings_fingerprint(settings)
+    encoders = [ENCODERS[name] for name in formats]
+
+    bytes_in = 0
+    try:
+        bytes_in = source_path.stat().st_size
+        with tracing.span("manifest check"):
+            source_hash = manifest.source_hash_for(manifest_entry, source_path)
+            # The suffix of earlier outputs depends on the format chosen then
+            recorded_output = output_dir / manifest_entry["output"] if manifest_entry else output_path
+            up_to_date = manifest.is_up_to_date(manifest_entry, source_hash, recorded_output, fingerprint)
+        if not force and up_to_date:
+            size_kb = round(
+                (manifest_entry["output_size"] + sum(manifest_entry.get("variants", {}).values())) / 1024, 2
+            )
+            status = "Skipped (unchanged)"
+            return (str(source_path), status, size_kb, 0, 0, manifest_entry, make_record(source_path, status, bytes_in))
+
+        statuses = []
+        output_paths = []
+        output_widths = {}
+        outputs = []
+        total_bytes = encodes = proxy_encodes = 0
+        encode_seconds = write_seconds = 0.0
+        reset_peak_rss()
+        started = time.perf_counter()
+        with tracing.span("decode", bytes=bytes_in):
+            # Decoded at a reduced scale when every output is narrower than the source (decode.py)
+            img = open_image(source_path, *decode_limits(profile, variants))
+        with img:
+            decoded_pixels = img.width * img.height
+            if profile:
+                with tracing.span("profile", profile=profile.name):
+                    apply_profile(img, profile)
+            decode_seconds = time.perf_counter() - started
+            mark = time.perf_counter()
+            for variant, encoder, result in encode_cascade(
+                img, variants, QUALITY_LADDER, search_mode, LOSSLESS_FIRST, encoders
+            ):
+                encode_seconds += time.perf_counter() - mark
+                variant_output = variant_path(output_path.with_suffix(encoder.suffix), variant)
+                mark = time.perf_counter()
+                with tracing.span("write", bytes=len(result.blob)):
+                    variant_output.write_bytes(result.blob)
+                write_seconds += time.perf_counter() - mark
+                output_paths.append(variant_output)
+                output_widths[variant_output] = variant.width
+                outputs.append({
+                    "path": variant_output.relative_to(output_dir).as_posix(),
+                    "variant": variant.name,
+                    "width": variant.width,
+                    "format": encoder.name,
+                    "bytes": len(result.blob),
+                    "quality": result.quality,
+                    "lossless": result.lossless,
+                    "fits": result.fits,
+                    "target_kb": variant.target_kb,
+                })
+                total_bytes += len(result.blob)
+                encodes += result.encodes
+                proxy_encodes += result.proxy_encodes
+                if result.lossless:
+                    status = "Success (Lossless)"
+                elif result.fits:
+                    status = f"Success (Q={result.quality})"
+                else:
+                    # Nothing fit the target, so the smallest version found was saved
+                    status = f"Warning ( oversize, Q={result.quality})"
+                if len(encoders) > 1:
+                    status = f"{status} [{encoder.name}]"
+                statuses.append(status if len(variants) == 1 else f"{variant.name}: {status}")
+                mark = time.perf_counter()
+
+        status = "; ".join(statuses)
+        entry = manifest.make_entry(
+            source_path, source_hash, output_paths[0], output_dir, fingerprint, status, output_paths[1:],
+            output_widths,
+        )
+        manifest.remove_replaced_outputs(manifest_entry, entry, output_dir)
+        record = make_record(
+            source_path, status, bytes_in, outputs, encodes, proxy_encodes,
+            decode_seconds, encode_seconds, write_seconds, decoded_pixels, peak_rss_bytes(),
+        )
+        return (str(source_path), status, round(total_bytes / 1024, 2), encodes, proxy_encodes, entry, record)
+
+    except Exception as e:
+        status = f"Error: {e}"
+        return (str(source_path), status, -1, 0, 0, None, make_record(source_path, status, bytes_in))
@@ -1,64 +1,47 @@
 import argparse
 import os
+import sys
+import time
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from threading import Lock
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
-from wand.image import Image
 from tqdm import tqdm
 
-TARGET_SIZE_KB = 125
-MAX_ITERATIONS = 14
-LOG_LOCK = Lock()
-
-def write_log(output_dir, source_path, final_size, final_quality):
-    """Appends a message to the log file in a thread-safe manner."""
-    with LOG_LOCK:
-        log_file_path = os.path.join(output_dir, "log.txt")
-        with open(log_file_path, "a") as f:
-            final_size_kb = round(final_size / 1024, 2)
-            f.write(
-                f"File '{source_path}' could not be compressed to {TARGET_SIZE_KB}kb. "
-                f"Saved with size: {final_size_kb}kb at quality: {final_quality}.\n"
-            )
+# tracing.py, csv_ingest.py and asset_catalog.py are shared with the mockup tools in the parent folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import tracing
+from asset_catalog import AssetCatalog
+from csv_ingest import IMAGES_COLUMN, iter_image_names
+
+import manifest
+from conversion import TARGET_SIZE_KB, init_worker, log_oversize, process_image
+from encoders import DEFAULT_FORMATS, parse_formats
+from rate_control import SEARCH_MODES
+from run_report import RunReport, default_report_path
+from profiles import decode_limits, load_profiles, profile_for
+from scheduler import MemoryScheduler, default_budget_bytes, worker_limits
+from variants import parse_variants
+
 
 def log_missing_files(output_dir, missing_files):
     """Logs the list of missing files to the log file."""
-    with LOG_LOCK:
-        log_file_path = os.path.join(output_dir, "log.txt")
-        with open(log_file_path, "a") as f:
-            f.write("\n--- Missing Files ---\n")
-            for filename in missing_files:
-                f.write(f"{filename}\n")
-            f.write("-- End Missing Files ---\n")
-
-def extract_filenames_from_csv(csv_path, column_name="Images"):
+    log_file_path = os.path.join(output_dir, "log.txt")
+    with open(log_file_path, "a") as f:
+        f.write("\n--- Missing Files ---\n")
+        for filename in missing_files:
+            f.write(f"{filename}\n")
+        f.write("-- End Missing Files ---\n")
+
+def extract_filenames_from_csv(csv_path, column_name=IMAGES_COLUMN):
     """
     Reads a CSV file and extracts a unique set of base filenames from image URLs
-    in the specified column.
+    in the specified column. The file is streamed row by row (csv_ingest.py).
     """
     try:
-        df = pd.read_csv(csv_path)
-        if column_name not in df.columns:
-            print(f"Error: Column '{column_name}' not found in {csv_path}")
-            return set()
-
-        filenames = set()
-        for _, row in df.iterrows():
-            cell_value = row[column_name]
-            if not isinstance(cell_value, str):
-                continue
-
-            urls = [url.strip() for url in cell_value.split(',')]
-            for url in urls:
-                if url:
-                    # Get the part after the last slash
-                    filename_with_ext = url.split('/')[-1]
-                    # Remove the .webp extension to get the base name
-                    base_name = filename_with_ext.replace('.webp', '')
-                    filenames.add(base_name)
-        return filenames
+        return set(iter_image_names(csv_path, column_name))
+    except ValueError:
+        print(f"Error: Column '{column_name}' not found in {csv_path}")
+        return set()
     except FileNotFoundError:
         print(f"Error: The file {csv_path} was not found.")
         return set()
@@ -68,86 +51,58 @@ def extract_filenames_from_csv(csv_path, column_name="Images"):
 
 def find_source_files(input_dir, target_basenames):
     """
-    Scans the input directory to find actual image files that match the target base names.
+    Finds the actual image files whose base name is exactly one of the target
+    base names. Candidates come from the incremental asset catalog
+    (asset_catalog.py, keyed case-insensitively) instead of a full rglob; the
+    exact, case-sensitive match is then applied to them.
     Returns a list of files to convert and a list of basenames that were not found.
     """
     files_to_convert = []
     found_basenames = set()
-    
-    all_files = list(Path(input_dir).rglob('*'))
-    
-    for p in all_files:
-        if p.is_file() and p.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-            base_name = p.stem
-            if base_name in target_basenames:
-                files_to_convert.append(str(p))
-                found_basenames.add(base_name)
-
-    missing_files = target_basenames - found_basenames
-    return files_to_convert, list(missing_files)
 
-def process_image(source_path_str, input_dir_str, output_dir_str):
-    """
-    Processes a single image: converts it to WebP, attempting to get it
-    under TARGET_SIZE_KB.
-    """
-    source_path = Path(source_path_str)
-    input_dir = Path(input_dir_str)
-    output_dir = Path(output_dir_str)
-    
-    relative_path = source_path.relative_to(input_dir)
-    output_path = output_dir / relative_path.with_suffix(".webp")
-    
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with AssetCatalog() as catalog:
+        catalog.refresh(input_dir, recursive=True)
+        matches = catalog.find_by_keys(input_dir, target_basenames)
 
-    try:
-        with Image(filename=str(source_path)) as img:
-            # 1. Try lossless compression first
-            with img.clone() as cloned_img:
-                cloned_img.format = 'webp'
-                cloned_img.options['webp:lossless'] = 'true'
-                blob = cloned_img.make_blob()
-                if len(blob) <= TARGET_SIZE_KB * 1024:
-                    output_path.write_bytes(blob)
-                    return (str(source_path), "Success (Lossless)", round(len(blob) / 1024, 2))
-
-            # 2. If lossless is too big, try iterative lossy compression
-            best_quality = -1
-            best_blob = None
-
-            for i in range(MAX_ITERATIONS):
-                quality = 95 - (i * 5)
-                if quality <= 0: break
-                
-                with img.clone() as cloned_img:
-                    cloned_img.format = 'webp'
-                    cloned_img.compression_quality = quality
-                    blob = cloned_img.make_blob()
-
-                if best_blob is None or len(blob) < len(best_blob):
-                    best_blob = blob
-                    best_quality = quality
-
-                if len(blob) <= TARGET_SIZE_KB * 1024:
-                    output_path.write_bytes(blob)
-                    return (str(source_path), f"Success (Q={quality})", round(len(blob) / 1024, 2))
-            
-            # 3. If still too big, save the smallest version found
-            if best_blob:
-                output_path.write_bytes(best_blob)
-                final_size = len(best_blob)
-                write_log(output_dir_str, source_path, final_size, best_quality)
-                return (str(source_path), f"Warning ( oversize, Q={best_quality})", round(final_size / 1024, 2))
+    for names in matches.values():
+        for name in names:
+            p = Path(name)
+            if p.suffix.lower() in ['.jpg', '.jpeg', '.png'] and p.stem in target_basenames:
+                files_to_convert.append(str(Path(input_dir) / name))
+                found_basenames.add(p.stem)
 
-    except Exception as e:
-        return (str(source_path), f"Error: {e}", -1)
-    
-    return (str(source_path), "Error: No suitable version found", -1)
+    missing_files = target_basenames - found_basenames
+    return files_to_convert, list(missing_files)
 
 def main():
     parser = argparse.ArgumentParser(description="Convert images to WebP with a target size based on a CSV file.")
     parser.add_argument("input_dir", help="Input directory containing images.")
     parser.add_argument("output_dir", help="Output directory to save converted images.")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="bisect",
+                        help="Quality search: 'bisect' (proxy-seeded rate control) or 'ladder' (linear, original).")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-encode every image, even if the manifest says it is unchanged.")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete outputs (and manifest entries) whose source no longer exists.")
+    parser.add_argument("--variants", default=None,
+                        help="Write one WebP per profile from a single decode, e.g. '2048,1200,600,thumb' "
+                             "or '2048:300,600:60' (width:KB). See variants.py.")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS),
+                        help="Output format(s): webp, avif, jxl, a comma-separated list or 'auto' (every format "
+                             "this ImageMagick can write). With several, the smallest output that fits is kept.")
+    parser.add_argument("--profiles", default=None, metavar="PROFILES.json",
+                        help="Dimension profiles per mockup family, applied right after decode "
+                             "(e.g. dimension_profiles.json). See profiles.py.")
+    parser.add_argument("--report", default=None,
+                        help="Run report path; .csv for CSV, anything else for JSONL "
+                             "(default: <output_dir>/conversion_report_<time>.jsonl).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of cores).")
+    parser.add_argument("--memory-budget-mb", type=int, default=None,
+                        help="RAM the running conversions may use together, estimated from image headers "
+                             "(default: 60%% of physical RAM).")
+    parser.add_argument("--trace", default=None, metavar="OUT.json",
+                        help="Record per-file and per-stage spans of every process to a Chrome/Perfetto trace file.")
     parser.add_argument("--csv_path", default="output.csv", help="Path to the CSV file.")
     args = parser.parse_args()
 
@@ -158,6 +113,40 @@ def main():
         print(f"Error: Input directory not found at '{args.input_dir}'")
         return
 
+    try:
+        formats = parse_formats(args.formats)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if formats != DEFAULT_FORMATS:
+        print(f"Formats: {', '.join(formats)} (smallest fitting output per image)")
+
+    variants = None
+    if args.variants:
+        try:
+            variants = parse_variants(args.variants, TARGET_SIZE_KB)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print("Variants: " + ", ".join(
+            f"{variant.name} ({variant.width or 'full'}px, {variant.target_kb}kb)" for variant in variants
+        ))
+
+    families = None
+    if args.profiles:
+        try:
+            families = load_profiles(args.profiles)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot load profiles from '{args.profiles}': {e}")
+            return
+        print("Dimension profiles: " + ", ".join(
+            f"{pattern} -> {profile.name} ({profile.max_width or '-'}x{profile.max_height or '-'})"
+            for pattern, profile in families
+        ))
+
+    def size_limits(img_path):
+        return decode_limits(profile_for(img_path, families), variants)
+
     # Phase 1: Extract filenames from CSV
     target_basenames = extract_filenames_from_csv(args.csv_path)
     if not target_basenames:
@@ -165,7 +154,8 @@ def main():
         return
 
     # Phase 2: Find source files and get user confirmation
-    image_files, missing_files = find_source_files(args.input_dir, target_basenames)
+    with tracing.span("scan", "parent", files=len(target_basenames)):
+        image_files, missing_files = find_source_files(args.input_dir, target_basenames)
 
     print(f"Found {len(image_files)} files to convert out of {len(target_basenames)} specified in the CSV.")
     if missing_files:
@@ -189,25 +179,96 @@ def main():
         output_path.mkdir(parents=True, exist_ok=True)
         log_missing_files(args.output_dir, missing_files)
 
+    workers = args.workers or os.cpu_count() or 1
+    if args.trace:
+        tracing.enable(args.trace, "converter")
+    budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else default_budget_bytes()
+    pool_options = {
+        "max_workers": workers,
+        "initializer": init_worker,
+        "initargs": (*worker_limits(budget, workers), args.trace),
+    }
+
+    entries = manifest.load_manifest(output_path)
+    if args.prune:
+        removed = manifest.prune_orphans(entries, input_path, output_path)
+        manifest.save_manifest(output_path, entries)
+        print(f"Pruned {len(removed)} outputs whose source no longer exists.")
+
     # Phase 3: Convert images
-    with ProcessPoolExecutor() as executor:
-        futures = [
-            executor.submit(process_image, img_path, str(input_path), str(output_path))
-            for img_path in image_files
-        ]
-        
+    report_path = args.report or default_report_path(output_path)
+    report = RunReport(report_path)
+
+    def submit(executor, img_path):
+        return executor.submit(
+            process_image, img_path, str(input_path), str(output_path), args.search,
+            entries.get(manifest.manifest_key(img_path, input_path)), args.force, variants, formats,
+            profile_for(img_path, families),
+        )
+
+    with ProcessPoolExecutor(**pool_options) as executor:
+        scheduler = MemoryScheduler(
+            lambda img_path: submit(executor, img_path), budget, 2 * workers, len(formats), bool(variants),
+            size_limits,
+        )
+        with tracing.span("queue", "parent", files=len(image_files)):
+            for img_path in image_files:
+                scheduler.add(img_path)
+
+        total_encodes = 0
+        total_proxy_encodes = 0
+        converted = 0
+        skipped = 0
         progress = tqdm(total=len(image_files), desc="Converting Images")
-        for future in as_completed(futures):
+        for future in scheduler.drain():
             try:
                 result = future.result()
                 # You can optionally use the result for more detailed logging
-                # print(f"Processed: {result[0]} -> {result[1]} ({result[2]} kb)")
+                # print(f"Processed: {result[0]} -> {result[1]} ({result[2]} kb, {result[3]} encodes)")
+                if result[5] is not None:
+                    entries[manifest.manifest_key(result[0], input_path)] = result[5]
+                report.add(result[6])
+                log_oversize(output_path, result[6])
+                if result[1] == "Skipped (unchanged)":
+                    skipped += 1
+                elif result[2] >= 0:
+                    converted += 1
+                    total_encodes += result[3]
+                    total_proxy_encodes += result[4]
             except Exception as e:
                 print(f"A task generated an exception: {e}")
             progress.update(1)
         progress.close()
 
+    manifest.save_manifest(output_path, entries)
+
     print("\nConversion complete.")
+    print(f"Peak estimated memory in flight: {scheduler.peak_committed / 1024 ** 2:.0f} MB "
+          f"of {budget / 1024 ** 2:.0f} MB budget ({workers} workers).")
+    if skipped:
+        print(f"Skipped {skipped} unchanged images (use --force to re-encode them).")
+    if converted:
+        print(
+            f"Full-size encodes: {total_encodes} for {converted} images "
+            f"({total_encodes / converted:.1f} per image, search: {args.search}); "
+            f"proxy encodes: {total_proxy_encodes}."
+        )
+    summary = report.close()
+    if summary["converted"]:
+        print(
+            f"Bytes: {summary['bytes_in'] / 1024 ** 2:.1f} MB in, {summary['bytes_out'] / 1024 ** 2:.1f} MB out "
+            f"({summary['savings_percent']}% saved); time per image p50/p90: "
+            f"{summary['total_seconds_p50']:.2f}s/{summary['total_seconds_p90']:.2f}s."
+        )
+    if summary["peak_rss_bytes_max"]:
+        print(
+            f"Worker peak memory per image p50/p90/max: {summary['peak_rss_bytes_p50'] / 1024 ** 2:.0f}/"
+            f"{summary['peak_rss_bytes_p90'] / 1024 ** 2:.0f}/{summary['peak_rss_bytes_max'] / 1024 ** 2:.0f} MB."
+        )
+    print(f"Run report: {report_path}")
+    trace_path = tracing.finish()
+    if trace_path:
+        print(f"Trace: {trace_path} (open in https://ui.perfetto.dev or chrome://tracing)")
     log_file = output_path / "log.txt"
     if log_file.exists():
         print(f"Some files could not be compressed to the target size or were missing. See '{log_file}' for details.")
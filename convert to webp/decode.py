@@ -0,0 +1,78 @@
+"""
+Bounded-memory decoding for the converters.
+
+A decoded image costs about 16 bytes per pixel in ImageMagick 7 (Q16 HDRI),
+so a print-resolution template export dominates a worker's memory even when
+every output the converter writes is far smaller. When the largest output
+is known in advance (responsive variants without 'full'), `open_image`
+passes ImageMagick the 'jpeg:size' hint: libjpeg then downsamples during
+the DCT (by up to 1/8; libjpeg-turbo also has the M/8 steps between) to
+the smallest scale that is still at least as large as that output, and the
+exact resize happens afterwards as before.
+Other formats have no such decoder shortcut and are decoded at full size.
+
+Only `open_image` needs Wand; it is imported there, so the size helpers
+also work where ImageMagick is not installed.
+"""
+
+import math
+from pathlib import Path
+
+JPEG_SUFFIXES = ('.jpg', '.jpeg')
+# Largest downscale libjpeg applies while decoding
+MAX_DCT_DENOMINATOR = 8
+
+
+def output_width_limit(variants):
+    """Widest output among `variants`, or None if one of them keeps the full size."""
+    if not variants or any(variant.width is None for variant in variants):
+        return None
+    return max(variant.width for variant in variants)
+
+
+def decode_size_hint(width, height, max_width=None, max_height=None):
+    """'WxH' the decoder may shrink a width x height image to, or None if it needs the full size."""
+    scale = 1.0
+    if max_width:
+        scale = min(scale, max_width / width)
+    if max_height:
+        scale = min(scale, max_height / height)
+    if scale >= 1.0:
+        return None
+    return f"{math.ceil(width * scale)}x{math.ceil(height * scale)}"
+
+
+def decoded_pixels(path, width, height, max_width=None, max_height=None):
+    """Pixels `open_image` will hold for a width x height source (an upper bound for JPEG)."""
+    if Path(path).suffix.lower() not in JPEG_SUFFIXES:
+        return width * height
+    scale = 1.0
+    if max_width:
+        scale = min(scale, max_width / width)
+    if max_height:
+        scale = min(scale, max_height / height)
+    # Only 1/2, 1/4 and 1/8 are assumed: for other ratios libjpeg-turbo decodes at
+    # the next M/8 above 1/N, which is never smaller than the power of two below N
+    denominator = 1
+    while denominator * 2 <= min(MAX_DCT_DENOMINATOR, 1 / scale):
+        denominator *= 2
+    return math.ceil(width / denominator) * math.ceil(height / denominator)
+
+
+def open_image(path, max_width=None, max_height=None):
+    """
+    Decodes `path`. With a size limit, JPEGs are decoded at a reduced
+    scale that still covers max_width x max_height (see the module docstring).
+    """
+    from wand.image import Image
+
+    path = str(path)
+    if (max_width or max_height) and Path(path).suffix.lower() in JPEG_SUFFIXES:
+        with Image.ping(filename=path) as header:
+            hint = decode_size_hint(header.width, header.height, max_width, max_height)
+        if hint:
+            img = Image()
+            img.options['jpeg:size'] = hint
+            img.read(filename=path)
+            return img
+    return Image(filename=path)
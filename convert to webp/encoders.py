@@ -0,0 +1,110 @@
+"""
+Encoder backends for the converters.
+
+Every backend turns a Wand image into a blob of its format at a given
+quality (or losslessly, where the format supports it through ImageMagick).
+Rate control (`rate_control.py`) works the same way for all of them, so the
+converters can target WebP, AVIF or JPEG XL, or encode several formats and
+keep the smallest result that fits the budget.
+
+Which formats work depends on the delegates the local ImageMagick was built
+with; `available_formats()` asks ImageMagick instead of assuming. Wand is
+imported there, so rate control can be tested without ImageMagick.
+"""
+
+
+class Encoder:
+    """A target format: ImageMagick coder name, file suffix and lossless switch."""
+
+    name = None
+    magick_format = None
+    suffix = None
+    supports_lossless = False
+
+    def prepare(self, img, quality, lossless):
+        """
+        Sets the format-specific options for one encode. Every option set
+        here must be set on every call, since trials reuse the same image.
+        """
+        img.compression_quality = quality
+
+    def encode(self, img, quality=None, lossless=False):
+        """
+        Encodes `img` and returns the blob. The format and options are set on
+        `img` itself instead of on a clone, so a quality search reuses one
+        decoded image; callers encoding concurrently need one image each.
+        """
+        img.format = self.magick_format
+        self.prepare(img, quality, lossless and self.supports_lossless)
+        return img.make_blob()
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class WebPEncoder(Encoder):
+    name = 'webp'
+    magick_format = 'webp'
+    suffix = '.webp'
+    supports_lossless = True
+
+    def prepare(self, img, quality, lossless):
+        img.options['webp:lossless'] = 'true' if lossless else 'false'
+        if not lossless:
+            img.compression_quality = quality
+
+
+class AvifEncoder(Encoder):
+    # ImageMagick writes AVIF through its HEIC coder (libheif); lossless AVIF
+    # is not exposed consistently across versions, so only lossy is used.
+    name = 'avif'
+    magick_format = 'avif'
+    suffix = '.avif'
+
+
+class JxlEncoder(Encoder):
+    name = 'jxl'
+    magick_format = 'jxl'
+    suffix = '.jxl'
+    supports_lossless = True
+
+    def prepare(self, img, quality, lossless):
+        # The JXL coder maps quality 100 to lossless (distance 0)
+        img.compression_quality = 100 if lossless else quality
+
+
+ENCODERS = {encoder.name: encoder for encoder in (WebPEncoder(), AvifEncoder(), JxlEncoder())}
+DEFAULT_FORMATS = ('webp',)
+
+
+def available_formats():
+    """Names of the backends the local ImageMagick can write, in ENCODERS order."""
+    from wand.version import formats as magick_formats
+
+    supported = {name.lower() for name in magick_formats('*')}
+    return [name for name, encoder in ENCODERS.items() if encoder.magick_format in supported]
+
+
+def parse_formats(spec):
+    """
+    Parses a `--formats` string ('webp', 'webp,avif', 'auto') into backend
+    names. 'auto' means every available backend. Raises ValueError on
+    unknown or unavailable formats.
+    """
+    available = available_formats()
+    if spec.strip().lower() == 'auto':
+        names = available
+    else:
+        names = []
+        for token in (part.strip().lower() for part in spec.split(',')):
+            if not token:
+                continue
+            if token not in ENCODERS:
+                raise ValueError(f"Unknown format: '{token}' (known: {', '.join(ENCODERS)})")
+            if token not in available:
+                raise ValueError(f"This ImageMagick build cannot write '{token}'")
+            if token not in names:
+                names.append(token)
+    if not names:
+        raise ValueError("No usable output format")
+    return tuple(names)
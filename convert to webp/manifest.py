@@ -0,0 +1,159 @@
+"""
+Content-addressed conversion manifest for the WebP converters.
+
+The manifest lives in the output directory and maps every converted source
+(by its path relative to the input directory) to the hash of its content,
+the fingerprint of the encoder settings used and the output it produced. A
+source whose hash and settings match its entry, and whose output is still on
+disk, does not need to be decoded or encoded again.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = ".webp_manifest.json"
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def settings_fingerprint(settings):
+    """Returns a short stable hash of an encoder settings dict."""
+    payload = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def file_digest(path):
+    """Returns the SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_key(source_path, input_dir):
+    """Returns the manifest key of a source: its POSIX path relative to input_dir."""
+    return Path(source_path).relative_to(input_dir).as_posix()
+
+
+def load_manifest(output_dir):
+    """Loads the manifest entries from output_dir, or an empty dict if there are none."""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Warning: Ignoring unreadable manifest '{manifest_path}': {e}")
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_manifest(output_dir, entries):
+    """Writes the manifest atomically so an interrupted run never leaves it truncated."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "entries": entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def source_hash_for(entry, source_path):
+    """
+    Returns the content hash of source_path.
+
+    When the file's size and mtime still match the manifest entry the stored
+    hash is reused, so unchanged sources are not even read.
+    """
+    stat = os.stat(source_path)
+    if entry and entry.get("source_size") == stat.st_size and entry.get("source_mtime_ns") == stat.st_mtime_ns:
+        return entry["source_hash"]
+    return file_digest(source_path)
+
+
+def is_up_to_date(entry, source_hash, output_path, fingerprint):
+    """
+    True if entry describes source_hash encoded with these settings and its
+    output (and every variant output next to it) still exists.
+    """
+    if not entry:
+        return False
+    if entry.get("source_hash") != source_hash or entry.get("settings") != fingerprint:
+        return False
+    expected = {Path(output_path): entry.get("output_size")}
+    for name, size in entry.get("variants", {}).items():
+        expected[Path(output_path).parent / name] = size
+    try:
+        return all(os.path.getsize(path) == size for path, size in expected.items())
+    except OSError:
+        return False
+
+
+def make_entry(source_path, source_hash, output_path, output_dir, fingerprint, status, variant_paths=(),
+               widths=None):
+    """
+    Builds the manifest entry for a freshly converted source. variant_paths
+    are further outputs of the same source, written next to output_path;
+    widths maps output paths to their pixel width.
+    """
+    stat = os.stat(source_path)
+    entry = {
+        "source_hash": source_hash,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "settings": fingerprint,
+        "output": Path(output_path).relative_to(output_dir).as_posix(),
+        "output_size": os.path.getsize(output_path),
+        "status": status,
+    }
+    if variant_paths:
+        entry["variants"] = {Path(path).name: os.path.getsize(path) for path in variant_paths}
+    if widths:
+        entry["widths"] = {Path(path).name: width for path, width in widths.items()}
+    return entry
+
+
+def remove_replaced_outputs(old_entry, new_entry, output_dir):
+    """
+    Deletes outputs listed in old_entry that new_entry no longer lists, e.g.
+    a .webp replaced by a smaller .avif. Returns the list of removed paths.
+    """
+    if not old_entry:
+        return []
+
+    def outputs(entry):
+        output_path = Path(output_dir) / entry["output"]
+        return {output_path} | {output_path.parent / name for name in entry.get("variants", {})}
+
+    removed = []
+    for path in outputs(old_entry) - outputs(new_entry):
+        if path.exists():
+            path.unlink()
+            removed.append(str(path))
+    return removed
+
+
+def prune_orphans(entries, input_dir, output_dir):
+    """
+    Deletes outputs whose source no longer exists in input_dir and drops
+    their entries. Returns the list of removed output paths.
+    """
+    removed = []
+    for key in list(entries):
+        if (Path(input_dir) / key).exists():
+            continue
+        output_path = Path(output_dir) / entries[key]["output"]
+        paths = [output_path] + [output_path.parent / name for name in entries[key].get("variants", {})]
+        for path in paths:
+            if path.exists():
+                path.unlink()
+                removed.append(str(path))
+        del entries[key]
+    return removed
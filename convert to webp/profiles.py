@@ -0,0 +1,111 @@
+"""
+Output dimension profiles, applied once right after decode.
+
+Photoshop writes the mockups at the template's native size, while the site
+never shows them wider than a fixed width. Encoding those extra pixels only
+makes every step of the quality search slower and spends the size target on
+detail the browser scales away. A profile caps the size of everything the
+converter encodes (the full-size output and the source of the variants):
+
+    max_width, max_height  bounding box; smaller images are left as they are
+    filter                 resampling filter (an ImageMagick filter name)
+    sharpen                unsharp-mask amount after downscaling, 0 for none
+
+Profiles are chosen per mockup family from a JSON file (see
+dimension_profiles.json):
+
+    {
+      "profiles": {
+        "apparel": {"max_width": 1600, "max_height": 1600, "filter": "lanczos", "sharpen": 0.4}
+      },
+      "families": {"*closeup*": "closeup", "t-shirt*": "apparel", "hoodie_*": "apparel"}
+    }
+
+Family patterns (fnmatch, case-insensitive) use the mockup names of
+config.json. Output files are named '<input>_<mockup>', so a pattern is
+matched against every '_'-separated tail of the file name and the whole
+name: 'hoodie_*' matches '1kor13_hoodie_navy_front.jpg'. Families are
+tried in file order and the first match wins; files matching none keep
+their size.
+"""
+
+import json
+from collections import namedtuple
+from fnmatch import fnmatch
+from pathlib import Path
+
+from wand.image import FILTER_TYPES
+
+from decode import output_width_limit
+
+DimensionProfile = namedtuple('DimensionProfile', ['name', 'max_width', 'max_height', 'filter', 'sharpen'])
+
+DEFAULT_FILTER = 'lanczos'
+# Unsharp-mask sigma for the sharpen amount; the radius is left to ImageMagick
+SHARPEN_SIGMA = 0.8
+
+
+def _parse_profile(name, data):
+    max_width = data.get('max_width')
+    max_height = data.get('max_height')
+    if max_width is None and max_height is None:
+        raise ValueError(f"Profile '{name}' needs max_width and/or max_height")
+    for value in (max_width, max_height):
+        if value is not None and (not isinstance(value, int) or value <= 0):
+            raise ValueError(f"Profile '{name}': sizes must be positive integers, got {value!r}")
+    filter_type = data.get('filter', DEFAULT_FILTER)
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Profile '{name}': unknown filter '{filter_type}'")
+    sharpen = float(data.get('sharpen', 0))
+    if sharpen < 0:
+        raise ValueError(f"Profile '{name}': sharpen must not be negative")
+    return DimensionProfile(name, max_width, max_height, filter_type, sharpen)
+
+
+def load_profiles(path):
+    """
+    Reads a profiles file and returns its families as an ordered list of
+    (pattern, DimensionProfile). Raises ValueError for invalid entries.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    profiles = {name: _parse_profile(name, spec) for name, spec in data.get('profiles', {}).items()}
+    families = []
+    for pattern, name in data.get('families', {}).items():
+        if name not in profiles:
+            raise ValueError(f"Family '{pattern}' uses unknown profile '{name}'")
+        families.append((pattern.lower(), profiles[name]))
+    return families
+
+
+def profile_for(path, families):
+    """The profile of the first family matching `path`'s name, or None."""
+    if not families:
+        return None
+    parts = Path(path).stem.lower().split('_')
+    names = ['_'.join(parts[i:]) for i in range(len(parts))]
+    for pattern, profile in families:
+        if any(fnmatch(name, pattern) for name in names):
+            return profile
+    return None
+
+
+def decode_limits(profile, variants):
+    """(max_width, max_height) the decoder may shrink to: the profile's box and the widest variant."""
+    widths = [width for width in (profile.max_width if profile else None, output_width_limit(variants)) if width]
+    return (min(widths) if widths else None), (profile.max_height if profile else None)
+
+
+def apply_profile(img, profile):
+    """Fits `img` into the profile's box in place. Returns True if it was resized."""
+    scale = 1.0
+    if profile.max_width:
+        scale = min(scale, profile.max_width / img.width)
+    if profile.max_height:
+        scale = min(scale, profile.max_height / img.height)
+    if scale >= 1.0:
+        return False
+    img.resize(max(1, round(img.width * scale)), max(1, round(img.height * scale)), filter=profile.filter)
+    if profile.sharpen:
+        img.unsharp_mask(radius=0.0, sigma=SHARPEN_SIGMA, amount=profile.sharpen, threshold=0.0)
+    return True
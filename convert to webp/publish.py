@@ -0,0 +1,354 @@
+"""
+Publish stage: sync converted images to the uploads tree.
+
+The site serves the converted images from wp-content/uploads/my-images/art/.
+`publish.py` compares the converter's output directory with a target store
+and transfers only new or changed files:
+
+- the target keeps a manifest (.publish_manifest.json at its root) with the
+  size and SHA-256 of every published file, so the comparison costs one read
+  instead of a listing plus a download per file; --verify additionally lists
+  the target and re-sends files that are missing or have the wrong size,
+- local hashes are cached by size and mtime in the output directory
+  (.publish_cache.json), so unchanged outputs are not re-read either,
+- transfers run on a bounded thread pool; the S3 client keeps a connection
+  pool of the same size and every transfer is retried with backoff
+  (with_retries is the only retry layer: botocore's own retries are off),
+- the manifest is written after the transfers (also after an interrupted
+  run), so the next run resumes with what is already on the target.
+
+Targets are pluggable: a local directory (a mounted uploads folder) or an
+S3-compatible bucket (boto3 is needed only for this one):
+
+    python publish.py output_webp /var/www/wp-content/uploads/my-images/art
+    python publish.py output_webp s3://media/my-images/art --endpoint-url http://localhost:9000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+try:
+    import boto3
+    from botocore.config import Config
+except ImportError:  # only needed for s3:// targets
+    boto3 = None
+
+MANIFEST_NAME = ".publish_manifest.json"
+CACHE_NAME = ".publish_cache.json"
+# Outputs of the encoder backends (encoders.py); logs and reports stay local.
+PUBLISH_SUFFIXES = ('.webp', '.avif', '.jxl')
+CONTENT_TYPES = {'.webp': 'image/webp', '.avif': 'image/avif', '.jxl': 'image/jxl'}
+DEFAULT_WORKERS = 16
+RETRIES = 4
+RETRY_BACKOFF_SECONDS = 0.5
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    """Returns the SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def with_retries(action, attempts=RETRIES, backoff=RETRY_BACKOFF_SECONDS):
+    """Calls action(), retrying failures with exponential backoff; the last error is raised."""
+    for attempt in range(attempts):
+        try:
+            return action()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+class LocalTarget:
+    """A directory on a local or mounted filesystem."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def __str__(self):
+        return str(self.root)
+
+    def read_manifest(self):
+        try:
+            return (self.root / MANIFEST_NAME).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write_manifest(self, data):
+        self._write(self.root / MANIFEST_NAME, lambda tmp: tmp.write_bytes(data))
+
+    def list(self):
+        """Returns {relative path: size} of every file on the target."""
+        listing = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = Path(directory) / name
+                relative = path.relative_to(self.root).as_posix()
+                if not name.startswith('.'):
+                    listing[relative] = path.stat().st_size
+        return listing
+
+    def put(self, source_path, relative):
+        target = self.root / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self._write(target, lambda tmp: shutil.copyfile(source_path, tmp))
+
+    def delete(self, relative):
+        try:
+            (self.root / relative).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write(path, writer):
+        # Write under a temporary name so the web server never serves a partial file.
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+
+
+class S3Target:
+    """A prefix in an S3-compatible bucket (AWS, MinIO, ...)."""
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, workers=DEFAULT_WORKERS):
+        if boto3 is None:
+            raise RuntimeError("boto3 is required for s3:// targets (pip install boto3)")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        # One client shared by all threads, with a connection pool as large as the worker pool.
+        # A single attempt per call: publish() retries every transfer with with_retries.
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, config=Config(
+            max_pool_connections=workers, retries={"total_max_attempts": 1, "mode": "standard"},
+        ))
+
+    def __str__(self):
+        return f"s3://{self.bucket}/{self.prefix}"
+
+    def _key(self, relative):
+        return f"{self.prefix}/{relative}" if self.prefix else relative
+
+    def read_manifest(self):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(MANIFEST_NAME))["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def write_manifest(self, data):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(MANIFEST_NAME), Body=data,
+                               ContentType="application/json")
+
+    def list(self):
+        listing = {}
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.prefix}/" if self.prefix else ""):
+            for item in page.get("Contents", []):
+                relative = item["Key"][strip:]
+                if not Path(relative).name.startswith('.'):
+                    listing[relative] = item["Size"]
+        return listing
+
+    def put(self, source_path, relative):
+        content_type = CONTENT_TYPES.get(Path(relative).suffix.lower(), "application/octet-stream")
+        with open(source_path, "rb") as f:
+            self.client.put_object(Bucket=self.bucket, Key=self._key(relative), Body=f, ContentType=content_type)
+
+    def delete(self, relative):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(relative))
+
+
+def open_target(spec, endpoint_url=None, workers=DEFAULT_WORKERS):
+    """Returns the target for `spec`: s3://bucket/prefix or a directory path."""
+    if spec.startswith("s3://"):
+        bucket, _, prefix = spec[len("s3://"):].partition("/")
+        return S3Target(bucket, prefix, endpoint_url, workers)
+    return LocalTarget(spec)
+
+
+def load_manifest(target):
+    """Returns the target's {relative path: {"size", "sha256"}}, or {} if it has none."""
+    data = target.read_manifest()
+    if not data:
+        return {}
+    try:
+        return json.loads(data).get("files", {})
+    except (json.JSONDecodeError, AttributeError):
+        print(f"Warning: Ignoring unreadable publish manifest on {target}")
+        return {}
+
+
+def save_manifest(target, files):
+    target.write_manifest(json.dumps({"files": files}, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def local_files(output_dir, workers=DEFAULT_WORKERS):
+    """
+    Returns {relative path: {"size", "sha256"}} of the publishable files in
+    output_dir. Hashes of files whose size and mtime are unchanged come from
+    the cache; the rest are hashed on the thread pool.
+    """
+    output_dir = Path(output_dir)
+    cache_path = output_dir / CACHE_NAME
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    stats = {}
+    for directory, dirnames, names in os.walk(output_dir):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        for name in names:
+            if name.startswith('.') or Path(name).suffix.lower() not in PUBLISH_SUFFIXES:
+                continue
+            path = Path(directory) / name
+            stats[path.relative_to(output_dir).as_posix()] = path.stat()
+
+    def cached_or_hash(relative):
+        stat = stats[relative]
+        entry = cache.get(relative)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        return file_digest(output_dir / relative)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = dict(zip(stats, executor.map(cached_or_hash, stats)))
+
+    cache = {
+        relative: {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digests[relative]}
+        for relative, stat in stats.items()
+    }
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+    return {relative: {"size": stats[relative].st_size, "sha256": digests[relative]} for relative in stats}
+
+
+def plan_publish(local, remote, listing=None):
+    """
+    Returns (to_upload, to_delete): local files whose size or hash differs from
+    the target manifest, and manifest entries without a local file. With a
+    listing of the target, files missing there or of a different size are
+    uploaded even if the manifest lists them.
+    """
+    to_upload = []
+    for relative, info in local.items():
+        published = remote.get(relative)
+        if published != info or (listing is not None and listing.get(relative) != info["size"]):
+            to_upload.append(relative)
+    to_delete = [relative for relative in remote if relative not in local]
+    return sorted(to_upload), sorted(to_delete)
+
+
+def publish(output_dir, target, workers=DEFAULT_WORKERS, verify=False, delete=False, dry_run=False):
+    """Syncs output_dir to target. Returns a stats dict."""
+    started = time.perf_counter()
+    local = local_files(output_dir, workers)
+    remote = load_manifest(target)
+    listing = target.list() if verify else None
+    to_upload, to_delete = plan_publish(local, remote, listing)
+    stats = {"local": len(local), "uploaded": 0, "deleted": 0, "unchanged": len(local) - len(to_upload),
+             "failed": [], "bytes": 0, "to_upload": to_upload, "to_delete": to_delete if delete else []}
+    if dry_run:
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(with_retries, lambda relative=relative: target.put(Path(output_dir) / relative, relative)):
+                    relative
+                for relative in to_upload
+            }
+            for future in as_completed(futures):
+                relative = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    stats["failed"].append((relative, str(e)))
+                    continue
+                remote[relative] = local[relative]
+                stats["uploaded"] += 1
+                stats["bytes"] += local[relative]["size"]
+
+            if delete:
+                futures = {
+                    executor.submit(with_retries, lambda relative=relative: target.delete(relative)): relative
+                    for relative in to_delete
+                }
+                for future in as_completed(futures):
+                    relative = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        stats["failed"].append((relative, str(e)))
+                        continue
+                    del remote[relative]
+                    stats["deleted"] += 1
+    finally:
+        # Also after a failure or Ctrl+C: the manifest then lists exactly what was published.
+        with_retries(lambda: save_manifest(target, remote))
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish converted images to the uploads tree (only changed files).")
+    parser.add_argument("output_dir", help="Converter output directory (e.g. output_webp).")
+    parser.add_argument("target", help="Target: a directory, or s3://bucket/prefix for an S3-compatible store.")
+    parser.add_argument("--endpoint-url", default=os.environ.get("S3_ENDPOINT_URL"),
+                        help="S3 endpoint for MinIO and other S3-compatible servers (default: $S3_ENDPOINT_URL).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Concurrent transfers (and S3 connections).")
+    parser.add_argument("--verify", action="store_true",
+                        help="Also list the target and re-send files that are missing there or have the wrong size.")
+    parser.add_argument("--delete", action="store_true",
+                        help="Delete published files that no longer exist locally.")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be transferred.")
+    args = parser.parse_args()
+
+    if not Path(args.output_dir).is_dir():
+        print(f"Error: Output directory not found at '{args.output_dir}'")
+        return
+
+    try:
+        target = open_target(args.target, args.endpoint_url, args.workers)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return
+
+    print(f"Publishing '{args.output_dir}' -> {target}")
+    stats = publish(args.output_dir, target, args.workers, args.verify, args.delete, args.dry_run)
+
+    if args.dry_run:
+        for relative in stats["to_upload"]:
+            print(f"  upload  {relative}")
+        for relative in stats["to_delete"]:
+            print(f"  delete  {relative}")
+    for relative, message in stats["failed"]:
+        print(f"  FAILED  {relative}: {message}")
+
+    action = "Would upload" if args.dry_run else "Uploaded"
+    print(f"\n{action} {len(stats['to_upload']) if args.dry_run else stats['uploaded']} of {stats['local']} files "
+          f"({stats['bytes'] / 1024 / 1024:.1f} MB), unchanged: {stats['unchanged']}, "
+          f"deleted: {len(stats['to_delete']) if args.dry_run else stats['deleted']}, "
+          f"failed: {len(stats['failed'])}, time: {stats['seconds']:.2f}s")
+    if stats["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
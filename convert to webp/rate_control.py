@@ -0,0 +1,227 @@
+"""
+Rate control shared by converter.py and converter_clean.py.
+
+The original search tried a lossless encode and then walked the quality
+ladder from 95 down in steps of 5, re-encoding the full-resolution image at
+every step. `encode_to_target` keeps the same ladder and returns the same
+answer (the highest ladder quality whose output fits the budget, or the
+smallest output if none does), but with far fewer full-size encodes:
+
+1. A downscaled proxy is encoded to predict the full-size byte counts.
+2. Lossless is only attempted when the proxy says it could plausibly fit.
+3. The ladder is searched outwards from the predicted quality and then
+   bisected, instead of being walked linearly.
+
+The search is format-agnostic: `encoder` selects the backend from
+`encoders.py` (WebP by default), and `encode_smallest` runs it for several
+backends at once and keeps the smallest result that fits.
+
+With `--trace`, the proxy prediction, the lossless attempt and the quality
+search show up as separate spans (see tracing.py in the parent folder).
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from encoders import ENCODERS
+
+# Longest side of the proxy used to predict full-size encode sizes.
+PROXY_MAX_SIDE = 512
+# Lossless is skipped when the proxy predicts it to be this many times over
+# budget. Downscaled images compress worse per pixel, so the prediction
+# overestimates and the margin can stay generous.
+LOSSLESS_SKIP_MARGIN = 4.0
+
+SEARCH_MODES = ('bisect', 'ladder')
+
+EncodeResult = namedtuple(
+    'EncodeResult', ['blob', 'quality', 'lossless', 'fits', 'encodes', 'proxy_encodes']
+)
+
+
+def build_quality_ladder(max_iterations, start=95, step=5):
+    """Returns the qualities the converters may use, in ascending order."""
+    qualities = [start - i * step for i in range(max_iterations)]
+    return sorted(q for q in qualities if q > 0)
+
+
+def search_ladder(fits, size, start):
+    """
+    Returns the largest index in range(size) for which `fits` is true, or -1.
+
+    `fits` must be monotone: true up to some index and false after it. The
+    search gallops away from `start` until the boundary is bracketed and then
+    bisects, so a good starting guess costs two or three probes.
+    """
+    start = min(max(start, 0), size - 1)
+    if fits(start):
+        lo, hi = start, size
+        step = 1
+        probe = start + 1
+        while probe < size:
+            if not fits(probe):
+                hi = probe
+                break
+            lo = probe
+            step *= 2
+            probe = lo + step
+    else:
+        lo, hi = -1, start
+        step = 1
+        probe = start - 1
+        while probe >= 0:
+            if fits(probe):
+                lo = probe
+                break
+            hi = probe
+            step *= 2
+            probe = hi - step
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _predict_start(img, target_bytes, ladder, allow_lossless, encoder):
+    """
+    Encodes a downscaled proxy of `img` and predicts the full-size results.
+
+    Returns (lossless_may_fit, start_index, proxy_encodes). Images already
+    smaller than the proxy are not predicted: lossless is always tried and
+    the search starts at the top of the ladder.
+    """
+    width, height = img.width, img.height
+    longest = max(width, height)
+    if longest <= PROXY_MAX_SIDE:
+        return True, len(ladder) - 1, 0
+
+    scale = PROXY_MAX_SIDE / float(longest)
+    proxy_width = max(1, int(round(width * scale)))
+    proxy_height = max(1, int(round(height * scale)))
+    pixel_ratio = (width * height) / float(proxy_width * proxy_height)
+
+    proxy_encodes = 0
+    with tracing.span("proxy", format=encoder.name), img.clone() as proxy:
+        proxy.resize(proxy_width, proxy_height, filter='triangle')
+
+        lossless_may_fit = False
+        if allow_lossless:
+            proxy_encodes += 1
+            lossless_estimate = len(encoder.encode(proxy, lossless=True)) * pixel_ratio
+            lossless_may_fit = lossless_estimate <= target_bytes * LOSSLESS_SKIP_MARGIN
+
+        def proxy_fits(index):
+            nonlocal proxy_encodes
+            proxy_encodes += 1
+            blob = encoder.encode(proxy, quality=ladder[index])
+            return len(blob) * pixel_ratio <= target_bytes
+
+        predicted = search_ladder(proxy_fits, len(ladder), len(ladder) // 2)
+
+    return lossless_may_fit, max(predicted, 0), proxy_encodes
+
+
+def _encode_ladder(img, target_bytes, ladder, allow_lossless, encoder):
+    """The original linear search: lossless, then every quality from the top."""
+    encodes = 0
+    if allow_lossless:
+        encodes += 1
+        with tracing.span("lossless", format=encoder.name):
+            blob = encoder.encode(img, lossless=True)
+        if len(blob) <= target_bytes:
+            return EncodeResult(blob, None, True, True, encodes, 0)
+
+    best_blob, best_quality = None, -1
+    with tracing.span("quality search", format=encoder.name, mode="ladder"):
+        for quality in reversed(ladder):
+            encodes += 1
+            blob = encoder.encode(img, quality=quality)
+            if best_blob is None or len(blob) < len(best_blob):
+                best_blob, best_quality = blob, quality
+            if len(blob) <= target_bytes:
+                return EncodeResult(blob, quality, False, True, encodes, 0)
+    return EncodeResult(best_blob, best_quality, False, False, encodes, 0)
+
+
+def encode_to_target(img, target_bytes, ladder, mode='bisect', allow_lossless=True, encoder=None):
+    """
+    Encodes `img` with `encoder` (WebP if None) under `target_bytes` if
+    possible.
+
+    Lossless wins when it fits (and `allow_lossless` is set); otherwise the
+    highest quality from `ladder` that fits is used. If nothing fits, the
+    smallest encode tried is returned with `fits` set to False.
+    `mode='ladder'` runs the original linear search, which is kept for
+    comparison.
+    """
+    encoder = encoder or ENCODERS['webp']
+    allow_lossless = allow_lossless and encoder.supports_lossless
+    if mode == 'ladder':
+        return _encode_ladder(img, target_bytes, ladder, allow_lossless, encoder)
+    if mode != 'bisect':
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    lossless_may_fit, start, proxy_encodes = _predict_start(img, target_bytes, ladder, allow_lossless, encoder)
+
+    encodes = 0
+    if allow_lossless and lossless_may_fit:
+        encodes += 1
+        with tracing.span("lossless", format=encoder.name):
+            blob = encoder.encode(img, lossless=True)
+        if len(blob) <= target_bytes:
+            return EncodeResult(blob, None, True, True, encodes, proxy_encodes)
+
+    blobs = {}
+
+    def fits(index):
+        nonlocal encodes
+        encodes += 1
+        blobs[index] = encoder.encode(img, quality=ladder[index])
+        return len(blobs[index]) <= target_bytes
+
+    with tracing.span("quality search", format=encoder.name, mode="bisect", start=ladder[start]):
+        found = search_ladder(fits, len(ladder), start)
+    if found >= 0:
+        return EncodeResult(blobs[found], ladder[found], False, True, encodes, proxy_encodes)
+
+    smallest = min(blobs, key=lambda index: len(blobs[index]))
+    return EncodeResult(blobs[smallest], ladder[smallest], False, False, encodes, proxy_encodes)
+
+
+def encode_smallest(img, target_bytes, ladder, encoders, mode='bisect', allow_lossless=True):
+    """
+    Runs `encode_to_target` for every backend in `encoders` and returns
+    (encoder, EncodeResult) of the smallest result that fits the budget, or
+    of the smallest result overall if none fits. With several backends the
+    searches run in threads (ImageMagick releases the GIL while encoding),
+    each on its own clone of the decoded image (clones share the pixel
+    cache; each thread needs its own format and quality settings). The
+    returned result counts the encodes of all backends.
+    """
+    if len(encoders) == 1:
+        return encoders[0], encode_to_target(img, target_bytes, ladder, mode, allow_lossless, encoders[0])
+
+    clones = [img.clone() for _ in encoders]
+    try:
+        with ThreadPoolExecutor(max_workers=len(encoders)) as executor:
+            futures = [
+                executor.submit(encode_to_target, clone, target_bytes, ladder, mode, allow_lossless, encoder)
+                for clone, encoder in zip(clones, encoders)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        for clone in clones:
+            clone.close()
+
+    candidates = list(zip(encoders, results))
+    fitting = [candidate for candidate in candidates if candidate[1].fits]
+    encoder, best = min(fitting or candidates, key=lambda candidate: len(candidate[1].blob))
+    return encoder, best._replace(
+        encodes=sum(result.encodes for result in results),
+        proxy_encodes=sum(result.proxy_encodes for result in results),
+    )
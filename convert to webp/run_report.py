@@ -0,0 +1,151 @@
+"""
+Machine-readable run report for the converters.
+
+Workers return one record per source file; the parent process is the only
+writer, so no cross-process locking is needed. Records are written as they
+arrive (a watch run that is interrupted still leaves a usable report) and a
+summary with totals, percentiles and savings is added at the end.
+
+    JSONL: one {"type": "file", ...} object per source, then one
+           {"type": "summary", ...} object.
+    CSV:   one row per source; the summary goes to <report>.summary.json.
+"""
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+
+REPORT_FORMATS = ("jsonl", "csv")
+CSV_FIELDS = [
+    "source", "status", "outputs", "formats", "qualities", "bytes_in", "bytes_out",
+    "encodes", "proxy_encodes", "decode_seconds", "encode_seconds", "write_seconds", "total_seconds",
+    "decoded_pixels", "peak_rss_bytes",
+]
+PERCENTILES = (50, 90, 99)
+
+
+def default_report_path(output_dir, fmt="jsonl"):
+    stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return Path(output_dir) / f"conversion_report_{stamp}.{fmt}"
+
+
+def make_record(source_path, status, bytes_in, outputs=(), encodes=0, proxy_encodes=0,
+                decode_seconds=0.0, encode_seconds=0.0, write_seconds=0.0, decoded_pixels=None,
+                peak_rss_bytes=None):
+    """
+    Builds the report record of one source. outputs is a list of dicts with
+    path, variant, width, format, bytes, quality, lossless, fits and
+    target_kb. decoded_pixels is the size the source was decoded at,
+    peak_rss_bytes the worker's peak resident memory while converting it.
+    """
+    return {
+        "source": str(source_path),
+        "status": status,
+        "bytes_in": bytes_in,
+        "bytes_out": sum(output["bytes"] for output in outputs),
+        "outputs": list(outputs),
+        "encodes": encodes,
+        "proxy_encodes": proxy_encodes,
+        "decode_seconds": round(decode_seconds, 4),
+        "encode_seconds": round(encode_seconds, 4),
+        "write_seconds": round(write_seconds, 4),
+        "total_seconds": round(decode_seconds + encode_seconds + write_seconds, 4),
+        "decoded_pixels": decoded_pixels,
+        "peak_rss_bytes": peak_rss_bytes,
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(records, wall_seconds):
+    """Totals, percentiles and savings over the file records of a run."""
+    converted = [r for r in records if r["status"].startswith(("Success", "Warning"))]
+    skipped = [r for r in records if r["status"].startswith("Skipped")]
+    errors = [r for r in records if r["status"].startswith("Error")]
+    oversize = [r for r in converted if any(not output["fits"] for output in r["outputs"])]
+    bytes_in = sum(r["bytes_in"] for r in converted)
+    bytes_out = sum(r["bytes_out"] for r in converted)
+
+    summary = {
+        "type": "summary",
+        "finished": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "wall_seconds": round(wall_seconds, 2),
+        "files": len(records),
+        "converted": len(converted),
+        "skipped": len(skipped),
+        "errors": len(errors),
+        "oversize": len(oversize),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "bytes_saved": bytes_in - bytes_out,
+        "savings_percent": round((1 - bytes_out / bytes_in) * 100, 2) if bytes_in else 0.0,
+        "encodes": sum(r["encodes"] for r in converted),
+        "proxy_encodes": sum(r["proxy_encodes"] for r in converted),
+        "formats": {},
+    }
+    for record in converted:
+        for output in record["outputs"]:
+            summary["formats"][output["format"]] = summary["formats"].get(output["format"], 0) + 1
+    for key in ("total_seconds", "encode_seconds", "decode_seconds", "bytes_out"):
+        values = [r[key] for r in converted]
+        for pct in PERCENTILES:
+            summary[f"{key}_p{pct}"] = percentile(values, pct)
+    peak_rss = [r["peak_rss_bytes"] for r in converted if r.get("peak_rss_bytes")]
+    for pct in PERCENTILES:
+        summary[f"peak_rss_bytes_p{pct}"] = percentile(peak_rss, pct)
+    summary["peak_rss_bytes_max"] = max(peak_rss, default=0)
+    return summary
+
+
+class RunReport:
+    """Streams file records to a JSONL or CSV report and appends the summary on close."""
+
+    def __init__(self, path, fmt=None):
+        self.path = Path(path)
+        self.fmt = fmt or ("csv" if self.path.suffix.lower() == ".csv" else "jsonl")
+        if self.fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {self.fmt}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.records = []
+        self.started = datetime.now()
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def add(self, record):
+        self.records.append(record)
+        if self._csv:
+            outputs = record["outputs"]
+            self._csv.writerow({
+                **{key: record[key] for key in CSV_FIELDS if key in record},
+                "outputs": ";".join(output["path"] for output in outputs),
+                "formats": ";".join(output["format"] for output in outputs),
+                "qualities": ";".join(
+                    "lossless" if output["lossless"] else str(output["quality"]) for output in outputs
+                ),
+            })
+        else:
+            self._file.write(json.dumps({"type": "file", **record}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """Writes the summary and returns it."""
+        summary = summarize(self.records, (datetime.now() - self.started).total_seconds())
+        if self._csv:
+            summary_path = self.path.with_name(self.path.stem + ".summary.json")
+            with open(summary_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        else:
+            self._file.write(json.dumps(summary) + "\n")
+        self._file.close()
+        return summary
@@ -0,0 +1,221 @@
+"""
+Memory-aware job scheduling for the converters' process pool.
+
+Submitting every file to a ProcessPoolExecutor at once lets all workers
+pick up the largest images together: each holds a full decoded image and
+the encoders' buffers, and on big Photoshop exports the box starts to swap
+or the OOM killer steps in. `MemoryScheduler` instead
+
+1. reads each image's dimensions from its header (`Image.ping`, no decode)
+   and estimates the job's peak memory, taking into account JPEGs that are
+   decoded at a reduced scale (decode.py); headers are read lazily, only
+   for files within LOOKAHEAD of the head of the queue, so queueing a
+   full-catalog run does not ping every file before the first dispatch,
+2. only dispatches a job while the estimates of all running jobs fit in a
+   RAM budget (a job larger than the whole budget runs alone), skipping
+   ahead over queued jobs that do not fit yet, and
+3. keeps at most `max_in_flight` futures alive instead of creating them all
+   up front.
+
+`configure_worker` is the pool initializer: it caps ImageMagick's own
+memory, map and thread limits per worker, so a job that exceeds its
+estimate spills to ImageMagick's disk cache instead of growing without
+bound.
+
+`reset_peak_rss` and `peak_rss_bytes` let a worker measure the resident
+memory each file really needed; the converters record it in the run report.
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait as wait_futures
+
+from decode import decoded_pixels
+
+# Bytes per pixel of a decoded image in ImageMagick 7 (Q16 HDRI: 4 float channels)
+BYTES_PER_PIXEL = 16
+# Encoder working memory per pixel and format (libwebp/libavif buffers, output)
+ENCODER_BYTES_PER_PIXEL = 4
+# Interpreter, Wand and ImageMagick baseline per worker
+WORKER_BASE_BYTES = 96 * 1024 * 1024
+# Assumed size of images whose header cannot be read
+UNKNOWN_PIXELS = 24_000_000
+# Default share of physical RAM the scheduler may commit
+DEFAULT_BUDGET_FRACTION = 0.6
+FALLBACK_TOTAL_RAM = 8 * 1024 ** 3
+# How far past the head of the queue to look for a job that fits
+LOOKAHEAD = 64
+
+
+def total_ram_bytes():
+    """Physical RAM, or FALLBACK_TOTAL_RAM where sysconf is unavailable (Windows)."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return FALLBACK_TOTAL_RAM
+
+
+def default_budget_bytes():
+    return int(total_ram_bytes() * DEFAULT_BUDGET_FRACTION)
+
+
+def image_pixels(path, max_width=None, max_height=None):
+    """
+    Pixels the converter will decode for `path` (the header size, reduced for
+    JPEGs decoded at a smaller scale), or UNKNOWN_PIXELS if it cannot be read.
+    """
+    from wand.image import Image
+
+    try:
+        with Image.ping(filename=str(path)) as img:
+            return decoded_pixels(path, img.width, img.height, max_width, max_height)
+    except Exception:
+        return UNKNOWN_PIXELS
+
+
+def estimate_peak_bytes(pixels, formats=1, variants=False):
+    """
+    Peak memory of one conversion: the decoded image (reused by every
+    trial encode), a copy per format when several are encoded in parallel,
+    the encoders' own buffers and, for variants, the first downscaled copy.
+    """
+    images = 1 + (formats if formats > 1 else 0) + (1 if variants else 0)
+    return WORKER_BASE_BYTES + pixels * (BYTES_PER_PIXEL * images + ENCODER_BYTES_PER_PIXEL * formats)
+
+
+def configure_worker(memory_limit_bytes, threads):
+    """ProcessPoolExecutor initializer: per-worker ImageMagick resource limits."""
+    from wand.resource import limits
+
+    limits["memory"] = memory_limit_bytes
+    limits["map"] = memory_limit_bytes * 2
+    limits["thread"] = threads
+
+
+def worker_limits(budget_bytes, workers):
+    """(memory limit per worker, ImageMagick threads per worker) for configure_worker."""
+    cores = os.cpu_count() or 1
+    return max(256 * 1024 * 1024, budget_bytes // workers), max(1, cores // workers)
+
+
+def reset_peak_rss():
+    """Restarts this process's peak-RSS counter (Linux); returns False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """
+    Peak resident memory of this process: since the last reset_peak_rss()
+    on Linux, since the process started elsewhere. None if unknown.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryScheduler:
+    """
+    Admits queued files into an executor against a memory budget.
+
+    `submit(path)` must submit the job and return its future. Files are
+    added with `add()`; `wait()` dispatches what fits and returns finished
+    futures; `drain()` yields every remaining future as it finishes.
+
+    Files added with a lower `priority` number are dispatched before queued
+    files with a higher one (equal priorities stay in order); `payload`, if
+    given, is passed to `submit` instead of the path. `size_limits(path)`,
+    if given, returns the (max_width, max_height) the file is decoded at.
+    `formats`, `variants` and `limits` given to `add()` override those
+    defaults for one file, for callers that mix jobs with different settings.
+    """
+
+    def __init__(self, submit, budget_bytes, max_in_flight, formats=1, variants=False, size_limits=None):
+        self.submit = submit
+        self.budget_bytes = budget_bytes
+        self.max_in_flight = max(1, max_in_flight)
+        self.formats = formats
+        self.variants = variants
+        self.size_limits = size_limits
+        self.queue = deque()
+        self.running = {}
+        self.committed = 0
+        self.peak_committed = 0
+
+    def add(self, path, priority=0, payload=None, formats=None, variants=None, limits=None):
+        # [path, cost, priority, payload, estimate overrides]; the cost is filled in by _cost
+        item = [path, None, priority, payload, (formats, variants, limits)]
+        # Scanning from the back keeps appends at the lowest priority O(1)
+        index = len(self.queue)
+        while index and self.queue[index - 1][2] > priority:
+            index -= 1
+        self.queue.insert(index, item)
+
+    def __len__(self):
+        return len(self.queue) + len(self.running)
+
+    def _cost(self, item):
+        """The item's estimated peak memory, reading its header on first use."""
+        if item[1] is None:
+            path = item[0]
+            formats, variants, limits = item[4]
+            if limits is None:
+                limits = self.size_limits(path) if self.size_limits else ()
+            item[1] = estimate_peak_bytes(
+                image_pixels(path, *limits),
+                self.formats if formats is None else formats,
+                self.variants if variants is None else variants,
+            )
+        return item[1]
+
+    def _dispatch(self):
+        while self.queue and len(self.running) < self.max_in_flight:
+            index = self._next_fitting()
+            if index is None:
+                return
+            path, cost, _, payload, _ = self.queue[index]
+            del self.queue[index]
+            self.running[self.submit(path if payload is None else payload)] = cost
+            self.committed += cost
+            self.peak_committed = max(self.peak_committed, self.committed)
+
+    def _next_fitting(self):
+        for index in range(min(LOOKAHEAD, len(self.queue))):
+            if self.committed + self._cost(self.queue[index]) <= self.budget_bytes:
+                return index
+        # Nothing fits next to the running jobs: an oversized job runs alone
+        if not self.running:
+            return 0
+        return None
+
+    def wait(self, timeout=None):
+        """Dispatches what fits, waits up to timeout and returns the finished futures."""
+        self._dispatch()
+        if not self.running:
+            return []
+        done, _ = wait_futures(list(self.running), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            self.committed -= self.running.pop(future)
+        self._dispatch()
+        return list(done)
+
+    def drain(self):
+        """Yields every queued and running future as it finishes."""
+        while len(self):
+            yield from self.wait()
@@ -0,0 +1,469 @@
+"""
+Long-running conversion service with a warm worker pool.
+
+Every `converter.py` run pays for interpreter startup, loading Wand and
+ImageMagick and spawning a fresh process pool before the first encode, which
+dominates small ad-hoc batches. The service starts the pool once (workers
+are spawned and initialised at startup) and accepts jobs over a local HTTP
+API:
+
+    POST   /jobs              submit {"input_dir", "output_dir"} plus optionally
+                              "paths" (files, relative to input_dir or absolute),
+                              "csv" (a product export or delta_images.csv; only
+                              its images are converted), "column", "priority"
+                              ("urgent", "normal", "bulk" or a number; lower runs
+                              first), "force", "search", "variants", "formats",
+                              "profiles" (a dimension profiles file, see profiles.py)
+    GET    /jobs              all jobs
+    GET    /jobs/<id>         status, counts and per-file results of one job
+    GET    /jobs/<id>/stream  results as JSON lines while the job runs
+    DELETE /jobs/<id>         cancel the job's files that have not started yet
+    GET    /health            workers and queue length
+
+Files of all jobs share one `MemoryScheduler` (scheduler.py) ordered by
+priority, and at most one file per worker is handed to the pool, so an
+urgent product waits only for the files already being encoded instead of
+the rest of a full-catalog run. Each file's memory estimate uses its own
+job's formats, variants and dimension profile. Run reports and the oversize
+log work as in `converter.py`; only the dispatcher thread touches them. A job
+reads the output directory's manifest when its first file is dispatched and,
+when it finishes, merges its own entries into the manifest as it is on disk
+then, so jobs sharing an output directory (or a `converter.py` run between
+two jobs) do not overwrite each other's entries.
+
+    python service.py --workers 8
+    python service_client.py submit ../output ./output_webp --paths 1_hoodie.jpg --priority urgent
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import manifest
+from conversion import SETTINGS_FINGERPRINT, TARGET_SIZE_KB, init_worker, log_oversize, process_image
+from converter_clean import find_source_files
+from csv_ingest import IMAGES_COLUMN, iter_image_names
+from encoders import DEFAULT_FORMATS, parse_formats
+from rate_control import SEARCH_MODES
+from run_report import RunReport
+from profiles import decode_limits, load_profiles, profile_for
+from scheduler import MemoryScheduler, default_budget_bytes, worker_limits
+from variants import parse_variants
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+PRIORITIES = {"urgent": 0, "normal": 10, "bulk": 20}
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+# Files moved from the inbox into the scheduler per loop, so finished futures are collected in between
+ADMIT_BATCH = 64
+POLL_SECONDS = 0.2
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 200
+
+
+def _init_service_worker(memory_limit_bytes, threads):
+    # Ctrl+C reaches the whole process group; workers finish their file and
+    # leave shutting down to the service.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker(memory_limit_bytes, threads)
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class Job:
+    """One submitted batch: its files, options, progress and results."""
+
+    def __init__(self, job_id, input_dir, output_dir, files, missing, priority, options):
+        self.id = job_id
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.files = files
+        self.missing = missing
+        self.priority = priority
+        self.search = options.get("search", "bisect")
+        self.force = bool(options.get("force", False))
+        self.formats = options.get("formats", DEFAULT_FORMATS)
+        self.variants = options.get("variants")
+        self.families = options.get("families")
+        self.submitted_at = datetime.now()
+        self.finished_at = None
+        self.cancelled = False
+        self.results = []
+        self.counts = {"converted": 0, "skipped": 0, "errors": 0, "cancelled": 0}
+        # Manifest of output_dir as read at the job's first dispatch, and the entries it changed
+        self.manifest = None
+        self.manifest_updates = {}
+        self.report_path = self.output_dir / f"conversion_report_{self.submitted_at:%Y-%m-%d_%H-%M-%S}_{job_id}.jsonl"
+        self.report = None
+        self.summary_data = None
+
+    @property
+    def done(self):
+        return len(self.results) + self.counts["cancelled"]
+
+    @property
+    def status(self):
+        if self.finished_at:
+            return "cancelled" if self.cancelled else "done"
+        return "running" if self.results else "queued"
+
+    def summary(self, results=False):
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "input_dir": str(self.input_dir),
+            "output_dir": str(self.output_dir),
+            "files": len(self.files),
+            "done": self.done,
+            **self.counts,
+            "missing": self.missing,
+            "submitted_at": self.submitted_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            "report": str(self.report_path),
+        }
+        if self.summary_data:
+            data["summary"] = self.summary_data
+        if results:
+            data["results"] = list(self.results)
+        return data
+
+
+class ConversionService:
+    """Warm process pool plus a dispatcher thread that feeds it files by priority."""
+
+    def __init__(self, workers=None, budget_bytes=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.budget_bytes = budget_bytes or default_budget_bytes()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_service_worker,
+            initargs=worker_limits(self.budget_bytes, self.workers),
+        )
+        # Spawn and initialise every worker now rather than on the first job
+        list(self.executor.map(_warm_up, range(self.workers)))
+        # One file per worker in flight: the pool's own queue is FIFO, so
+        # priorities are only honoured for files still in the scheduler.
+        self.scheduler = MemoryScheduler(self._submit, self.budget_bytes, self.workers)
+        self.inbox = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.job_numbers = itertools.count(1)
+        self.jobs = {}
+        self.running = {}
+        self.changed = threading.Condition()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="dispatcher", daemon=True)
+        self.thread.start()
+
+    # ------------------------------------------------------------------
+    # Called from the HTTP threads
+    # ------------------------------------------------------------------
+
+    def submit_job(self, request):
+        """Validates a job request, queues its files and returns the Job. Raises ValueError."""
+        input_dir = Path(request.get("input_dir", ""))
+        output_dir = Path(request.get("output_dir", ""))
+        if not input_dir.is_dir():
+            raise ValueError(f"Input directory not found: '{input_dir}'")
+        if not request.get("output_dir"):
+            raise ValueError("output_dir is required")
+
+        priority = request.get("priority", "normal")
+        if isinstance(priority, bool):
+            raise ValueError("priority must be a name or a number, not a boolean")
+        if not isinstance(priority, int):
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unknown priority '{priority}' (use {', '.join(PRIORITIES)} or a number)")
+            priority = PRIORITIES[priority]
+        options = {"force": request.get("force", False), "search": request.get("search", "bisect")}
+        if options["search"] not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{options['search']}'")
+        if request.get("formats"):
+            options["formats"] = parse_formats(request["formats"])
+        if request.get("variants"):
+            options["variants"] = parse_variants(request["variants"], TARGET_SIZE_KB)
+        if request.get("profiles"):
+            try:
+                options["families"] = load_profiles(request["profiles"])
+            except OSError as e:
+                raise ValueError(f"Cannot read profiles '{request['profiles']}': {e}") from e
+
+        files, missing = self._resolve_files(input_dir, request)
+        with self.changed:
+            job_id = f"{datetime.now():%H%M%S}-{next(self.job_numbers)}"
+            job = Job(job_id, input_dir, output_dir, files, missing, priority, options)
+            self.jobs[job_id] = job
+            self._forget_old_jobs()
+        for path in files:
+            self.inbox.put((priority, next(self.sequence), job_id, path))
+        if not files:
+            self._finish(job)
+        return job
+
+    @staticmethod
+    def _resolve_files(input_dir, request):
+        if request.get("paths"):
+            files, missing = [], []
+            for path in request["paths"]:
+                path = Path(path) if Path(path).is_absolute() else input_dir / path
+                (files if path.is_file() else missing).append(str(path))
+            return files, missing
+        if request.get("csv"):
+            try:
+                names = set(iter_image_names(request["csv"], request.get("column", IMAGES_COLUMN)))
+            except (OSError, ValueError, csv.Error) as e:
+                raise ValueError(f"Cannot read CSV '{request['csv']}': {e}") from e
+            return find_source_files(str(input_dir), names)
+        return [str(p) for p in input_dir.rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES], []
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job:
+            job.cancelled = True
+        return job
+
+    def stream(self, job_id, timeout=POLL_SECONDS):
+        """Yields the job's results as they arrive, until it is finished."""
+        job = self.jobs[job_id]
+        sent = 0
+        while True:
+            with self.changed:
+                while sent == len(job.results) and not job.finished_at:
+                    self.changed.wait(timeout)
+                fresh = job.results[sent:]
+                finished = job.finished_at is not None
+            yield from fresh
+            sent += len(fresh)
+            if finished and sent == len(job.results):
+                return
+
+    def health(self):
+        return {"workers": self.workers, "queued": self.inbox.qsize() + len(self.scheduler.queue),
+                "running": len(self.scheduler.running), "jobs": len(self.jobs)}
+
+    def close(self):
+        """Stops after the files already queued; saves manifests."""
+        self.stopping.set()
+        self.thread.join()
+        self.executor.shutdown()
+
+    # ------------------------------------------------------------------
+    # Dispatcher thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            admitted = self._admit()
+            if len(self.scheduler):
+                for future in self.scheduler.wait(timeout=POLL_SECONDS):
+                    self._collect(future)
+            elif not admitted:
+                if self.stopping.is_set():
+                    return
+                try:
+                    self._add(self.inbox.get(timeout=POLL_SECONDS))
+                except queue.Empty:
+                    continue
+
+    def _admit(self):
+        admitted = 0
+        while admitted < ADMIT_BATCH:
+            try:
+                self._add(self.inbox.get_nowait())
+            except queue.Empty:
+                break
+            admitted += 1
+        return admitted
+
+    def _add(self, item):
+        priority, _, job_id, path = item
+        job = self.jobs[job_id]
+        if not job.cancelled:
+            self.scheduler.add(
+                path, priority, (job, path), len(job.formats), bool(job.variants),
+                decode_limits(profile_for(path, job.families), job.variants),
+            )
+            return
+        # Cancelled before reaching the scheduler: no header read, no encode
+        with self.changed:
+            job.counts["cancelled"] += 1
+            self.changed.notify_all()
+        if job.done == len(job.files):
+            self._finish(job)
+
+    def _submit(self, payload):
+        job, path = payload
+        if job.cancelled:
+            future = Future()
+            future.set_result(None)
+        else:
+            if job.manifest is None:
+                job.manifest = manifest.load_manifest(job.output_dir)
+            future = self.executor.submit(
+                process_image, path, str(job.input_dir), str(job.output_dir), job.search,
+                job.manifest.get(manifest.manifest_key(path, job.input_dir)), job.force, job.variants, job.formats,
+                profile_for(path, job.families),
+            )
+        self.running[future] = payload
+        return future
+
+    def _collect(self, future):
+        job, path = self.running.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            result = (path, f"Error: {e}", -1, 0, 0, None, None)
+        if job.report is None and result is not None:
+            job.report = RunReport(job.report_path)
+
+        with self.changed:
+            if result is None:
+                job.counts["cancelled"] += 1
+            else:
+                source, status, size_kb, encodes, _, entry, record = result
+                if entry is not None:
+                    job.manifest_updates[manifest.manifest_key(source, job.input_dir)] = entry
+                if record is not None:
+                    job.report.add(record)
+                    log_oversize(job.output_dir, record)
+                if status == "Skipped (unchanged)":
+                    job.counts["skipped"] += 1
+                elif size_kb >= 0:
+                    job.counts["converted"] += 1
+                else:
+                    job.counts["errors"] += 1
+                job.results.append({"source": source, "status": status, "size_kb": size_kb, "encodes": encodes})
+            self.changed.notify_all()
+        if job.done == len(job.files):
+            self._finish(job)
+
+    def _finish(self, job):
+        if job.report is not None:
+            job.summary_data = job.report.close()
+        if job.manifest_updates:
+            entries = manifest.load_manifest(job.output_dir)
+            entries.update(job.manifest_updates)
+            manifest.save_manifest(job.output_dir, entries)
+        with self.changed:
+            job.finished_at = datetime.now()
+            self.changed.notify_all()
+
+    def _forget_old_jobs(self):
+        finished = [job for job in self.jobs.values() if job.finished_at]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON API of the conversion service (see the module docstring)."""
+
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        job = self.service.jobs.get(parts[1]) if len(parts) > 1 and parts[0] == "jobs" else None
+        return parts, job
+
+    def do_GET(self):
+        parts, job = self._route()
+        if parts == ["health"]:
+            return self._send_json(self.service.health())
+        if parts == ["jobs"]:
+            return self._send_json([job.summary() for job in list(self.service.jobs.values())])
+        if job is None:
+            return self._send_json({"error": "not found"}, 404)
+        if len(parts) == 2:
+            return self._send_json(job.summary(results=True))
+        if parts[2:] == ["stream"]:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            try:
+                for result in self.service.stream(job.id):
+                    self.wfile.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write((json.dumps({"summary": job.summary()}, ensure_ascii=False) + "\n").encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        return self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._send_json({"error": "not found"}, 404)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.service.submit_job(request)
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._send_json({"error": str(e)}, 400)
+        return self._send_json(job.summary(), 202)
+
+    def do_DELETE(self):
+        parts, job = self._route()
+        if job is None or len(parts) != 2:
+            return self._send_json({"error": "not found"}, 404)
+        self.service.cancel(job.id)
+        return self._send_json(job.summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the conversion service (warm worker pool + local HTTP API).")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on (default: localhost only).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of cores).")
+    parser.add_argument("--memory-budget-mb", type=int, default=None,
+                        help="RAM the running conversions may use together (default: 60%% of physical RAM).")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    service = ConversionService(args.workers, budget)
+    ServiceHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+    server.daemon_threads = True
+    # A service manager stops the daemon with SIGTERM; treat it like Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    print(f"Conversion service on http://{args.host}:{args.port} "
+          f"({service.workers} warm workers, ready in {time.perf_counter() - started:.1f}s, "
+          f"settings {SETTINGS_FINGERPRINT}). Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping: finishing queued files...")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
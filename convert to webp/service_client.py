@@ -0,0 +1,148 @@
+"""
+Client for the conversion service (service.py).
+
+Only the standard library is needed, so submitting a job does not load
+Wand or ImageMagick:
+
+    python service_client.py submit ../output ./output_webp                 # whole folder, wait for results
+    python service_client.py submit ../output ./output_webp --paths a.jpg --priority urgent
+    python service_client.py submit ../output ./output_webp --csv ../delta_images.csv --no-wait
+    python service_client.py status [JOB_ID]
+    python service_client.py cancel JOB_ID
+
+`converter.py --service URL` uses `run_remote` to hand its batch to a running
+service instead of starting its own pool.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+DEFAULT_URL = os.environ.get("CONVERTER_SERVICE_URL", "http://127.0.0.1:8765")
+
+
+class ServiceError(Exception):
+    pass
+
+
+def _call(url, method="GET", data=None, timeout=30):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    request = Request(url, data=body, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", str(e))
+        except (json.JSONDecodeError, AttributeError):
+            message = str(e)
+        raise ServiceError(message) from e
+    except URLError as e:
+        raise ServiceError(f"Conversion service not reachable at {url}: {e.reason}") from e
+
+
+def submit(base_url, request):
+    """Submits a job (see service.py for the fields) and returns its summary."""
+    return _call(f"{base_url}/jobs", "POST", request)
+
+
+def status(base_url, job_id=None):
+    return _call(f"{base_url}/jobs/{job_id}" if job_id else f"{base_url}/jobs")
+
+
+def cancel(base_url, job_id):
+    return _call(f"{base_url}/jobs/{job_id}", "DELETE")
+
+
+def stream(base_url, job_id):
+    """Yields the job's results as they finish; the last item is {"summary": ...}."""
+    try:
+        with urlopen(f"{base_url}/jobs/{job_id}/stream") as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+    except URLError as e:
+        raise ServiceError(f"Conversion service not reachable at {base_url}: {e.reason}") from e
+
+
+def run_remote(base_url, request, wait=True):
+    """Submits a job, prints its results as they arrive and returns the final summary."""
+    job = submit(base_url, request)
+    print(f"Job {job['id']}: {job['files']} images queued on {base_url} (priority {job['priority']}).")
+    for name in job["missing"]:
+        print(f"  Not found: {name}")
+    if not wait:
+        return job
+    summary = job
+    for item in stream(base_url, job["id"]):
+        if "summary" in item:
+            summary = item["summary"]
+            continue
+        size = f"{item['size_kb']} kb" if item["size_kb"] >= 0 else "-"
+        print(f"  {Path(item['source']).name}: {item['status']} ({size})")
+    print(f"\nJob {summary['id']} {summary['status']}: converted {summary['converted']}, "
+          f"skipped {summary['skipped']}, errors {summary['errors']}, cancelled {summary['cancelled']}.")
+    print(f"Run report: {summary['report']}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submit and inspect jobs on the conversion service.")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Service URL (default: $CONVERTER_SERVICE_URL or %(default)s).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Submit a job and stream its results.")
+    submit_parser.add_argument("input_dir", help="Input directory containing images.")
+    submit_parser.add_argument("output_dir", help="Output directory to save converted images.")
+    submit_parser.add_argument("--paths", nargs="+", default=None, help="Only these files (relative to input_dir).")
+    submit_parser.add_argument("--csv", default=None, help="Only the images listed in this export / delta CSV.")
+    submit_parser.add_argument("--column", default="Images", help="CSV column with the image URLs.")
+    submit_parser.add_argument("--priority", default="normal",
+                               help="urgent, normal, bulk or a number (lower runs first).")
+    submit_parser.add_argument("--force", action="store_true", help="Re-encode even unchanged images.")
+    submit_parser.add_argument("--search", default="bisect", help="Quality search mode.")
+    submit_parser.add_argument("--variants", default=None, help="Variant profiles, as in converter.py.")
+    submit_parser.add_argument("--formats", default=None, help="Output formats, as in converter.py.")
+    submit_parser.add_argument("--profiles", default=None, help="Dimension profiles file, as in converter.py.")
+    submit_parser.add_argument("--no-wait", action="store_true", help="Return after queueing the job.")
+
+    status_parser = commands.add_parser("status", help="Show all jobs or one job.")
+    status_parser.add_argument("job_id", nargs="?", default=None)
+    cancel_parser = commands.add_parser("cancel", help="Cancel the files of a job that have not started.")
+    cancel_parser.add_argument("job_id")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "submit":
+            priority = int(args.priority) if args.priority.lstrip("-").isdigit() else args.priority
+            request = {
+                "input_dir": str(Path(args.input_dir).resolve()),
+                "output_dir": str(Path(args.output_dir).resolve()),
+                "paths": args.paths,
+                "csv": str(Path(args.csv).resolve()) if args.csv else None,
+                "column": args.column,
+                "priority": priority,
+                "force": args.force,
+                "search": args.search,
+                "variants": args.variants,
+                "formats": args.formats,
+                "profiles": str(Path(args.profiles).resolve()) if args.profiles else None,
+            }
+            summary = run_remote(args.url, request, wait=not args.no_wait)
+            if summary.get("errors"):
+                sys.exit(1)
+        elif args.command == "status":
+            print(json.dumps(status(args.url, args.job_id), indent=2, ensure_ascii=False))
+        else:
+            print(json.dumps(cancel(args.url, args.job_id), indent=2, ensure_ascii=False))
+    except ServiceError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Responsive output variants for the WebP converters.
+
+`--variants 2048,1200,600,thumb` turns every source into one WebP per
+profile instead of a single full-resolution file. The source is decoded
+once; the profiles are produced widest first, each downscaled from the
+previous one rather than from the original, so the expensive resize runs on
+an already reduced image. Every variant is rate-controlled to its own
+budget.
+
+Profile syntax (comma separated):
+
+    2048        width 2048px, budget derived from the width
+    2048:300    width 2048px, 300 KB budget
+    thumb       named profile (see NAMED_PROFILES), optionally thumb:15
+    full        original resolution with the converter's TARGET_SIZE_KB
+
+Outputs are named `<stem>-<width>w.webp` (`<stem>-thumb.webp`,
+`<stem>.webp` for `full`) next to where the single output would be, so a
+srcset can be written from the profile list alone (with `--formats`, the
+suffix is that of the format chosen for the variant). Sources narrower than
+a profile are not upscaled: the widest such profile is written once at the
+source width and named after it (a 1500px source with `2048,1200` gives
+`<stem>-1500w.webp` and `<stem>-1200w.webp`), the other oversized profiles
+are skipped, and none is written if `full` already keeps the source width.
+The manifest records the real width of every output.
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+import tracing
+from encoders import ENCODERS
+from rate_control import encode_smallest
+
+Variant = namedtuple('Variant', ['name', 'width', 'target_kb'])
+
+# name: (width, budget in KB)
+NAMED_PROFILES = {
+    'thumb': (320, 20),
+}
+# Width at which a numeric profile gets the converter's full TARGET_SIZE_KB.
+# Smaller widths get a budget that shrinks slower than the pixel count,
+# because small images need more bytes per pixel for the same quality.
+REFERENCE_WIDTH = 2048
+BUDGET_EXPONENT = 1.5
+MIN_VARIANT_KB = 10
+RESIZE_FILTER = 'lanczos'
+
+
+def budget_for_width(width, reference_kb):
+    """Default budget (KB) of a numeric profile."""
+    return max(MIN_VARIANT_KB, round(reference_kb * (width / REFERENCE_WIDTH) ** BUDGET_EXPONENT))
+
+
+def parse_variants(spec, reference_kb):
+    """
+    Parses a `--variants` string into a list of Variants, widest first.
+    Raises ValueError on unknown names or malformed entries.
+    """
+    variants = []
+    for token in (part.strip() for part in spec.split(',')):
+        if not token:
+            continue
+        name, _, budget = token.partition(':')
+        name = name.lower()
+        if name == 'full':
+            variant = Variant('full', None, reference_kb)
+        elif name in NAMED_PROFILES:
+            width, target_kb = NAMED_PROFILES[name]
+            variant = Variant(name, width, target_kb)
+        elif name.isdigit() and int(name) > 0:
+            width = int(name)
+            variant = Variant(f'{width}w', width, budget_for_width(width, reference_kb))
+        else:
+            raise ValueError(f"Unknown variant profile: '{token}'")
+        if budget:
+            if not budget.isdigit() or int(budget) <= 0:
+                raise ValueError(f"Invalid budget in variant profile: '{token}'")
+            variant = variant._replace(target_kb=int(budget))
+        if any(existing.name == variant.name for existing in variants):
+            raise ValueError(f"Duplicate variant profile: '{token}'")
+        variants.append(variant)
+    if not variants:
+        raise ValueError("No variant profiles given")
+    # Widest first; 'full' has no width limit and always comes first
+    return sorted(variants, key=lambda variant: -(variant.width or float('inf')))
+
+
+def variant_path(output_path, variant):
+    """Output path of `variant` for a source whose single output would be `output_path`."""
+    output_path = Path(output_path)
+    if variant.name == 'full':
+        return output_path
+    return output_path.with_name(f"{output_path.stem}-{variant.name}{output_path.suffix}")
+
+
+def encode_cascade(img, variants, ladder, search_mode='bisect', allow_lossless=True, encoders=None):
+    """
+    Yields (variant, encoder, EncodeResult) for `variants` (widest first, as
+    returned by parse_variants). Each downscaled size is derived from the
+    previous one. With several `encoders` every variant keeps the smallest
+    format that fits its budget (see rate_control.encode_smallest).
+
+    The yielded variant carries the real width of its output; a profile
+    wider than the source is renamed to that width, or skipped when an
+    output at the source width has already been written.
+    """
+    encoders = encoders or [ENCODERS['webp']]
+    current = img
+    source_width_written = False
+    try:
+        for variant in variants:
+            if variant.width is None or variant.width >= current.width:
+                if source_width_written:
+                    continue
+                source_width_written = True
+                if variant.width is None:
+                    variant = variant._replace(width=current.width)
+                elif variant.width > current.width:
+                    variant = variant._replace(name=f'{current.width}w', width=current.width)
+            else:
+                height = max(1, round(current.height * variant.width / current.width))
+                with tracing.span("resize", width=variant.width):
+                    smaller = current.clone()
+                    smaller.resize(variant.width, height, filter=RESIZE_FILTER)
+                if current is not img:
+                    current.close()
+                current = smaller
+                source_width_written = True
+            encoder, result = encode_smallest(
+                current, variant.target_kb * 1024, ladder, encoders, search_mode, allow_lossless
+            )
+            yield variant, encoder, result
+    finally:
+        if current is not img:
+            current.close()
@@ -0,0 +1,92 @@
+"""
+Folder watching for converter.py --watch.
+
+Photoshop writes the mockup JPGs into output/ one by one over a long run.
+`watch_for_images` polls the folder and hands out each image once it has
+been fully written, so conversion can run alongside the generator instead of
+after it. A file counts as finished when its size and mtime have not changed
+between two polls and it is at least SETTLE_SECONDS old; files written under
+a temporary name only match once they are renamed to their final suffix.
+"""
+
+import fnmatch
+import os
+import time
+from pathlib import Path
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+POLL_INTERVAL = 1.0
+SETTLE_SECONDS = 2.0
+# main_mockup_generator.jsx writes this report into output/ when it finishes.
+DEFAULT_STOP_PATTERNS = ('generation_report_*.txt',)
+
+
+def _scan(folder):
+    """Yields (path, stat) for every file under folder, recursively."""
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scan(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        continue
+    except FileNotFoundError:
+        return
+
+
+def _stop_files(folder, patterns):
+    """Returns the top-level files in folder that match one of the stop patterns."""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return set()
+    return {name for name in names if any(fnmatch.fnmatch(name, p) for p in patterns)}
+
+
+def watch_for_images(folder, stop_patterns=DEFAULT_STOP_PATTERNS, poll_interval=POLL_INTERVAL,
+                     settle_seconds=SETTLE_SECONDS):
+    """
+    Watches folder and yields a list of newly finished image paths on every poll.
+
+    The list is often empty; that lets the caller collect finished work
+    between arrivals. Images already present when watching starts are
+    yielded too, so a restarted watch picks up where it left off. The
+    generator returns once a file matching stop_patterns appears that was
+    not there at start, after every image written before it was yielded.
+    """
+    folder = Path(folder)
+    stale_stop_files = _stop_files(folder, stop_patterns)
+    last_seen = {}
+    yielded = set()
+    stopping = False
+
+    while True:
+        if not stopping and _stop_files(folder, stop_patterns) - stale_stop_files:
+            stopping = True
+
+        now = time.time()
+        ready = []
+        pending = 0
+        for path, stat in _scan(folder):
+            if path in yielded or not path.lower().endswith(IMAGE_SUFFIXES):
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = last_seen.get(path)
+            last_seen[path] = signature
+            if signature == previous and stat.st_size > 0 and now - stat.st_mtime >= settle_seconds:
+                ready.append(path)
+                yielded.add(path)
+            elif stat.st_size > 0 or now - stat.st_mtime < settle_seconds:
+                # Empty files that stay empty are abandoned writes, not pending ones
+                pending += 1
+
+        yield ready
+
+        if stopping and pending == 0:
+            return
+        time.sleep(poll_interval)
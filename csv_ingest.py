@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Strumieniowe wczytywanie eksportu produktów (CSV z WooCommerce)
+
+Jedno przejście po pliku CSV: wiersz po wierszu (csv.reader, bez pandas i bez
+wczytywania całego pliku), komórka 'Images' dzielona na URLe, a każdy URL
+sprowadzany do nazwy obrazu bez adresu i rozszerzenia:
+
+    https://blessyou.pl//wp-content/uploads/my-images/art/100_105.webp -> 100_105
+
+Nazwa "<wejście>_<mockup>" daje od razu wpis config.json (100.png ->
+105.psd), więc pośredni extracted_images.txt nie jest już potrzebny.
+Duplikaty są odrzucane przez zbiory; w pamięci są tylko unikalne nazwy,
+nie wiersze eksportu.
+
+Używają go process_extracted_to_config.py (CSV -> config.json) oraz
+convert to webp/converter_clean.py (lista obrazów do konwersji).
+"""
+
+import csv
+import sys
+from collections import defaultdict
+
+IMAGES_COLUMN = "Images"
+IMAGE_EXTENSION = ".webp"
+
+
+def image_name(url):
+    """Nazwa obrazu z URLa: ostatni człon ścieżki bez rozszerzenia .webp (pusty napis dla pustego URLa)"""
+    name = url.strip().rstrip("/").rsplit("/", 1)[-1]
+    if name.lower().endswith(IMAGE_EXTENSION):
+        name = name[:-len(IMAGE_EXTENSION)]
+    return name
+
+
+def iter_image_urls(csv_path, column=IMAGES_COLUMN):
+    """
+    Zwraca kolejne URLe z kolumny column, strumieniowo. Rzuca ValueError,
+    gdy w nagłówku nie ma tej kolumny, i FileNotFoundError, gdy nie ma pliku.
+    """
+    # Opisy produktów w eksportach potrafią przekroczyć domyślny limit pola
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    # utf-8-sig: eksporty z Excela/WooCommerce często zaczynają się od BOM
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        if column not in header:
+            raise ValueError(f"Brak kolumny '{column}' w {csv_path}")
+        index = header.index(column)
+        for row in reader:
+            if index >= len(row):
+                continue
+            for url in row[index].split(","):
+                url = url.strip()
+                if url:
+                    yield url
+
+
+def iter_image_names(csv_path, column=IMAGES_COLUMN):
+    """Unikalne nazwy obrazów z eksportu, w kolejności pierwszego wystąpienia"""
+    seen = set()
+    for url in iter_image_urls(csv_path, column):
+        name = image_name(url)
+        if name and name not in seen:
+            seen.add(name)
+            yield name
+
+
+def split_image_name(name):
+    """
+    Dzieli nazwę "<wejście>_<mockup>" na (klucz wejścia .png, plik mockupu .psd)
+    - na pierwszym "_", jak process_extracted_to_config.py. None, gdy nie ma separatora.
+    """
+    input_name, separator, mockup_name = name.partition("_")
+    if not separator or not input_name or not mockup_name:
+        return None
+    return f"{input_name}.png", f"{mockup_name}.psd"
+
+
+def build_mappings(names):
+    """
+    Buduje mapowania config.json z nazw obrazów. Zwraca (mapowania
+    {wejście: [mockupy]}, pominięte nazwy bez separatora).
+    """
+    mappings = defaultdict(set)
+    skipped = []
+    for name in names:
+        pair = split_image_name(name)
+        if pair is None:
+            skipped.append(name)
+            continue
+        mappings[pair[0]].add(pair[1])
+    return {input_key: sorted(mockups) for input_key, mockups in mappings.items()}, skipped
+
+
+def mappings_from_csv(csv_path, column=IMAGES_COLUMN):
+    """Jedno przejście: eksport CSV -> (mapowania config.json, pominięte nazwy)"""
+    return build_mappings(iter_image_names(csv_path, column))
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deduplikacja wejść po zawartości: każda para (grafika, szablon) renderowana raz
+
+W katalogu jest sporo wejść identycznych pod różnymi nazwami (warianty
+kolorystyczne eksportowane z tą samą grafiką, np. rodzina 1kor13_*). Każde
+z nich było renderowane do tych samych szablonów i konwertowane osobno.
+
+plan_jobs.py --dedup liczy skrót zawartości każdego wejścia (SHA-256 z
+katalogu plików, liczony tylko dla nowych i zmienionych plików) i opcjonalnie
+skrót zdekodowanych pikseli (--dedup pixels - ten sam obraz zapisany
+innym enkoderem lub z innymi metadanymi). Z zadań o tym samym skrócie i tym
+samym mockupie w planie zostaje pierwsze, a pozostałe trafiają do sekcji
+"duplicates" jobs.json ({wynik duplikatu: wynik renderowany}).
+
+Po renderowaniu i konwersji ten skrypt odtwarza pliki duplikatów - twardymi
+linkami (albo kopiami, --copy) - zarówno mockupy JPG w output/, jak i pliki
+WebP (z wariantami) w folderze konwertera. Duplikaty dostają też wpisy
+w manifeście konwertera, więc kolejny przebieg converter.py je pomija:
+
+    python3 plan_jobs.py --dedup
+    python3 render_mockups.py --jobs jobs.json
+    python3 "convert to webp/converter.py" output "convert to webp/output_webp"
+    python3 dedup.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from asset_catalog import file_hash
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+plan_file = project_folder / "jobs.json"
+output_folder = project_folder / "output"
+webp_folder = project_folder / "convert to webp" / "output_webp"
+
+# manifest.py konwertera opisuje, które źródło dało które pliki WebP
+sys.path.insert(0, str(project_folder / "convert to webp"))
+import manifest  # noqa: E402
+
+# exact  - identyczne bajty pliku
+# pixels - identyczne piksele po zdekodowaniu (np. ten sam obraz zapisany ponownie)
+DEDUP_MODES = ("exact", "pixels")
+
+
+def pixel_hash(path):
+    """Skrót zdekodowanych pikseli (RGBA) razem z wymiarami; metadane i kompresja pliku nie mają znaczenia"""
+    with Image.open(path) as img:
+        rgba = img.convert("RGBA")
+    digest = hashlib.sha256(f"{rgba.width}x{rgba.height}".encode("ascii"))
+    digest.update(rgba.tobytes())
+    return digest.hexdigest()
+
+
+def input_digests(jobs, mode="exact", catalog=None, workers=None):
+    """
+    Skróty wejść zadań: {inputPath: skrót}. Skróty dokładne pochodzą
+    z katalogu plików (liczone tylko dla nowych i zmienionych plików); w trybie
+    pixels dekodowane jest jedno wejście z każdej grupy identycznych bajtów.
+    """
+    paths = sorted({job["inputPath"] for job in jobs})
+    if catalog:
+        for folder in sorted({str(Path(path).parent) for path in paths}):
+            catalog.refresh(folder, hashes=True)
+        exact = {path: catalog.info(Path(path).parent, Path(path).name)["hash"] for path in paths}
+    else:
+        exact = {path: file_hash(path) for path in paths}
+    if mode == "exact":
+        return exact
+
+    representatives = {}
+    for path in paths:
+        representatives.setdefault(exact[path], path)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pixels = dict(zip(representatives, executor.map(pixel_hash, representatives.values())))
+    return {path: pixels[exact[path]] for path in paths}
+
+
+def dedup_jobs(jobs, digests):
+    """
+    Dzieli zadania na unikalne pary (skrót wejścia, mockup) i duplikaty.
+    Zwraca (unikalne zadania w kolejności planu, {wynik duplikatu: wynik renderowany}).
+    """
+    first_output = {}
+    unique = []
+    duplicates = {}
+    for job in jobs:
+        # Mockupy są dopasowywane bez względu na wielkość liter
+        key = (digests[job["inputPath"]], job["mockup"].lower())
+        if key in first_output:
+            duplicates[job["output"]] = first_output[key]
+            continue
+        first_output[key] = job["output"]
+        unique.append(job)
+    return unique, duplicates
+
+
+def link_file(source, target, copy=False):
+    """
+    Tworzy target jako twardy link do source (albo kopię; kopia także wtedy,
+    gdy system plików nie obsługuje linków). Zwraca False, gdy target już jest
+    tym samym plikiem.
+    """
+    source, target = Path(source), Path(target)
+    if target.exists() and os.path.samefile(source, target):
+        return False
+    tmp_path = target.with_name(f"{target.name}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    try:
+        if copy:
+            raise OSError("copy requested")
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copy2(source, tmp_path)
+    # Podmiana przez os.replace: istniejący (nieaktualny) plik duplikatu nie zostaje w połowie zapisany
+    os.replace(tmp_path, target)
+    return True
+
+
+def materialize_outputs(duplicates, output_dir, copy=False):
+    """Odtwarza mockupy duplikatów z wyrenderowanych plików. Zwraca (odtworzone, brakujące źródła)"""
+    linked, missing = [], []
+    for target, source in duplicates.items():
+        source_path = Path(output_dir) / source
+        if not source_path.exists():
+            missing.append(source)
+            continue
+        if link_file(source_path, Path(output_dir) / target, copy):
+            linked.append(target)
+    return linked, missing
+
+
+def materialize_webps(duplicates, output_dir, webp_dir, copy=False):
+    """
+    Odtwarza pliki WebP (i warianty) duplikatów z wyników konwertera
+    i dopisuje dla nich wpisy manifestu. Zwraca (liczba odtworzonych
+    duplikatów, niezkonwertowane źródła).
+    """
+    entries = manifest.load_manifest(webp_dir)
+    linked, missing = 0, []
+    for target, source in duplicates.items():
+        entry = entries.get(source)
+        target_source = Path(output_dir) / target
+        if not entry or not target_source.exists():
+            missing.append(source)
+            continue
+        # Duplikat jest tym samym źródłem konwersji tylko wtedy, gdy ma identyczne bajty
+        target_hash = manifest.source_hash_for(entry, target_source)
+        if target_hash != entry["source_hash"]:
+            missing.append(source)
+            continue
+
+        source_stem, target_stem = Path(source).stem, Path(target).stem
+        output = Path(entry["output"])
+        target_output = output.with_name(target_stem + output.name[len(source_stem):])
+        link_file(Path(webp_dir) / output, Path(webp_dir) / target_output, copy)
+        target_variants = {}
+        for name, size in entry.get("variants", {}).items():
+            target_name = target_stem + name[len(source_stem):]
+            link_file(Path(webp_dir) / output.parent / name, Path(webp_dir) / output.parent / target_name, copy)
+            target_variants[target_name] = size
+
+        stat = os.stat(target_source)
+        target_entry = dict(entry, source_size=stat.st_size, source_mtime_ns=stat.st_mtime_ns,
+                            output=target_output.as_posix(), status=f"Linked from {source}")
+        if target_variants:
+            target_entry["variants"] = target_variants
+        if "widths" in entry:
+            target_entry["widths"] = {
+                target_stem + name[len(source_stem):]: width for name, width in entry["widths"].items()
+            }
+        entries[target] = target_entry
+        linked += 1
+    manifest.save_manifest(webp_dir, entries)
+    return linked, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Odtwarza pliki zdeduplikowanych kombinacji (sekcja duplicates w jobs.json) linkami lub kopiami."
+    )
+    parser.add_argument("--plan", default=str(plan_file), help="Plan z plan_jobs.py --dedup")
+    parser.add_argument("--output-folder", default=str(output_folder), help="Folder z wyrenderowanymi mockupami")
+    parser.add_argument("--webp-folder", default=str(webp_folder), help="Folder z wynikami konwertera")
+    parser.add_argument("--copy", action="store_true", help="Kopiuj pliki zamiast tworzyć twarde linki")
+    parser.add_argument("--skip-webp", action="store_true", help="Odtwórz tylko mockupy JPG")
+    args = parser.parse_args()
+
+    with open(args.plan, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    duplicates = plan.get("duplicates", {})
+    print(f"🔗 Duplikaty z planu: {len(duplicates)} ({args.plan})")
+    if not duplicates:
+        print("💡 Brak duplikatów - uruchom plan_jobs.py --dedup")
+        return
+
+    linked, missing = materialize_outputs(duplicates, args.output_folder, args.copy)
+    print(f"   🖼️  Mockupy: odtworzone {len(linked)}, "
+          f"aktualne {len(duplicates) - len(linked) - len(missing)}, brak źródła {len(missing)}")
+    for source in sorted(set(missing)):
+        print(f"   ⚠️  Brak wyrenderowanego pliku: {source}")
+
+    webp_linked = 0
+    if not args.skip_webp and Path(args.webp_folder).is_dir():
+        webp_linked, webp_missing = materialize_webps(duplicates, args.output_folder, args.webp_folder, args.copy)
+        print(f"   🌐 WebP: odtworzone {webp_linked}, bez wyniku konwersji {len(webp_missing)}")
+
+    print(f"\n✅ Uniknięte renderowania: {len(duplicates)}, uniknięte konwersje: {webp_linked}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plan różnicowy między dwoma eksportami produktów (lub dwoma config.json)
+
+Eksport "GRAFIKI BLESSYOU MIGRACJA.csv" jest odświeżany regularnie, a pełny
+config.json każe wyrenderować i przekonwertować wszystko od nowa. Ten skrypt
+porównuje nowy eksport (albo config.json) z poprzednim i dzieli kombinacje
+na:
+
+- dodane     - trafiają do config.delta.json (ten sam format co config.json,
+               więc czytają go plan_jobs.py, render_mockups.py i generatory
+               JSX) oraz do delta_images.csv (kolumna Images, jak eksport -
+               do convert to webp/converter_clean.py --csv_path),
+- usunięte   - ich pliki wynikowe są wypisywane, a z --delete-removed
+               usuwane z folderu output/ (potem converter.py --prune usuwa
+               osierocone pliki WebP razem z wariantami),
+- niezmienione - pomijane, o ile ich plik wynikowy jest w output/;
+               bez niego trafiają do dodanych (np. po nieudanym renderze).
+
+Poprzedni stan jest brany z --previous albo z migawki .cache/config_snapshot.json
+(bez migawki wszystkie kombinacje są nowe). Planowanie zapisuje nowy stan
+tylko jako migawkę oczekującą; punktem odniesienia staje się on dopiero po
+udanym renderze, przez --commit-snapshot:
+
+    python3 delta_config.py "extract/extract_art/GRAFIKI BLESSYOU MIGRACJA.csv"
+    python3 render_mockups.py --config config.delta.json
+    python3 delta_config.py --commit-snapshot
+
+    python3 delta_config.py nowy.csv --previous stary.csv --delete-removed
+"""
+
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from csv_ingest import IMAGES_COLUMN, mappings_from_csv
+from plan_jobs import iter_combinations, load_config, output_filename
+from process_extracted_to_config import create_config_json
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+output_folder = project_folder / "output"
+snapshot_file = project_folder / ".cache" / "config_snapshot.json"
+pending_snapshot_file = project_folder / ".cache" / "config_snapshot.pending.json"
+delta_config_file = project_folder / "config.delta.json"
+delta_images_file = project_folder / "delta_images.csv"
+
+
+def load_mappings(path, column=IMAGES_COLUMN):
+    """Mapowania {wejście: [mockupy]} z eksportu CSV albo z config.json"""
+    if Path(path).suffix.lower() == ".csv":
+        mappings, _ = mappings_from_csv(path, column)
+        return mappings
+    return load_config(path)
+
+
+def _combination_key(input_key, mockup_file):
+    # Wejścia są dopasowywane po nazwie bez rozszerzenia, mockupy bez względu na wielkość liter
+    return Path(input_key).stem, mockup_file.lower()
+
+
+def diff_mappings(old_mappings, new_mappings):
+    """
+    Porównuje dwa zestawy mapowań. Zwraca (dodane, usunięte, niezmienione)
+    jako listy (klucz wejścia, mockup) w kolejności z odpowiedniego configu.
+    """
+    old_combinations = iter_combinations(old_mappings)
+    new_combinations = iter_combinations(new_mappings)
+    old_keys = {_combination_key(*combination) for combination in old_combinations}
+    new_keys = {_combination_key(*combination) for combination in new_combinations}
+    added = [c for c in new_combinations if _combination_key(*c) not in old_keys]
+    removed = [c for c in old_combinations if _combination_key(*c) not in new_keys]
+    unchanged = [c for c in new_combinations if _combination_key(*c) in old_keys]
+    return added, removed, unchanged
+
+
+def group_mappings(combinations):
+    """Lista (wejście, mockup) -> mapowania {wejście: [mockupy]}"""
+    mappings = {}
+    for input_key, mockup_file in combinations:
+        mappings.setdefault(input_key, []).append(mockup_file)
+    return mappings
+
+
+def write_images_csv(combinations, path, column=IMAGES_COLUMN):
+    """Zapisuje nazwy plików WebP kombinacji w kolumnie Images (jeden wiersz na wejście)"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([column])
+        for input_key, mockup_files in group_mappings(combinations).items():
+            writer.writerow([", ".join(
+                Path(output_filename(input_key, mockup_file)).with_suffix(".webp").name for mockup_file in mockup_files
+            )])
+
+
+def removed_outputs(removed, output_dir):
+    """Istniejące pliki wynikowe usuniętych kombinacji"""
+    paths = (Path(output_dir) / output_filename(input_key, mockup_file) for input_key, mockup_file in removed)
+    return [path for path in paths if path.exists()]
+
+
+def missing_outputs(combinations, output_dir):
+    """Kombinacje, których pliku wynikowego nie ma w output_dir"""
+    return [
+        (input_key, mockup_file) for input_key, mockup_file in combinations
+        if not (Path(output_dir) / output_filename(input_key, mockup_file)).exists()
+    ]
+
+
+def save_snapshot(mappings, source, path=pending_snapshot_file):
+    """Zapisuje mapowania jako migawkę (domyślnie oczekującą, do zatwierdzenia po renderze)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {"_source": str(source), "_savedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    snapshot.update(mappings)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def commit_snapshot(pending_path=pending_snapshot_file, path=snapshot_file):
+    """Oczekująca migawka staje się punktem odniesienia. Zwraca False, gdy jej nie ma"""
+    if not Path(pending_path).exists():
+        return False
+    os.replace(pending_path, path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Różnica między eksportami: tylko nowe kombinacje do renderowania.")
+    parser.add_argument("new", nargs="?", help="Nowy eksport produktów (.csv) lub config.json")
+    parser.add_argument("--previous", default=None,
+                        help=f"Poprzedni eksport lub config.json (domyślnie migawka {snapshot_file})")
+    parser.add_argument("--column", default=IMAGES_COLUMN, help="Kolumna z URLami obrazów w eksportach CSV")
+    parser.add_argument("--output", default=str(delta_config_file), help="Plik configu z dodanymi kombinacjami")
+    parser.add_argument("--images-csv", default=str(delta_images_file),
+                        help="CSV z nazwami obrazów dodanych kombinacji (dla converter_clean.py)")
+    parser.add_argument("--output-folder", default=str(output_folder), help="Folder z wyrenderowanymi mockupami")
+    parser.add_argument("--delete-removed", action="store_true", help="Usuń pliki wynikowe usuniętych kombinacji")
+    parser.add_argument("--no-snapshot", action="store_true", help="Nie zapisuj nowego stanu jako migawki oczekującej")
+    parser.add_argument("--commit-snapshot", action="store_true",
+                        help="Po udanym renderze: zatwierdź migawkę oczekującą jako punkt odniesienia")
+    args = parser.parse_args()
+
+    if args.commit_snapshot:
+        if commit_snapshot():
+            print(f"📌 Zatwierdzono migawkę: {snapshot_file}")
+        else:
+            print(f"❌ Brak migawki oczekującej ({pending_snapshot_file}) - najpierw uruchom plan różnicowy")
+        return
+    if not args.new:
+        parser.error("podaj nowy eksport albo --commit-snapshot")
+
+    print("🚀 Plan różnicowy...")
+    previous = Path(args.previous) if args.previous else snapshot_file
+    try:
+        new_mappings = load_mappings(args.new, args.column)
+        if previous.exists():
+            old_mappings = load_mappings(previous, args.column)
+        else:
+            print(f"⚠️  Brak poprzedniego stanu ({previous}) - wszystkie kombinacje są nowe")
+            old_mappings = {}
+    except (OSError, ValueError) as e:
+        print(f"❌ Błąd: {e}")
+        return
+
+    added, removed, unchanged = diff_mappings(old_mappings, new_mappings)
+    # Kombinacja bez pliku wynikowego nie została wyrenderowana (albo render się nie udał)
+    not_rendered = missing_outputs(unchanged, args.output_folder)
+    added += not_rendered
+    print(f"📄 Nowy: {args.new}")
+    print(f"📄 Poprzedni: {previous if old_mappings else '-'}")
+    print(f"   ➕ Dodanych kombinacji: {len(added) - len(not_rendered)}")
+    print(f"   🔁 Niezmienionych bez pliku wynikowego (ponownie w planie): {len(not_rendered)}")
+    print(f"   ➖ Usuniętych kombinacji: {len(removed)}")
+    print(f"   ⏭️  Niezmienionych (pominięte): {len(unchanged) - len(not_rendered)}")
+
+    create_config_json(group_mappings(added), args.output, f"delta: {previous.name} -> {Path(args.new).name}")
+    write_images_csv(added, args.images_csv, args.column)
+    print(f"✅ Config różnicowy: {args.output}")
+    print(f"✅ Obrazy do konwersji: {args.images_csv}")
+
+    stale = removed_outputs(removed, args.output_folder)
+    if stale:
+        print(f"🗑️  Pliki wynikowe usuniętych kombinacji ({len(stale)}):")
+        for path in stale:
+            if args.delete_removed:
+                path.unlink()
+            print(f"   - {path}{' (usunięty)' if args.delete_removed else ''}")
+        if args.delete_removed:
+            print("   💡 Uruchom converter.py --prune, żeby usunąć ich pliki WebP")
+        else:
+            print("   💡 Dodaj --delete-removed, żeby je usunąć")
+
+    if not args.no_snapshot:
+        save_snapshot(new_mappings, args.new)
+        print(f"📌 Zapisano migawkę oczekującą: {pending_snapshot_file}")
+        print("   💡 Po udanym renderze uruchom delta_config.py --commit-snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pamięć podręczna przygotowanych grafik wejściowych (pamięć RAM + dysk, LRU)
+
+Przy resize: 'fill' każda kombinacja skaluje pełnowymiarowy PNG do rozmiaru
+smart obiektu swojego szablonu. To samo wejście trafia zwykle do kilku
+szablonów, a wiele szablonów ma identyczny rozmiar ramki, więc to samo
+skalowanie powtarza się wielokrotnie. InputArtCache trzyma gotową grafikę
+pod kluczem (hash wejścia, rozmiar ramki, align, resize, trimTransparency):
+
+- w pamięci: LRU ograniczone liczbą bajtów, także dla zdekodowanych źródeł,
+  więc każde wejście jest dekodowane raz na proces,
+- na dysku: pliki .npy współdzielone przez procesy, usuwane od najdawniej
+  używanych po przekroczeniu limitu.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Ścieżki do folderów
+project_folder = Path(__file__).resolve().parent
+cache_folder = project_folder / ".cache" / "input_art"
+
+DEFAULT_MEMORY_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_BYTES = 4 * 1024 * 1024 * 1024
+# Co ile zapisów sprawdzać rozmiar katalogu na dysku
+DISK_CHECK_INTERVAL = 20
+HASH_CHUNK_SIZE = 1024 * 1024
+
+STAT_KEYS = ("memory_hits", "disk_hits", "misses", "decodes", "memory_evictions", "disk_evictions")
+
+
+class LRUBytes:
+    """Słownik LRU ograniczony sumarycznym rozmiarem wartości (tablic NumPy / obrazów PIL)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.items = OrderedDict()
+        self.evictions = 0
+
+    @staticmethod
+    def _size(value):
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        return value.width * value.height * len(value.getbands())
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        if key in self.items:
+            self.current_bytes -= self._size(self.items.pop(key))
+        self.items[key] = value
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self.items.popitem(last=False)
+            self.current_bytes -= self._size(evicted)
+            self.evictions += 1
+
+
+class InputArtCache:
+    """Pamięć podręczna grafik dopasowanych do ramki smart obiektu"""
+
+    def __init__(self, cache_dir=cache_folder, max_memory_bytes=DEFAULT_MEMORY_BYTES,
+                 max_disk_bytes=DEFAULT_DISK_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUBytes(max_memory_bytes)
+        self.sources = LRUBytes(max_memory_bytes // 2)
+        self.hashes = {}
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+        self._writes_since_check = 0
+
+    # ------------------------------------------------------------------ klucze
+
+    def input_hash(self, input_path):
+        """Hash zawartości wejścia; liczony ponownie tylko po zmianie rozmiaru lub mtime"""
+        stat = os.stat(input_path)
+        signature = (str(input_path), stat.st_size, stat.st_mtime_ns)
+        if signature not in self.hashes:
+            digest = hashlib.sha256()
+            with open(input_path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            self.hashes[signature] = digest.hexdigest()
+        return self.hashes[signature]
+
+    @staticmethod
+    def art_key(input_hash, frame_size, align, resize, trim_transparency):
+        frame_w, frame_h = frame_size
+        return f"{input_hash[:32]}_{frame_w}x{frame_h}_{align.replace(' ', '-')}_{resize}_{int(bool(trim_transparency))}"
+
+    # ------------------------------------------------------------------ dysk
+
+    def _disk_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _load_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            art = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)  # czas użycia dla LRU na dysku
+        except OSError:
+            pass
+        return art
+
+    def _save_to_disk(self, key, art):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, art)
+        os.replace(tmp_path, path)
+
+        self._writes_since_check += 1
+        if self._writes_since_check >= DISK_CHECK_INTERVAL:
+            self._writes_since_check = 0
+            self.evict_disk()
+
+    def evict_disk(self):
+        """Usuwa najdawniej używane pliki, dopóki katalog nie zmieści się w limicie"""
+        if not self.cache_dir or not self.cache_dir.exists():
+            return
+        files = []
+        total = 0
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith(".npy") and ".tmp." not in entry.name:
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats["disk_evictions"] += 1
+
+    # ------------------------------------------------------------------ API
+
+    def _decoded_source(self, input_path, input_hash, trim_transparency):
+        """Zdekodowane (i ewentualnie przycięte) źródło; dekodowane raz na proces"""
+        key = (input_hash, bool(trim_transparency))
+        source = self.sources.get(key)
+        if source is None:
+            self.stats["decodes"] += 1
+            with Image.open(input_path) as img:
+                source = img.convert("RGBA")
+            if trim_transparency:
+                bbox = source.getchannel("A").getbbox()
+                if bbox:
+                    source = source.crop(bbox)
+            self.sources.put(key, source)
+        return source
+
+    def get(self, input_path, frame_size, align, resize, trim_transparency, prepare):
+        """
+        Zwraca grafikę dopasowaną do ramki jako tablicę uint8 RGBA.
+        prepare(źródło PIL, rozmiar ramki, align, resize) wykonuje dopasowanie
+        przy braku w pamięci podręcznej; źródło jest już przycięte.
+        """
+        input_hash = self.input_hash(input_path)
+        key = self.art_key(input_hash, frame_size, align, resize, trim_transparency)
+
+        art = self.memory.get(key)
+        if art is not None:
+            self.stats["memory_hits"] += 1
+            return art
+
+        art = self._load_from_disk(key)
+        if art is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            source = self._decoded_source(input_path, input_hash, trim_transparency)
+            art = np.asarray(prepare(source, frame_size, align, resize), dtype=np.uint8)
+            self._save_to_disk(key, art)
+
+        self.memory.put(key, art)
+        self.stats["memory_evictions"] = self.memory.evictions
+        return art
+
+    def snapshot(self):
+        """Kopia bieżących statystyk (do liczenia różnic między paczkami)"""
+        return dict(self.stats)
+
+
+def stats_delta(before, after):
+    return {key: after[key] - before.get(key, 0) for key in STAT_KEYS}
+
+
+def format_stats(stats):
+    """Czytelne podsumowanie statystyk pamięci podręcznej"""
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    hit_rate = (stats["memory_hits"] + stats["disk_hits"]) / lookups * 100 if lookups else 0.0
+    return (
+        f"trafienia: {stats['memory_hits']} (RAM) + {stats['disk_hits']} (dysk), "
+        f"chybienia: {stats['misses']}, skuteczność: {hit_rate:.1f}%, "
+        f"dekodowania: {stats['decodes']}, usunięte: {stats['memory_evictions']} (RAM) / {stats['disk_evictions']} (dysk)"
+    )
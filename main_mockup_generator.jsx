@@ -176,6 +176,10 @@ var configPath = projectFolder + '/config.json';
 var inputFolder = projectFolder + '/input';
 var mockupFolder = projectFolder + '/mockup';
 var outputFolder = projectFolder + '/output';
+var jobsPath = projectFolder + '/jobs.json';   // Resolved job list written by plan_jobs.py
+var useJobsFile = false;  // true: run jobs.json instead of config.json; it is renamed to jobs.done.json after a run without failures
+var journalPath = outputFolder + '/render_journal.jsonl';  // Append-only per-combination journal (see run_journal.py)
+var spanLogPath = '';  // Optional: span log for trace_convert.py, e.g. outputFolder + '/render_spans.jsonl'
 
 // Smart Object settings (same for all mockups)
 var smartObjectSettings = {
@@ -220,35 +224,95 @@ try {
 // FIND ACTUAL INPUT FILES
 // ============================================================================
 
-function findActualInputFile(configKey, inputFolderPath) {
-  // Remove extension from config key (e.g., "1.png" → "1")
-  var baseName = configKey.replace(/\.[^.]+$/, '');
-  
+// The input folder is scanned once and indexed by lowercase basename, so each
+// config key is a lookup instead of a folder listing (same rule as
+// asset_index.py on the Python side).
+var inputFileIndex = null;
+
+function buildInputIndex(inputFolderPath) {
+  var index = {};
   var folder = new Folder(inputFolderPath);
   if (!folder.exists) {
     processLog.add('WARNING: Input folder not found: ' + inputFolderPath, 'WARNING');
-    return null;
+    return index;
   }
   
   var files = folder.getFiles();
-  
-  // Look for file with matching basename
+  var names = [];
   for (var i = 0; i < files.length; i++) {
     if (files[i] instanceof Folder) continue;
-    
-    var fileName = files[i].name;
-    var fileBase = fileName.replace(/\.[^.]+$/, '');
-    
-    if (fileBase.toLowerCase() === baseName.toLowerCase()) {
-      processLog.add('  → Matched "' + configKey + '" to actual file: ' + fileName);
-      return fileName;
-    }
+    if (files[i].name.charAt(0) === '.') continue;
+    names.push(files[i].name);
+  }
+  names.sort();
+  
+  // Several files with the same basename: the first one alphabetically wins
+  for (var i = 0; i < names.length; i++) {
+    var key = names[i].replace(/\.[^.]+$/, '').toLowerCase();
+    if (!index.hasOwnProperty(key)) index[key] = names[i];
+  }
+  return index;
+}
+
+function findActualInputFile(configKey, inputFolderPath) {
+  if (inputFileIndex === null) inputFileIndex = buildInputIndex(inputFolderPath);
+  
+  // Remove extension from config key (e.g., "1.png" → "1")
+  var baseName = configKey.replace(/\.[^.]+$/, '').toLowerCase();
+  
+  if (inputFileIndex.hasOwnProperty(baseName)) {
+    processLog.add('  → Matched "' + configKey + '" to actual file: ' + inputFileIndex[baseName]);
+    return inputFileIndex[baseName];
   }
   
   processLog.add('  → WARNING: No file found for config key: ' + configKey, 'WARNING');
   return null;
 }
 
+// ============================================================================
+// LOAD RESOLVED JOB FILE (written by plan_jobs.py)
+// ============================================================================
+
+// Returns the parsed jobs.json when useJobsFile is set, or null if it is off,
+// or the file is missing, unreadable or older than config.json (then the
+// mapping is resolved from config.json below).
+function loadJobsFile(jobsFilePath, configFilePath) {
+  var jobsFile = new File(jobsFilePath);
+  if (!useJobsFile) {
+    if (jobsFile.exists) {
+      processLog.add('NOTE: ' + jobsFilePath + ' exists but is not used (set useJobsFile = true to run it)', 'INFO');
+    }
+    return null;
+  }
+  if (!jobsFile.exists) {
+    processLog.add('WARNING: useJobsFile is set but ' + jobsFilePath + ' does not exist - using config.json', 'WARNING');
+    return null;
+  }
+  
+  var configFileObj = new File(configFilePath);
+  if (configFileObj.exists && jobsFile.modified < configFileObj.modified) {
+    processLog.add('WARNING: jobs.json is older than config.json - using config.json instead (re-run plan_jobs.py)', 'WARNING');
+    return null;
+  }
+  
+  try {
+    jobsFile.encoding = 'UTF-8';
+    jobsFile.open('r');
+    var jobsContent = jobsFile.read();
+    jobsFile.close();
+    
+    var plan = JSON.parse(jobsContent);
+    if (!(plan.jobs instanceof Array)) {
+      processLog.add('WARNING: jobs.json has no "jobs" array - ignoring it', 'WARNING');
+      return null;
+    }
+    return plan;
+  } catch(e) {
+    processLog.add('WARNING: Could not read jobs.json - ' + e.toString(), 'WARNING');
+    return null;
+  }
+}
+
 // ============================================================================
 // BUILD MOCKUP ARRAY FROM CONFIG
 // ============================================================================
@@ -265,70 +329,101 @@ var outputOpts = {
   filename: outputFilenamePattern
 };
 
+// Output filename the engine produces for @input/@mockup patterns
+function outputNameFor(inputFileName, mockupPath) {
+  var mockupName = mockupPath.replace(/^.*[\/\\]/, '');
+  return outputFilenamePattern
+    .replace('@input', inputFileName.replace(/\.[^.]+$/, ''))
+    .replace('@mockup', mockupName.replace(/\.[^.]+$/, '')) + '.' + outputFormat;
+}
+
+function buildMockupItem(mockupPath, inputFolderPath, inputFileName) {
+  return {
+    output: outputOpts,
+    mockupPath: mockupPath,
+    smartObjects: [
+      {
+        target: smartObjectSettings.target,
+        input: inputFolderPath,
+        inputFiles: [inputFileName],
+        align: smartObjectSettings.align,
+        resize: smartObjectSettings.resize
+      }
+    ]
+  };
+}
+
 var mockupArray = [];
+var mockupJobs = [];   // Input, mockup and output name of each mockupArray item (for the journal)
 var combinationIndex = 0;
 var totalCombinations = 0;
 
-// First pass: count total combinations
-for (var inputKey in config) {
-  if (!config.hasOwnProperty(inputKey)) continue;
-  if (inputKey.charAt(0) === '_') continue; // Skip metadata fields
+var plan = loadJobsFile(jobsPath, configPath);
+if (plan) {
+  // Resolved job file: actual filenames and absolute paths, no folder scans
+  totalCombinations = plan.jobs.length;
+  processLog.add('USING JOB FILE INSTEAD OF CONFIG.JSON: ' + jobsPath + ' (' + totalCombinations + ' jobs, order: ' + plan._order + ')', 'WARNING');
   
-  var mockupList = config[inputKey];
-  if (!(mockupList instanceof Array)) continue;
+  for (var k = 0; k < plan.jobs.length; k++) {
+    var job = plan.jobs[k];
+    var jobInputFile = new File(job.inputPath);
+    combinationIndex++;
+    
+    processLog.add('Processing combination ' + combinationIndex + '/' + totalCombinations + ': ' + job.inputFile + ' → ' + job.mockup, 'INFO');
+    mockupArray.push(buildMockupItem(job.mockupPath, jobInputFile.parent.fsName, jobInputFile.name));
+    mockupJobs.push({ input: job.inputFile, mockup: job.mockup, output: job.output });
+  }
+} else {
+  // First pass: count total combinations
+  for (var inputKey in config) {
+    if (!config.hasOwnProperty(inputKey)) continue;
+    if (inputKey.charAt(0) === '_') continue; // Skip metadata fields
   
-  totalCombinations += mockupList.length;
-}
+    var mockupList = config[inputKey];
+    if (!(mockupList instanceof Array)) continue;
+  
+    totalCombinations += mockupList.length;
+  }
 
-processLog.add('Found ' + totalCombinations + ' combinations in config.json');
-processLog.add('');
+  processLog.add('Found ' + totalCombinations + ' combinations in config.json');
+  processLog.add('');
 
-// Second pass: build mockup objects
-for (var inputKey in config) {
-  if (!config.hasOwnProperty(inputKey)) continue;
-  if (inputKey.charAt(0) === '_') continue; // Skip metadata fields (like "_comment", "_description")
+  // Second pass: build mockup objects
+  for (var inputKey in config) {
+    if (!config.hasOwnProperty(inputKey)) continue;
+    if (inputKey.charAt(0) === '_') continue; // Skip metadata fields (like "_comment", "_description")
   
-  var mockupList = config[inputKey];
-  if (!(mockupList instanceof Array)) {
-    processLog.add('WARNING: Invalid value for "' + inputKey + '" - expected array', 'WARNING');
-    continue;
-  }
+    var mockupList = config[inputKey];
+    if (!(mockupList instanceof Array)) {
+      processLog.add('WARNING: Invalid value for "' + inputKey + '" - expected array', 'WARNING');
+      continue;
+    }
   
-  // Find actual input file
-  var actualInputFile = findActualInputFile(inputKey, inputFolder);
-  if (!actualInputFile) {
-    processLog.add('WARNING: Skipping "' + inputKey + '" - file not found', 'WARNING');
-    continue;
-  }
+    // Find actual input file
+    var actualInputFile = findActualInputFile(inputKey, inputFolder);
+    if (!actualInputFile) {
+      processLog.add('WARNING: Skipping "' + inputKey + '" - file not found', 'WARNING');
+      continue;
+    }
   
-  // Create mockup object for each mockup in the list
-  for (var j = 0; j < mockupList.length; j++) {
-    var mockupFile = mockupList[j];
-    combinationIndex++;
+    // Create mockup object for each mockup in the list
+    for (var j = 0; j < mockupList.length; j++) {
+      var mockupFile = mockupList[j];
+      combinationIndex++;
     
-    processLog.add('Processing combination ' + combinationIndex + '/' + totalCombinations + ': ' + actualInputFile + ' → ' + mockupFile, 'INFO');
+      processLog.add('Processing combination ' + combinationIndex + '/' + totalCombinations + ': ' + actualInputFile + ' → ' + mockupFile, 'INFO');
     
-    // Verify mockup file exists
-    var mockupPath = mockupFolder + '/' + mockupFile;
-    var mockupFileObj = new File(mockupPath);
-    if (!mockupFileObj.exists) {
-      processLog.add('  → WARNING: Mockup file not found: ' + mockupPath, 'WARNING');
-      continue;
-    }
+      // Verify mockup file exists
+      var mockupPath = mockupFolder + '/' + mockupFile;
+      var mockupFileObj = new File(mockupPath);
+      if (!mockupFileObj.exists) {
+        processLog.add('  → WARNING: Mockup file not found: ' + mockupPath, 'WARNING');
+        continue;
+      }
     
-    mockupArray.push({
-      output: outputOpts,
-      mockupPath: mockupPath,
-      smartObjects: [
-        {
-          target: smartObjectSettings.target,
-          input: inputFolder,
-          inputFiles: [actualInputFile],
-          align: smartObjectSettings.align,
-          resize: smartObjectSettings.resize
-        }
-      ]
-    });
+      mockupArray.push(buildMockupItem(mockupPath, inputFolder, actualInputFile));
+      mockupJobs.push({ input: actualInputFile, mockup: mockupFile, output: outputNameFor(actualInputFile, mockupPath) });
+    }
   }
 }
 
@@ -343,33 +438,135 @@ processLog.add('');
 
 logDebug('Starting mockup generation with ' + mockupArray.length + ' combinations');
 
+// ============================================================================
+// JOURNAL (one JSON line per event, written as each combination finishes)
+// ============================================================================
+
+function jsonString(value) {
+  return '"' + String(value)
+    .replace(/\\/g, '\\\\')
+    .replace(/"/g, '\\"')
+    .replace(/\n/g, '\\n')
+    .replace(/\r/g, '\\r')
+    .replace(/\t/g, '\\t') + '"';
+}
+
+function timeString(date) {
+  return date.getFullYear() + '-' + pad(date.getMonth() + 1) + '-' + pad(date.getDate()) + ' ' +
+         pad(date.getHours()) + ':' + pad(date.getMinutes()) + ':' + pad(date.getSeconds());
+}
+
+function appendJournal(eventName, jobInfo, extra) {
+  try {
+    var line = '{"event": ' + jsonString(eventName) +
+               ', "output": ' + jsonString(jobInfo.output) +
+               ', "input": ' + jsonString(jobInfo.input) +
+               ', "mockup": ' + jsonString(jobInfo.mockup) +
+               ', "time": ' + jsonString(timeString(new Date())) +
+               (extra || '') + '}';
+    var journalFile = new File(journalPath);
+    journalFile.encoding = 'UTF-8';
+    journalFile.open('a');
+    journalFile.writeln(line);
+    journalFile.close();
+  } catch(e) {
+    logDebug('Could not write journal: ' + e.toString());
+  }
+}
+
+// Span log (only when spanLogPath is set): a "B" line when a span begins and
+// an "E" line when it ends, with millisecond timestamps. trace_convert.py
+// turns it into the same Chrome/Perfetto trace as the Python tools' --trace.
+function appendSpan(phase, name, category, extra) {
+  if (!spanLogPath) {
+    return;
+  }
+  try {
+    var line = '{"ph": ' + jsonString(phase) +
+               ', "name": ' + jsonString(name) +
+               ', "cat": ' + jsonString(category) +
+               ', "ts": ' + new Date().getTime() +
+               (extra || '') + '}';
+    var spanFile = new File(spanLogPath);
+    spanFile.encoding = 'UTF-8';
+    spanFile.open('a');
+    spanFile.writeln(line);
+    spanFile.close();
+  } catch(e) {
+    logDebug('Could not write span log: ' + e.toString());
+  }
+}
+
 // ============================================================================
 // EXECUTE MOCKUP GENERATION
 // ============================================================================
 
-mockups(mockupArray);
+// One combination per engine call, so each result is journaled as soon as it
+// exists. After a crash, `python3 plan_jobs.py --resume` writes a jobs.json
+// without the combinations that already have a valid output.
+var completedCount = 0;
+var failedCount = 0;
+
+appendSpan('B', 'run', 'run', ', "combinations": ' + mockupArray.length);
+for (var m = 0; m < mockupArray.length; m++) {
+  var jobInfo = mockupJobs[m];
+  var jobStart = new Date();
+  appendJournal('start', jobInfo);
+  appendSpan('B', jobInfo.output, 'file', ', "input": ' + jsonString(jobInfo.input) + ', "mockup": ' + jsonString(jobInfo.mockup));
+  
+  try {
+    mockups([mockupArray[m]]);
+    var jobSeconds = ((new Date() - jobStart) / 1000).toFixed(2);
+    appendSpan('E', jobInfo.output, 'file', ', "status": "done"');
+    appendJournal('done', jobInfo, ', "seconds": ' + jobSeconds);
+    processLog.add((m + 1) + '/' + mockupArray.length + ': ' + jobInfo.output + ' (' + jobSeconds + 's)', 'PROCESSED');
+    completedCount++;
+  } catch(e) {
+    appendSpan('E', jobInfo.output, 'file', ', "status": "error"');
+    appendJournal('error', jobInfo, ', "message": ' + jsonString(e.toString()));
+    processLog.add('ERROR: ' + jobInfo.input + ' → ' + jobInfo.mockup + ' failed - ' + e.toString(), 'ERROR');
+    failedCount++;
+  }
+}
+appendSpan('E', 'run', 'run', ', "completed": ' + completedCount + ', "failed": ' + failedCount);
+
+// A fully processed job file is consumed, so a later run cannot repeat it by accident
+if (plan && failedCount === 0) {
+  var doneJobsFile = new File(jobsPath.replace(/\.json$/, '.done.json'));
+  if (doneJobsFile.exists) doneJobsFile.remove();
+  if (new File(jobsPath).rename(doneJobsFile.name)) {
+    processLog.add('Job file consumed: renamed to ' + doneJobsFile.fsName);
+  } else {
+    processLog.add('WARNING: Could not rename ' + jobsPath + ' - delete it before the next run', 'WARNING');
+  }
+}
 
 processLog.add('');
 processLog.add('=== MOCKUP GENERATION COMPLETED ===');
-processLog.add('Total combinations processed: 6');
-processLog.add('All operations completed successfully');
+processLog.add('Total combinations processed: ' + completedCount + '/' + mockupArray.length);
+if (failedCount > 0) {
+  processLog.add('Failed combinations: ' + failedCount + ' (see ' + journalPath + ')', 'WARNING');
+} else {
+  processLog.add('All operations completed successfully');
+}
 
-logDebug('Script completed successfully');
-logDebug('Files processed: 6 combination(s) from config.json');
+logDebug('Script completed');
+logDebug('Files processed: ' + completedCount + ' of ' + mockupArray.length + ' combination(s)');
 
 // Save detailed report to output folder
 var reportPath = processLog.saveReport();
+var summaryText = 'Processed: ' + completedCount + ' of ' + mockupArray.length + ' combination(s)\n' +
+                  (failedCount > 0 ? 'Failed: ' + failedCount + ' (re-run plan_jobs.py --resume)\n' : '') +
+                  'Based on ' + (plan ? 'jobs.json' : 'config.json') + ' mapping\n\n';
 
 if (reportPath) {
   alert('Batch process completed!\n\n' +
-        'Processed: 6 combination(s)\n' +
-        'Based on config.json mapping\n\n' +
+        summaryText +
         'Detailed report saved to:\n' + reportPath + '\n\n' +
         'Check Desktop for debug log if issues occur.');
 } else {
   alert('Batch process completed!\n\n' +
-        'Processed: 6 combination(s)\n' +
-        'Based on config.json mapping\n\n' +
+        summaryText +
         'WARNING: Could not save report to output folder\n' +
         'Check Desktop for debug log if issues occur.');
 }
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kompilator planu zadań z config.json
+
+main_mockup_generator.jsx przechodzi po config.json wejście po wejściu, więc
+popularny szablon (np. t-shirt_black_front.psd) jest otwierany ponownie dla
+każdego wejścia, które go używa. Ten skrypt układa kombinacje w wybranej
+kolejności - domyślnie grupując je według pliku mockupu - tak żeby runner lub
+renderer mógł trzymać jeden szablon w pamięci i przepuścić przez niego
+wszystkie jego wejścia. Raportuje też, ile wczytań szablonu to oszczędza.
+
+Foldery input/ i mockup/ są skanowane raz (asset_index.py), a każde zadanie
+w jobs.json ma już rzeczywiste nazwy plików i ścieżki bezwzględne, więc
+main_mockup_generator.jsx (z useJobsFile = true) wczytuje je bezpośrednio,
+bez szukania plików.
+Z --dedup kombinacje z identycznym wejściem są renderowane raz (dedup.py).
+"""
+
+import argparse
+import json
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import tracing
+from asset_catalog import AssetCatalog
+from asset_index import FolderIndex, resolve_input, resolve_mockup
+from dedup import DEDUP_MODES, dedup_jobs, input_digests
+from run_journal import is_output_current, journal_path, load_journal
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+config_file = project_folder / "config.json"
+input_folder = project_folder / "input"
+mockup_folder = project_folder / "mockup"
+output_folder = project_folder / "output"
+plan_file = project_folder / "jobs.json"
+
+OUTPUT_FORMAT = "jpg"
+OUTPUT_FILENAME_PATTERN = "@input_@mockup"
+
+# config  - kolejność z config.json (wejście po wejściu, jak w JSX)
+# mockup  - pogrupowane według mockupu, grupy w kolejności pierwszego wystąpienia
+# popular - pogrupowane według mockupu, najczęściej używane szablony najpierw
+ORDERS = ("config", "mockup", "popular")
+
+
+def load_config(config_path):
+    """Wczytuje config.json i zwraca mapowania bez pól meta (kluczy zaczynających się od '_')"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return {key: value for key, value in config.items() if not key.startswith("_") and isinstance(value, list)}
+
+
+def iter_combinations(mappings):
+    """Zwraca listę kombinacji (klucz wejścia, plik mockupu) w kolejności z config.json"""
+    return [(input_key, mockup_file) for input_key, mockup_list in mappings.items() for mockup_file in mockup_list]
+
+
+def order_combinations(combinations, order="mockup"):
+    """Układa kombinacje w zadanej kolejności (patrz ORDERS)"""
+    if order == "config":
+        return list(combinations)
+    if order not in ORDERS:
+        raise ValueError(f"Nieznana kolejność: {order}")
+
+    groups = OrderedDict()
+    for combination in combinations:
+        groups.setdefault(combination[1], []).append(combination)
+    ordered_groups = list(groups.values())
+    if order == "popular":
+        # sorted() jest stabilne, więc przy remisie zostaje kolejność pierwszego wystąpienia
+        ordered_groups = sorted(ordered_groups, key=len, reverse=True)
+    return [combination for group in ordered_groups for combination in group]
+
+
+def count_template_loads(combinations):
+    """Liczy wczytania szablonów, gdy w pamięci trzymany jest tylko ostatnio użyty szablon"""
+    loads = 0
+    previous = None
+    for _, mockup_file in combinations:
+        if mockup_file != previous:
+            loads += 1
+            previous = mockup_file
+    return loads
+
+
+def output_filename(input_file, mockup_file, pattern=OUTPUT_FILENAME_PATTERN, fmt=OUTPUT_FORMAT):
+    """Zwraca nazwę pliku wynikowego dla wzorca @input_@mockup"""
+    name = pattern.replace("@input", Path(input_file).stem).replace("@mockup", Path(mockup_file).stem)
+    return f"{name}.{fmt}"
+
+
+def folder_index(folder, catalog=None):
+    """Indeks folderu z katalogu plików (asset_catalog.py) albo z jednego skanu, gdy katalogu nie ma"""
+    return catalog.folder_index(folder) if catalog else FolderIndex(folder)
+
+
+def resolve_combinations(combinations, input_dir, mockup_dir, extra_mockups=(), catalog=None):
+    """
+    Dopasowuje kombinacje do rzeczywistych plików (jeden skan każdego folderu
+    albo zapytanie do katalogu plików). Mockupy z extra_mockups są przyjmowane
+    także bez pliku PSD (np. gotowe szablony renderera). Zwraca (zadania,
+    nierozwiązane klucze wejść, nierozwiązane mockupy); zadania zachowują
+    kolejność kombinacji.
+    """
+    with tracing.span("scan folders"):
+        input_index = folder_index(input_dir, catalog)
+        mockup_index = folder_index(mockup_dir, catalog)
+    jobs = []
+    unresolved_inputs = []
+    unresolved_mockups = []
+    for input_key, mockup_file in combinations:
+        actual_input = resolve_input(input_key, input_index)
+        actual_mockup = resolve_mockup(mockup_file, mockup_index)
+        if not actual_mockup and mockup_file in extra_mockups:
+            actual_mockup = mockup_file
+        if not actual_input:
+            if input_key not in unresolved_inputs:
+                unresolved_inputs.append(input_key)
+            continue
+        if not actual_mockup:
+            if mockup_file not in unresolved_mockups:
+                unresolved_mockups.append(mockup_file)
+            continue
+        jobs.append({
+            "input": input_key,
+            "inputFile": actual_input,
+            "inputPath": str(input_index.path(actual_input)),
+            "mockup": actual_mockup,
+            "mockupPath": str(mockup_index.path(actual_mockup)),
+            "output": output_filename(actual_input, actual_mockup),
+        })
+    return jobs, unresolved_inputs, unresolved_mockups
+
+
+def remove_completed(jobs, output_dir):
+    """
+    Odrzuca zadania, które mają już aktualny wynik w output_dir (patrz
+    run_journal.is_output_current). Zwraca (pozostałe zadania, liczba pominiętych).
+    """
+    journal = load_journal(journal_path(output_dir))
+    remaining = [
+        job for job in jobs
+        if not is_output_current(
+            Path(output_dir) / job["output"], (job["inputPath"], job["mockupPath"]), journal.get(job["output"])
+        )
+    ]
+    return remaining, len(jobs) - len(remaining)
+
+
+def compile_plan(mappings, order="mockup", input_dir=input_folder, mockup_dir=mockup_folder, catalog=None,
+                 dedup=None):
+    """
+    Buduje plan: uporządkowane, rozwiązane zadania i statystyki wczytań
+    szablonów. Z dedup ('exact' lub 'pixels', patrz dedup.py) zadania
+    z identycznym wejściem i tym samym mockupem trafiają do sekcji duplicates.
+    """
+    with tracing.span("order", order=order):
+        combinations = iter_combinations(mappings)
+        ordered = order_combinations(combinations, order)
+    with tracing.span("resolve", combinations=len(ordered)):
+        jobs, unresolved_inputs, unresolved_mockups = resolve_combinations(
+            ordered, input_dir, mockup_dir, catalog=catalog
+        )
+    resolved_count = len(jobs)
+    duplicates = {}
+    if dedup:
+        with tracing.span("dedup", mode=dedup):
+            jobs, duplicates = dedup_jobs(jobs, input_digests(jobs, dedup, catalog))
+    resolved = [(job["input"], job["mockup"]) for job in jobs]
+    # Mockupy są dopasowywane bez względu na wielkość liter
+    resolved_keys = {(input_key, mockup_file.lower()) for input_key, mockup_file in resolved}
+    plan = {
+        "_generatedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "_order": order,
+        "_inputFolder": str(Path(input_dir).resolve()),
+        "_mockupFolder": str(Path(mockup_dir).resolve()),
+        "_totalCombinations": len(ordered),
+        "_resolvedCombinations": resolved_count,
+        "_unresolvedInputs": unresolved_inputs,
+        "_unresolvedMockups": unresolved_mockups,
+        "_uniqueTemplates": len({mockup_file for _, mockup_file in resolved}),
+        "_templateLoads": count_template_loads(resolved),
+        "_templateLoadsConfigOrder": count_template_loads(
+            [(key, mockup_file) for key, mockup_file in combinations if (key, mockup_file.lower()) in resolved_keys]
+        ),
+        "jobs": jobs,
+    }
+    if dedup:
+        plan["_dedup"] = dedup
+        plan["_avoidedRenders"] = len(duplicates)
+        plan["duplicates"] = duplicates
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompiluje config.json do uporządkowanej listy zadań (jobs.json).")
+    parser.add_argument("--config", default=str(config_file), help="Ścieżka do config.json")
+    parser.add_argument("--input", default=str(input_folder), help="Folder z plikami wejściowymi")
+    parser.add_argument("--mockup", default=str(mockup_folder), help="Folder z plikami mockupów")
+    parser.add_argument("--output", default=str(plan_file), help="Ścieżka pliku planu")
+    parser.add_argument("--order", choices=ORDERS, default="mockup", help="Kolejność zadań")
+    parser.add_argument("--resume", action="store_true",
+                        help="Pomiń kombinacje z aktualnym wynikiem w folderze wyjściowym (wznowienie przerwanego przebiegu)")
+    parser.add_argument("--output-folder", default=str(output_folder),
+                        help="Folder z wynikami sprawdzany przez --resume")
+    parser.add_argument("--trace", default=None, metavar="OUT.json",
+                        help="Zapisz spany etapów jako ślad Chrome/Perfetto (patrz tracing.py)")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Skanuj foldery zamiast korzystać z katalogu plików (asset_catalog.py)")
+    parser.add_argument("--dedup", nargs="?", const="exact", choices=DEDUP_MODES, default=None,
+                        help="Renderuj każdą parę (grafika, mockup) raz: 'exact' - identyczne pliki wejściowe, "
+                             "'pixels' - identyczne piksele; duplikaty odtwarza potem dedup.py")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace, "plan_jobs")
+
+    print("🚀 Kompilowanie planu zadań...")
+    print(f"📄 Config: {args.config}")
+
+    with tracing.span("load config"):
+        mappings = load_config(args.config)
+    catalog = None if args.no_catalog else AssetCatalog()
+    plan = compile_plan(mappings, args.order, args.input, args.mockup, catalog, args.dedup)
+    if catalog:
+        catalog.close()
+    for input_key in plan["_unresolvedInputs"]:
+        print(f"⚠️  Brak pliku wejściowego dla klucza: {input_key}")
+    for mockup_file in plan["_unresolvedMockups"]:
+        print(f"⚠️  Brak pliku mockupu: {mockup_file}")
+
+    if args.resume:
+        with tracing.span("resume check"):
+            plan["jobs"], completed = remove_completed(plan["jobs"], args.output_folder)
+        plan["_resumedFrom"] = str(Path(args.output_folder).resolve())
+        plan["_completedCombinations"] = completed
+        plan["_templateLoads"] = count_template_loads([(job["input"], job["mockup"]) for job in plan["jobs"]])
+
+    with tracing.span("write plan"), open(args.output, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, ensure_ascii=False)
+
+    saved = plan["_templateLoadsConfigOrder"] - plan["_templateLoads"]
+    print(f"✅ Zapisano plan: {args.output}")
+    print(f"   🔄 Kombinacji: {plan['_totalCombinations']} (rozwiązanych: {plan['_resolvedCombinations']})")
+    if args.resume:
+        print(f"   ⏭️  Ukończonych wcześniej (pominięte): {plan['_completedCombinations']}, "
+              f"do zrobienia: {len(plan['jobs'])}")
+    if args.dedup:
+        print(f"   🔗 Duplikatów ({args.dedup}): {plan['_avoidedRenders']} - uniknięte renderowania, "
+              f"odtworzy je dedup.py")
+    print(f"   🧩 Unikalnych szablonów: {plan['_uniqueTemplates']}")
+    print(f"   📂 Wczytań szablonów ({args.order}): {plan['_templateLoads']}")
+    print(f"   📂 Wczytań szablonów (kolejność config.json): {plan['_templateLoadsConfigOrder']}")
+    print(f"   💡 Oszczędzone wczytania: {saved}")
+    trace_path = tracing.finish()
+    if trace_path:
+        print(f"🔍 Ślad: {trace_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kontrola przed przebiegiem (preflight): wejścia i szablony z config.json
+
+check_files_existence.py sprawdza tylko nazwy, więc uszkodzony PNG, wejście
+w CMYK albo PSD bez warstwy 'Frame 1' wychodzą dopiero w środku kilkugodzinnego
+przebiegu Photoshopa. Ten skrypt sprawdza równolegle każde użyte wejście
+i każdy szablon, czytając wyłącznie nagłówki i metadane (bez dekodowania
+pikseli):
+
+- wejścia (wątki - odczyt jest ograniczony przez dysk/sieć): format,
+  wymiary, tryb koloru, kanał alfa, profil ICC, spójność pliku (sumy
+  kontrolne fragmentów PNG),
+- szablony (procesy - parsowanie PSD obciąża CPU): wymiary dokumentu,
+  istnienie smart obiektu i rozmiar jego ramki; aktualny artefakt
+  z compile_templates.py albo template.json jest używany bez otwierania PSD,
+- kombinacje: wejście za małe dla ramki szablonu (wymagałoby powiększenia
+  przy resize 'fill'/'fit').
+
+Błędy kończą skrypt kodem 1 (z --strict także ostrzeżenia), więc może on
+blokować renderowanie:
+
+    python3 preflight.py && python3 render_mockups.py
+    python3 preflight.py --jobs jobs.json --report preflight.json
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+import compile_templates
+from asset_catalog import AssetCatalog
+from plan_jobs import iter_combinations, load_config, resolve_combinations
+from render_mockups import SMART_OBJECT_SETTINGS
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow bez littlecms - opis profilu ICC nie jest dostępny
+    ImageCms = None
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+config_file = project_folder / "config.json"
+input_folder = project_folder / "input"
+mockup_folder = project_folder / "mockup"
+
+# Powiększenie wejścia ponad tę skalę przy wypełnianiu ramki jest zgłaszane
+DEFAULT_MAX_UPSCALE = 1.0
+# Wątki dla nagłówków wejść (odczyt I/O, także z dysków sieciowych)
+INPUT_THREADS = 32
+# Tryby PIL, które Photoshop wstawi do smart obiektu bez zmiany kolorów
+RGB_MODES = {"RGB", "RGBA", "P", "PA"}
+
+
+def _icc_description(icc_bytes):
+    if ImageCms is None:
+        return None
+    try:
+        return ImageCms.getProfileDescription(ImageCms.ImageCmsProfile(BytesIO(icc_bytes))).strip()
+    except Exception:
+        return None
+
+
+def inspect_input(path):
+    """Metadane jednego wejścia z nagłówka; błędy i ostrzeżenia w listach errors/warnings"""
+    info = {"path": str(path), "format": None, "size": None, "mode": None, "alpha": False, "icc": None,
+            "errors": [], "warnings": []}
+    try:
+        with Image.open(path) as img:
+            info["format"] = img.format
+            info["size"] = list(img.size)
+            info["mode"] = img.mode
+            info["alpha"] = "A" in img.getbands() or "transparency" in img.info
+            icc = img.info.get("icc_profile")
+            if icc:
+                info["icc"] = _icc_description(icc) or "(nieczytelny opis)"
+            # verify() sprawdza strukturę pliku (w PNG sumy CRC fragmentów), nie dekodując pikseli
+            img.verify()
+    except Exception as e:
+        info["errors"].append(f"uszkodzony lub nieczytelny plik: {e}")
+        return info
+
+    if info["mode"] == "CMYK":
+        info["errors"].append("tryb CMYK (wejście musi być w RGB)")
+    elif info["mode"] not in RGB_MODES:
+        info["warnings"].append(f"tryb koloru {info['mode']} (oczekiwany RGB/RGBA)")
+    if info["icc"] and "srgb" not in info["icc"].lower():
+        info["warnings"].append(f"profil ICC inny niż sRGB: {info['icc']}")
+    return info
+
+
+def inspect_template(mockup_file, mockup_dir, templates_dir, target=SMART_OBJECT_SETTINGS["target"]):
+    """
+    Rozmiar dokumentu i ramki smart obiektu szablonu. Kolejno: template.json,
+    aktualny artefakt z compile_templates.py, metadane warstw PSD (psd-tools).
+    """
+    info = {"mockup": mockup_file, "source": None, "size": None, "frame": None, "errors": [], "warnings": []}
+    manual = Path(templates_dir) / Path(mockup_file).stem / "template.json"
+    psd_path = Path(mockup_dir) / mockup_file
+    compiled_dir = Path(mockup_dir) / ".compiled"
+    try:
+        if manual.exists():
+            with open(manual, "r", encoding="utf-8") as f:
+                spec = json.load(f)
+            info.update(source="template.json", size=spec.get("size"), frame=spec.get("frame"))
+            return info
+
+        # Aktualny artefakt albo same rekordy warstw PSD; piksele nie są składane ani dekodowane
+        geometry = compile_templates.template_geometry(psd_path, target, compiled_dir)
+        info.update(source=geometry["source"], size=geometry["size"], frame=geometry["frame"])
+    except json.JSONDecodeError as e:
+        info["errors"].append(f"uszkodzony lub nieczytelny szablon: {e}")
+    except ValueError as e:
+        # Brak smart obiektu albo jego narożników
+        info["errors"].append(str(e))
+    except RuntimeError:
+        # Bez psd-tools i bez artefaktu zostaje sam nagłówek PSD
+        try:
+            with Image.open(psd_path) as img:
+                info.update(source="psd header", size=list(img.size))
+            info["warnings"].append("brak psd-tools - nie sprawdzono smart obiektu")
+        except Exception as e:
+            info["errors"].append(f"uszkodzony lub nieczytelny szablon: {e}")
+    except Exception as e:
+        info["errors"].append(f"uszkodzony lub nieczytelny szablon: {e}")
+    return info
+
+
+def required_upscale(input_size, frame_size, resize=SMART_OBJECT_SETTINGS["resize"]):
+    """Skala, o jaką renderer powiększy wejście, żeby dopasować je do ramki (1.0 = bez powiększenia)"""
+    scale_x = frame_size[0] / input_size[0]
+    scale_y = frame_size[1] / input_size[1]
+    if resize == "fit":
+        return min(scale_x, scale_y)
+    if resize == "xFill":
+        return scale_x
+    if resize == "yFill":
+        return scale_y
+    return max(scale_x, scale_y)
+
+
+def run_preflight(jobs, mockup_dir, templates_dir, workers=None, max_upscale=DEFAULT_MAX_UPSCALE):
+    """
+    Sprawdza wejścia i szablony zadań (słowniki z inputPath i mockup, jak
+    w jobs.json). Zwraca (wejścia {ścieżka: info}, szablony {mockup: info},
+    ostrzeżenia kombinacji).
+    """
+    input_paths = sorted({job["inputPath"] for job in jobs})
+    mockup_files = sorted({job["mockup"] for job in jobs})
+
+    with ThreadPoolExecutor(max_workers=INPUT_THREADS) as threads, \
+            ProcessPoolExecutor(max_workers=workers) as processes:
+        template_futures = {
+            mockup_file: processes.submit(inspect_template, mockup_file, mockup_dir, templates_dir)
+            for mockup_file in mockup_files
+        }
+        inputs = dict(zip(input_paths, threads.map(inspect_input, input_paths)))
+        templates = {mockup_file: future.result() for mockup_file, future in template_futures.items()}
+
+    combination_warnings = []
+    for job in jobs:
+        input_info, template_info = inputs[job["inputPath"]], templates[job["mockup"]]
+        if not input_info["size"] or not template_info["frame"]:
+            continue
+        scale = required_upscale(input_info["size"], template_info["frame"])
+        if scale > max_upscale:
+            combination_warnings.append(
+                f"{Path(job['inputPath']).name} -> {job['mockup']}: wejście {input_info['size'][0]}x"
+                f"{input_info['size'][1]} za małe dla ramki {template_info['frame'][0]}x"
+                f"{template_info['frame'][1]} (powiększenie x{scale:.2f})"
+            )
+    return inputs, templates, combination_warnings
+
+
+def load_jobs(args):
+    """Zadania z jobs.json albo z config.json (ta sama reguła dopasowania co plan_jobs.py)"""
+    if args.jobs:
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            return json.load(f)["jobs"], [], []
+    mappings = load_config(args.config)
+    templates_dir = Path(args.templates) if args.templates else Path(args.mockup) / "templates"
+    with_templates = {
+        mockup_file for _, mockup_file in iter_combinations(mappings)
+        if (templates_dir / Path(mockup_file).stem / "template.json").exists()
+    }
+    with AssetCatalog() as catalog:
+        return resolve_combinations(iter_combinations(mappings), args.input, args.mockup, with_templates, catalog)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sprawdza nagłówki wejść i szablonów przed przebiegiem.")
+    parser.add_argument("--config", default=str(config_file), help="Ścieżka do config.json")
+    parser.add_argument("--jobs", default=None, help="Sprawdź zadania z jobs.json (plan_jobs.py) zamiast config.json")
+    parser.add_argument("--input", default=str(input_folder), help="Folder z plikami wejściowymi")
+    parser.add_argument("--mockup", default=str(mockup_folder), help="Folder z plikami mockupów")
+    parser.add_argument("--templates", default=None, help="Folder z gotowymi szablonami (domyślnie mockup/templates)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesy do parsowania PSD (domyślnie liczba rdzeni)")
+    parser.add_argument("--max-upscale", type=float, default=DEFAULT_MAX_UPSCALE,
+                        help="Zgłaszaj kombinacje, w których wejście trzeba powiększyć bardziej niż tyle razy")
+    parser.add_argument("--strict", action="store_true", help="Traktuj ostrzeżenia jak błędy (kod wyjścia 1)")
+    parser.add_argument("--report", default=None, help="Zapisz wyniki (JSON) pod tą ścieżką")
+    args = parser.parse_args()
+
+    print("🛫 Preflight wejść i szablonów...")
+    jobs, unresolved_inputs, unresolved_mockups = load_jobs(args)
+    templates_dir = Path(args.templates) if args.templates else Path(args.mockup) / "templates"
+    inputs, templates, combination_warnings = run_preflight(
+        jobs, args.mockup, templates_dir, args.workers, args.max_upscale
+    )
+
+    errors = [f"Brak pliku wejściowego dla klucza: {key}" for key in unresolved_inputs]
+    errors += [f"Brak pliku mockupu: {mockup_file}" for mockup_file in unresolved_mockups]
+    warnings = list(combination_warnings)
+    for path, info in inputs.items():
+        errors += [f"{Path(path).name}: {message}" for message in info["errors"]]
+        warnings += [f"{Path(path).name}: {message}" for message in info["warnings"]]
+    for mockup_file, info in templates.items():
+        errors += [f"{mockup_file}: {message}" for message in info["errors"]]
+        warnings += [f"{mockup_file}: {message}" for message in info["warnings"]]
+
+    print(f"   🖼️  Wejść: {len(inputs)}, 🧩 szablonów: {len(templates)}, 🔄 kombinacji: {len(jobs)}")
+    for message in errors:
+        print(f"❌ {message}")
+    for message in warnings:
+        print(f"⚠️  {message}")
+
+    if args.report:
+        report = {"errors": errors, "warnings": warnings, "inputs": inputs, "templates": templates}
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📝 Raport: {args.report}")
+
+    failed = bool(errors) or (args.strict and bool(warnings))
+    print(f"\n{'❌' if failed else '✅'} Błędów: {len(errors)}, ostrzeżeń: {len(warnings)}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Skrypt do przetworzenia extracted_images.txt do formatu config.json
+Skrypt do przetworzenia eksportu produktów do formatu config.json
 Zachowuje metadane i tworzy mapowania zgodnie z wymaganiami
+
+Domyślnie czyta bezpośrednio eksport CSV (csv_ingest.py - jedno przejście,
+bez extract_images.py i pośredniego extracted_images.txt). Gdy eksportu nie
+ma, albo z --extracted, czyta extracted_images.txt jak dotychczas.
 """
 
+import argparse
 import json
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+from csv_ingest import IMAGES_COLUMN, mappings_from_csv
+
 # Ścieżki do plików
 project_folder = Path("/Users/damianaugustyn/Documents/projects/Smart PS replacer")
+csv_file = project_folder / "extract" / "extract_art" / "GRAFIKI BLESSYOU MIGRACJA.csv"
 extracted_file = project_folder / "extract" / "extract_art" / "extracted_images.txt"
 config_file = project_folder / "config.json"
 
@@ -19,7 +27,7 @@ def parse_extracted_images(file_path):
     """
     Parsuje plik extracted_images.txt i zwraca słownik grupujący mockupy według nazw plików wejściowych
     """
-    mappings = defaultdict(list)
+    mappings = defaultdict(set)
     
     with open(file_path, 'r', encoding='utf-8') as f:
         for line in f:
@@ -46,13 +54,12 @@ def parse_extracted_images(file_path):
             input_key = f"{input_name}.png"
             mockup_value = f"{mockup_name}.psd"
             
-            # Dodaj do mapowania (unikaj duplikatów)
-            if mockup_value not in mappings[input_key]:
-                mappings[input_key].append(mockup_value)
+            # Dodaj do mapowania (zbiór odrzuca duplikaty)
+            mappings[input_key].add(mockup_value)
     
-    return dict(mappings)
+    return {input_key: sorted(mockups) for input_key, mockups in mappings.items()}
 
-def create_config_json(mappings, output_path):
+def create_config_json(mappings, output_path, generated_from="extracted_images.txt"):
     """
     Tworzy nowy config.json z zachowaniem metadanych
     """
@@ -75,7 +82,7 @@ def create_config_json(mappings, output_path):
             "Output files are named: inputBasename_mockupBasename.jpg"
         ],
         "_lastModified": datetime.now().strftime("%Y-%m-%d"),
-        "_generatedFrom": "extracted_images.txt",
+        "_generatedFrom": generated_from,
         "_totalInputFiles": len(mappings),
         "_totalCombinations": sum(len(mockups) for mockups in mappings.values())
     }
@@ -98,18 +105,37 @@ def create_config_json(mappings, output_path):
         json.dump(config_data, f, indent=2, ensure_ascii=False)
 
 def main():
-    print("🚀 Przetwarzanie extracted_images.txt do config.json...")
-    print(f"📁 Źródło: {extracted_file}")
-    print(f"📁 Cel: {config_file}")
+    parser = argparse.ArgumentParser(description="Tworzy config.json z eksportu produktów (CSV) lub extracted_images.txt.")
+    parser.add_argument("--csv", default=str(csv_file), help="Eksport produktów (CSV z kolumną obrazów)")
+    parser.add_argument("--column", default=IMAGES_COLUMN, help="Kolumna z URLami obrazów")
+    parser.add_argument("--extracted", action="store_true",
+                        help=f"Czytaj extracted_images.txt zamiast eksportu CSV ({extracted_file})")
+    parser.add_argument("--output", default=str(config_file), help="Ścieżka config.json")
+    args = parser.parse_args()
+
+    source = extracted_file if args.extracted or not Path(args.csv).exists() else Path(args.csv)
+    output = Path(args.output)
+    print(f"🚀 Przetwarzanie {source.name} do config.json...")
+    print(f"📁 Źródło: {source}")
+    print(f"📁 Cel: {output}")
     
     # Sprawdź czy plik źródłowy istnieje
-    if not extracted_file.exists():
-        print(f"❌ Błąd: Plik {extracted_file} nie istnieje!")
+    if not source.exists():
+        print(f"❌ Błąd: Plik {source} nie istnieje!")
         return
     
     # Parsuj plik
-    print("\n📖 Parsowanie extracted_images.txt...")
-    mappings = parse_extracted_images(extracted_file)
+    print(f"\n📖 Parsowanie {source.name}...")
+    if source == extracted_file:
+        mappings = parse_extracted_images(source)
+    else:
+        try:
+            mappings, skipped = mappings_from_csv(source, args.column)
+        except ValueError as e:
+            print(f"❌ Błąd: {e}")
+            return
+        for name in skipped:
+            print(f"Ostrzeżenie: Pomijam obraz bez separatora '_': {name}")
     
     # Pokaż statystyki
     total_inputs = len(mappings)
@@ -129,13 +155,13 @@ def main():
     
     # Utwórz config.json
     print(f"\n💾 Tworzenie config.json...")
-    create_config_json(mappings, config_file)
+    create_config_json(mappings, output, source.name)
     
-    print(f"✅ Pomyślnie utworzono {config_file}")
+    print(f"✅ Pomyślnie utworzono {output}")
     print(f"📊 Zawiera {total_inputs} plików wejściowych i {total_combinations} kombinacji")
     
     # Pokaż rozmiar pliku
-    file_size = config_file.stat().st_size
+    file_size = output.stat().st_size
     print(f"📏 Rozmiar pliku: {file_size:,} bajtów")
     
     print("\n🎉 Gotowe! Config.json został pomyślnie wygenerowany.")
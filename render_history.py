@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Historia czasów renderowania per szablon
+
+Po każdym przebiegu renderer dopisuje średni czas jednej kombinacji dla
+każdego użytego szablonu (średnia krocząca). Zapis nie jest blokowany, więc
+historię aktualizuje jeden proces naraz: przy shardach (shard_jobs.py --run)
+robi to koordynator po scaleniu raportów, a nie każdy shard osobno. shard_jobs.py używa tych czasów
+do szacowania kosztu zadań przy dzieleniu przebiegu na shardy.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+history_file = project_folder / ".cache" / "render_history.json"
+
+# Waga nowego pomiaru w średniej kroczącej
+SMOOTHING = 0.3
+
+
+def load_history(path=history_file):
+    """Zwraca {plik mockupu: {"seconds": średni czas kombinacji, "count": liczba pomiarów}}"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def update_history(durations, path=history_file):
+    """
+    Dopisuje pomiary z przebiegu: durations to lista (plik mockupu, sekundy).
+    Zwraca zaktualizowaną historię.
+    """
+    per_template = {}
+    for mockup_file, seconds in durations:
+        per_template.setdefault(mockup_file, []).append(seconds)
+    if not per_template:
+        return load_history(path)
+
+    history = load_history(path)
+    for mockup_file, samples in per_template.items():
+        average = sum(samples) / len(samples)
+        entry = history.get(mockup_file)
+        if entry:
+            entry["seconds"] = entry["seconds"] * (1 - SMOOTHING) + average * SMOOTHING
+            entry["count"] += len(samples)
+        else:
+            history[mockup_file] = {"seconds": average, "count": len(samples)}
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, path)
+    return history
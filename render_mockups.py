@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bezgłowy renderer mockupów w Pythonie - alternatywa dla przebiegu w Photoshopie
+
+Czyta ten sam config.json co main_mockup_generator.jsx i te same ustawienia
+smart obiektu (target / align / resize), ale zamiast otwierać PSD składa
+mockup z wcześniej wyrenderowanego szablonu:
+
+    mockup/templates/<nazwa_mockupu>/template.json
+    {
+      "size": [3000, 3000],               # rozmiar dokumentu (px)
+      "frame": [1200, 1500],              # rozmiar zawartości smart obiektu 'Frame 1'
+      "quad": [[x, y], [x, y], [x, y], [x, y]],   # narożniki: LG, PG, PD, LD
+                                          # (albo "rect": [x, y, szer, wys])
+      "base": "base.png",                 # warstwy pod smart obiektem
+      "mask": "mask.png",                 # opcjonalnie: maska smart obiektu (skala szarości)
+      "overlays": [                       # opcjonalnie: cienie / światła nad grafiką
+        {"file": "shadows.png", "blend": "multiply", "opacity": 1.0}
+      ]
+    }
+
+Szablony bez folderu w mockup/templates są brane z kompilatora PSD
+(compile_templates.py), który wyciąga te same dane z pliku .psd i trzyma
+je w mockup/.compiled jako tablice mapowane w pamięć.
+
+Warpowanie (homografia + próbkowanie dwuliniowe) i mieszanie warstw są
+zwektoryzowane w NumPy, a kombinacje renderowane równolegle na wszystkich
+rdzeniach. Pliki wynikowe mają te same nazwy co z Photoshopa (@input_@mockup).
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import compile_templates
+import tracing
+from asset_catalog import AssetCatalog
+from input_cache import (
+    DEFAULT_DISK_BYTES, DEFAULT_MEMORY_BYTES, STAT_KEYS, InputArtCache, cache_folder, format_stats, stats_delta,
+)
+from plan_jobs import ORDERS, iter_combinations, load_config, order_combinations, resolve_combinations
+from render_history import update_history
+from run_journal import append_event, is_output_current, journal_path, load_journal
+
+# Ścieżki do folderów
+project_folder = Path(__file__).resolve().parent
+config_file = project_folder / "config.json"
+input_folder = project_folder / "input"
+mockup_folder = project_folder / "mockup"
+templates_folder = mockup_folder / "templates"
+output_folder = project_folder / "output"
+
+# Ustawienia smart obiektu (te same co w main_mockup_generator.jsx)
+SMART_OBJECT_SETTINGS = {
+    "target": "Frame 1",
+    "align": "center center",
+    "resize": "fill",
+    "trimTransparency": True,
+}
+
+JPEG_QUALITY = 95
+
+BLEND_MODES = ("normal", "multiply", "screen")
+# Maksymalna liczba kombinacji jednego szablonu w jednym zadaniu dla procesu
+BATCH_SIZE = 25
+
+
+# ============================================================================
+# KONFIGURACJA I ZADANIA
+# ============================================================================
+
+def build_jobs(mappings, input_dir, mockup_dir, output_dir, order="mockup", templates_dir=None, catalog=None):
+    """
+    Zamienia mapowania z config.json na listę zadań (ścieżka wejścia, nazwa mockupu, ścieżka wyjścia)
+    w kolejności i według reguły dopasowania z plan_jobs.py. Mockupy z gotowym szablonem
+    w templates_dir nie potrzebują pliku PSD. Zwraca (zadania, ostrzeżenia).
+    """
+    combinations = order_combinations(iter_combinations(mappings), order)
+    with_templates = {
+        mockup_file for _, mockup_file in combinations
+        if templates_dir and (Path(templates_dir) / Path(mockup_file).stem / "template.json").exists()
+    }
+    resolved, unresolved_inputs, unresolved_mockups = resolve_combinations(
+        combinations, input_dir, mockup_dir, with_templates, catalog
+    )
+    jobs = [(job["inputPath"], job["mockup"], str(Path(output_dir) / job["output"])) for job in resolved]
+    warnings = [f"Brak pliku wejściowego dla klucza: {key}" for key in unresolved_inputs]
+    warnings += [f"Brak pliku mockupu: {mockup_file}" for mockup_file in unresolved_mockups]
+    return jobs, warnings
+
+
+def load_job_file(jobs_path, output_dir):
+    """
+    Wczytuje rozwiązane zadania z pliku w formacie jobs.json (plan_jobs.py, shard_jobs.py).
+    Zwraca (zadania, ostrzeżenia) jak build_jobs.
+    """
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    jobs = [(job["inputPath"], job["mockup"], str(Path(output_dir) / job["output"])) for job in plan["jobs"]]
+    warnings = [f"Brak pliku wejściowego dla klucza: {key}" for key in plan.get("_unresolvedInputs", [])]
+    warnings += [f"Brak pliku mockupu: {mockup_file}" for mockup_file in plan.get("_unresolvedMockups", [])]
+    return jobs, warnings
+
+
+def write_report(report_path, records, cache_stats, duration):
+    """Zapisuje raport przebiegu: wynik i czas każdej kombinacji oraz podsumowanie"""
+    report = {
+        "generatedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "durationSeconds": round(duration, 3),
+        "totalCombinations": len(records),
+        "rendered": sum(1 for record in records if record["status"] == "OK"),
+        "errors": [record for record in records if record["status"] != "OK"],
+        "cacheStats": cache_stats,
+        "results": records,
+    }
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def batch_jobs(jobs, batch_size=BATCH_SIZE):
+    """
+    Dzieli zadania na paczki kolejnych kombinacji tego samego szablonu, żeby
+    proces wczytywał szablon raz na paczkę. Długie grupy są dzielone na
+    paczki po batch_size, żeby obciążenie rozłożyło się na wszystkie rdzenie.
+    """
+    batches = []
+    for job in jobs:
+        if batches and batches[-1][-1][1] == job[1] and len(batches[-1]) < batch_size:
+            batches[-1].append(job)
+        else:
+            batches.append([job])
+    return batches
+
+
+# ============================================================================
+# SZABLONY
+# ============================================================================
+
+def _load_rgba(path):
+    """Wczytuje obraz jako tablicę uint8 RGBA"""
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGBA"), dtype=np.uint8)
+
+
+def _quad_from_spec(spec):
+    """Zwraca narożniki miejsca na grafikę (LG, PG, PD, LD) jako tablicę 4x2"""
+    if "quad" in spec:
+        return np.asarray(spec["quad"], dtype=np.float64)
+    x, y, w, h = spec["rect"]
+    return np.asarray([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.float64)
+
+
+def load_template(mockup_file, templates_dir=templates_folder):
+    """
+    Wczytuje wyrenderowany szablon dla pliku mockupu (np. 'hoodie_white_back.psd').
+    Zwraca słownik z tablicami NumPy uint8 (baza RGB, maska, nakładki RGBA).
+    """
+    template_dir = Path(templates_dir) / Path(mockup_file).stem
+    with open(template_dir / "template.json", "r", encoding="utf-8") as f:
+        spec = json.load(f)
+
+    base = _load_rgba(template_dir / spec.get("base", "base.png"))[..., :3]
+    mask = None
+    if spec.get("mask"):
+        with Image.open(template_dir / spec["mask"]) as img:
+            mask = np.asarray(img.convert("L"), dtype=np.uint8)
+
+    overlays = []
+    for overlay in spec.get("overlays", []):
+        blend = overlay.get("blend", "normal")
+        if blend not in BLEND_MODES:
+            raise ValueError(f"Nieznany tryb mieszania '{blend}' w {template_dir}")
+        overlays.append((_load_rgba(template_dir / overlay["file"]), blend, float(overlay.get("opacity", 1.0))))
+
+    return {
+        "size": tuple(spec.get("size", (base.shape[1], base.shape[0]))),
+        "frame": tuple(spec["frame"]),
+        "quad": _quad_from_spec(spec),
+        "base": base,
+        "mask": mask,
+        "overlays": overlays,
+    }
+
+
+# ============================================================================
+# PRZYGOTOWANIE GRAFIKI (resize / align jak w silniku Photoshopa)
+# ============================================================================
+
+def _align_offset(free_space, position):
+    if position in ("left", "top"):
+        return 0
+    if position in ("right", "bottom"):
+        return free_space
+    return free_space // 2
+
+
+def fit_art_to_frame(art, frame_size, align="center center", resize="fill", trim_transparency=True):
+    """
+    Dopasowuje grafikę (PIL RGBA) do rozmiaru smart obiektu tak jak silnik JSX:
+    'fill' wypełnia i przycina, 'fit' mieści całość, 'xFill'/'yFill' dopasowują
+    jeden wymiar, a False zostawia oryginalny rozmiar. Nadmiar jest przycinany,
+    a brak uzupełniany przezroczystością zgodnie z 'align'.
+    """
+    if trim_transparency:
+        bbox = art.getchannel("A").getbbox()
+        if bbox:
+            art = art.crop(bbox)
+
+    frame_w, frame_h = frame_size
+    art_w, art_h = art.size
+    if resize == "fill":
+        scale = max(frame_w / art_w, frame_h / art_h)
+    elif resize == "fit":
+        scale = min(frame_w / art_w, frame_h / art_h)
+    elif resize == "xFill":
+        scale = frame_w / art_w
+    elif resize == "yFill":
+        scale = frame_h / art_h
+    else:
+        scale = 1.0
+
+    if scale != 1.0:
+        art = art.resize((max(1, round(art_w * scale)), max(1, round(art_h * scale))), Image.LANCZOS)
+
+    horizontal, _, vertical = align.partition(" ")
+    offset = (
+        _align_offset(frame_w - art.size[0], horizontal),
+        _align_offset(frame_h - art.size[1], vertical or "center"),
+    )
+    canvas = Image.new("RGBA", (frame_w, frame_h), (0, 0, 0, 0))
+    canvas.paste(art, offset)
+    return canvas
+
+
+# ============================================================================
+# WARPOWANIE I MIESZANIE (NumPy)
+# ============================================================================
+
+def homography(src, dst):
+    """Zwraca macierz 3x3 przekształcającą 4 punkty src na 4 punkty dst"""
+    rows = []
+    rhs = []
+    for (x, y), (u, v) in zip(src, dst):
+        rows.append([x, y, 1, 0, 0, 0, -u * x, -u * y])
+        rows.append([0, 0, 0, x, y, 1, -v * x, -v * y])
+        rhs.extend([u, v])
+    h = np.linalg.solve(np.asarray(rows, dtype=np.float64), np.asarray(rhs, dtype=np.float64))
+    return np.append(h, 1.0).reshape(3, 3)
+
+
+def _sample_bilinear(image, u, v):
+    """Próbkuje dwuliniowo obraz HxWxC w punktach (u, v); poza obrazem zwraca zera"""
+    height, width = image.shape[:2]
+    x0 = np.floor(u).astype(np.int64)
+    y0 = np.floor(v).astype(np.int64)
+    fx = (u - x0)[..., None].astype(np.float32)
+    fy = (v - y0)[..., None].astype(np.float32)
+
+    def tap(xs, ys):
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        values = image[np.clip(ys, 0, height - 1), np.clip(xs, 0, width - 1)]
+        return values * inside[..., None]
+
+    top = tap(x0, y0) * (1 - fx) + tap(x0 + 1, y0) * fx
+    bottom = tap(x0, y0 + 1) * (1 - fx) + tap(x0 + 1, y0 + 1) * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def warp_into_quad(art, quad, canvas_size):
+    """
+    Nakłada grafikę (float32 RGBA, premultiplied) na czworokąt quad w dokumencie
+    o rozmiarze canvas_size. Zwraca (warstwa RGBA obejmująca bbox, (x0, y0)).
+    """
+    art_h, art_w = art.shape[:2]
+    canvas_w, canvas_h = canvas_size
+    x0 = max(int(np.floor(quad[:, 0].min())), 0)
+    y0 = max(int(np.floor(quad[:, 1].min())), 0)
+    x1 = min(int(np.ceil(quad[:, 0].max())), canvas_w)
+    y1 = min(int(np.ceil(quad[:, 1].max())), canvas_h)
+    if x1 <= x0 or y1 <= y0:
+        return np.zeros((0, 0, 4), dtype=np.float32), (x0, y0)
+
+    # Szybka ścieżka: prostokąt w osiach o rozmiarze ramki to zwykłe przesunięcie
+    corners = np.asarray([[0, 0], [art_w, 0], [art_w, art_h], [0, art_h]], dtype=np.float64)
+    if np.allclose(quad - quad[0], corners) and quad[0][0] == x0 and quad[0][1] == y0:
+        return art[: y1 - y0, : x1 - x0], (x0, y0)
+
+    inverse = homography(quad, corners)
+    ys, xs = np.mgrid[y0:y1, x0:x1].astype(np.float64)
+    xs += 0.5
+    ys += 0.5
+    w = inverse[2, 0] * xs + inverse[2, 1] * ys + inverse[2, 2]
+    u = (inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]) / w - 0.5
+    v = (inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]) / w - 0.5
+    return _sample_bilinear(art, u, v), (x0, y0)
+
+
+def blend_overlay(canvas, overlay, mode, opacity):
+    """Miesza warstwę RGBA z płótnem RGB w trybie normal / multiply / screen"""
+    rgb = overlay[..., :3]
+    alpha = overlay[..., 3:4] * opacity
+    if mode == "multiply":
+        blended = canvas * rgb
+    elif mode == "screen":
+        blended = 1.0 - (1.0 - canvas) * (1.0 - rgb)
+    else:
+        blended = rgb
+    canvas += (blended - canvas) * alpha
+    return canvas
+
+
+def composite(template, art):
+    """Składa mockup: baza + grafika w miejscu smart obiektu (z maską) + nakładki"""
+    canvas = template["base"].astype(np.float32) / 255.0
+
+    premultiplied = art.copy()
+    premultiplied[..., :3] *= premultiplied[..., 3:4]
+    layer, (x0, y0) = warp_into_quad(premultiplied, template["quad"], template["size"])
+    height, width = layer.shape[:2]
+    if height and width:
+        region = canvas[y0:y0 + height, x0:x0 + width]
+        alpha = layer[..., 3:4]
+        color = layer[..., :3]
+        if template["mask"] is not None:
+            coverage = template["mask"][y0:y0 + height, x0:x0 + width, None] / np.float32(255.0)
+            alpha = alpha * coverage
+            color = color * coverage
+        region *= 1.0 - alpha
+        region += color
+
+    for overlay, mode, opacity in template["overlays"]:
+        blend_overlay(canvas, overlay.astype(np.float32) / 255.0, mode, opacity)
+    return canvas
+
+
+# ============================================================================
+# RENDEROWANIE
+# ============================================================================
+
+# Ostatnio wczytany szablon w danym procesie (kolejne zadania często używają tego samego)
+_loaded_template = (None, None)
+
+
+def template_available(mockup_file, templates_dir, mockup_dir):
+    """Szablon jest dostępny, gdy jest wyrenderowany ręcznie albo da się go skompilować z PSD"""
+    return (Path(templates_dir) / Path(mockup_file).stem / "template.json").exists() or \
+        (Path(mockup_dir) / mockup_file).exists()
+
+
+def compile_stale_psd_templates(mockup_files, templates_dir, mockup_dir, workers=None):
+    """
+    Kompiluje w procesie nadrzędnym nieaktualne szablony PSD (bez ręcznie
+    wyrenderowanego template.json), zanim zadania trafią do procesów
+    roboczych. Zwraca {mockup: błąd} dla szablonów, których nie udało się
+    skompilować.
+    """
+    psd_paths = [
+        Path(mockup_dir) / mockup_file for mockup_file in sorted(set(mockup_files))
+        if not (Path(templates_dir) / Path(mockup_file).stem / "template.json").exists()
+    ]
+    failed = {}
+    for psd_path, status, elapsed in compile_templates.compile_stale_templates(
+            psd_paths, Path(mockup_dir) / ".compiled", workers):
+        if status.startswith("BŁĄD"):
+            failed[psd_path.name] = status
+        elif status == "skompilowany":
+            print(f"🧩 Skompilowano szablon {psd_path.name} ({elapsed:.2f}s)")
+    return failed
+
+
+def _template_for(mockup_file, templates_dir, mockup_dir):
+    """Ręcznie wyrenderowany szablon ma pierwszeństwo; w przeciwnym razie skompilowany PSD"""
+    global _loaded_template
+    key = (str(templates_dir), str(mockup_dir), mockup_file)
+    if _loaded_template[0] != key:
+        if (Path(templates_dir) / Path(mockup_file).stem / "template.json").exists():
+            template = load_template(mockup_file, templates_dir)
+        else:
+            template = compile_templates.load_compiled_template(
+                Path(mockup_dir) / mockup_file, Path(mockup_dir) / ".compiled"
+            )
+        _loaded_template = (key, template)
+    return _loaded_template[1]
+
+
+def _prepare_art(input_path, frame_size, settings, art_cache):
+    """Grafika dopasowana do ramki (uint8 RGBA), z pamięci podręcznej jeśli jest włączona"""
+    trim = settings.get("trimTransparency", True)
+    if art_cache is None:
+        with Image.open(input_path) as img:
+            return np.asarray(fit_art_to_frame(
+                img.convert("RGBA"), frame_size, settings["align"], settings["resize"], trim
+            ))
+    return art_cache.get(
+        input_path, frame_size, settings["align"], settings["resize"], trim,
+        partial(fit_art_to_frame, trim_transparency=False),
+    )
+
+
+def render_combination(input_path, mockup_file, output_path, templates_dir, mockup_dir, settings, art_cache=None):
+    """Renderuje jedną kombinację i zapisuje JPG. Zwraca (ścieżka wyjścia, status, czas w sekundach)."""
+    start = time.perf_counter()
+    try:
+        with tracing.span(Path(output_path).name, "file", input=str(input_path), mockup=mockup_file):
+            with tracing.span("template"):
+                template = _template_for(mockup_file, templates_dir, mockup_dir)
+            with tracing.span("art"):
+                art = _prepare_art(input_path, template["frame"], settings, art_cache).astype(np.float32) / 255.0
+            with tracing.span("composite"):
+                canvas = composite(template, art)
+
+            with tracing.span("save"):
+                result = Image.fromarray(np.clip(canvas * 255.0 + 0.5, 0, 255).astype(np.uint8), "RGB")
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                # Zapis przez plik tymczasowy: przerwany przebieg nie zostawia uciętego JPG
+                tmp_path = f"{output_path}.tmp"
+                result.save(tmp_path, format="JPEG", quality=JPEG_QUALITY)
+                os.replace(tmp_path, output_path)
+        return output_path, "OK", time.perf_counter() - start
+    except Exception as e:
+        return output_path, f"BŁĄD: {e}", time.perf_counter() - start
+
+
+# Pamięć podręczna grafik w danym procesie (tworzona przy pierwszej paczce)
+_art_cache = None
+
+
+def render_batch(batch, templates_dir, mockup_dir, settings, cache_options=None, journal_file=None):
+    """
+    Renderuje paczkę kombinacji jednego szablonu. Zwraca (lista (ścieżka wyjścia,
+    mockup, status, sekundy), statystyki pamięci podręcznej dla tej paczki).
+    Z journal_file każda kombinacja trafia do dziennika zaraz po ukończeniu,
+    więc przerwany przebieg nie gubi wyników z niedokończonej paczki.
+    """
+    global _art_cache
+    if cache_options is not None and _art_cache is None:
+        _art_cache = InputArtCache(**cache_options)
+    art_cache = _art_cache if cache_options is not None else None
+    before = art_cache.snapshot() if art_cache else {}
+
+    results = []
+    with tracing.span("batch", "batch", mockup=batch[0][1], combinations=len(batch)):
+        for input_path, mockup_file, output_path in batch:
+            output_path, status, seconds = render_combination(
+                input_path, mockup_file, output_path, templates_dir, mockup_dir, settings, art_cache
+            )
+            results.append((output_path, mockup_file, status, seconds))
+            if journal_file is not None:
+                if status == "OK":
+                    append_event(journal_file, "done", Path(output_path).name, mockup=mockup_file, seconds=round(seconds, 3))
+                else:
+                    append_event(journal_file, "error", Path(output_path).name, mockup=mockup_file, message=status)
+    return results, stats_delta(before, art_cache.snapshot()) if art_cache else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bezgłowe renderowanie mockupów z config.json (bez Photoshopa).")
+    parser.add_argument("--config", default=str(config_file), help="Ścieżka do config.json")
+    parser.add_argument("--jobs", default=None,
+                        help="Plik z rozwiązanymi zadaniami (jobs.json z plan_jobs.py lub shard z shard_jobs.py) zamiast config.json")
+    parser.add_argument("--input", default=str(input_folder), help="Folder z plikami wejściowymi")
+    parser.add_argument("--mockup", default=str(mockup_folder), help="Folder z plikami mockupów")
+    parser.add_argument("--templates", default=None, help="Folder z wyrenderowanymi szablonami (domyślnie mockup/templates)")
+    parser.add_argument("--output", default=str(output_folder), help="Folder wynikowy")
+    parser.add_argument("--workers", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--order", choices=ORDERS, default="mockup", help="Kolejność zadań (patrz plan_jobs.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Wyłącz pamięć podręczną przygotowanych grafik")
+    parser.add_argument("--cache-dir", default=str(cache_folder), help="Folder pamięci podręcznej grafik na dysku")
+    parser.add_argument("--cache-memory-mb", type=int, default=DEFAULT_MEMORY_BYTES // (1024 * 1024),
+                        help="Limit pamięci podręcznej w RAM na proces (MB)")
+    parser.add_argument("--cache-disk-mb", type=int, default=DEFAULT_DISK_BYTES // (1024 * 1024),
+                        help="Limit pamięci podręcznej na dysku (MB)")
+    parser.add_argument("--keep-transparency", action="store_true",
+                        help="Nie przycinaj przezroczystych krawędzi grafiki (jak main_artmockup_generator.jsx)")
+    parser.add_argument("--report", default=None, help="Zapisz raport przebiegu (JSON) pod tą ścieżką")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Nie dopisuj czasów do historii renderowania (shard_jobs.py --run zapisuje je raz, "
+                             "z raportów wszystkich shardów)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Pomiń kombinacje, które mają już aktualny wynik (wznowienie przerwanego przebiegu)")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Skanuj foldery zamiast korzystać z katalogu plików (asset_catalog.py)")
+    parser.add_argument("--trace", default=None, metavar="OUT.json",
+                        help="Zapisz spany etapów wszystkich procesów jako ślad Chrome/Perfetto (patrz tracing.py)")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace, "render_mockups")
+
+    settings = dict(SMART_OBJECT_SETTINGS)
+    if args.keep_transparency:
+        settings["trimTransparency"] = False
+
+    templates_dir = Path(args.templates) if args.templates else Path(args.mockup) / "templates"
+
+    print("🚀 Renderowanie mockupów bez Photoshopa...")
+    print(f"📄 {'Zadania' if args.jobs else 'Config'}: {args.jobs or args.config}")
+    print(f"📁 Szablony: {templates_dir}")
+
+    with tracing.span("plan", "parent"):
+        if args.jobs:
+            jobs, warnings = load_job_file(args.jobs, Path(args.output))
+        else:
+            catalog = None if args.no_catalog else AssetCatalog()
+            jobs, warnings = build_jobs(
+                load_config(args.config), Path(args.input), Path(args.mockup), Path(args.output), args.order,
+                templates_dir, catalog,
+            )
+            if catalog:
+                catalog.close()
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+
+    missing_templates = sorted({m for _, m, _ in jobs if not template_available(m, templates_dir, args.mockup)})
+    for mockup_file in missing_templates:
+        print(f"⚠️  Brak szablonu dla mockupu: {mockup_file}")
+    jobs = [job for job in jobs if job[1] not in missing_templates]
+
+    journal_file = journal_path(args.output)
+    if args.resume:
+        with tracing.span("resume check", "parent"):
+            journal = load_journal(journal_file)
+            total = len(jobs)
+            jobs = [
+                job for job in jobs
+                if not is_output_current(
+                    job[2],
+                    (job[0], templates_dir / Path(job[1]).stem / "template.json", Path(args.mockup) / job[1]),
+                    journal.get(Path(job[2]).name),
+                )
+            ]
+        print(f"⏭️  Ukończonych wcześniej (pominięte): {total - len(jobs)}")
+
+    if not jobs:
+        print("✅ Wszystkie kombinacje mają aktualny wynik." if args.resume else "❌ Brak kombinacji do wyrenderowania.")
+        return
+
+    with tracing.span("compile templates", "parent"):
+        failed_templates = compile_stale_psd_templates({job[1] for job in jobs}, templates_dir, args.mockup, args.workers)
+    for mockup_file, status in sorted(failed_templates.items()):
+        print(f"⚠️  Nie udało się skompilować szablonu {mockup_file}: {status}")
+    jobs = [job for job in jobs if job[1] not in failed_templates]
+    if not jobs:
+        print("❌ Brak kombinacji do wyrenderowania.")
+        return
+
+    cache_options = None
+    if not args.no_cache:
+        cache_options = {
+            "cache_dir": args.cache_dir,
+            "max_memory_bytes": args.cache_memory_mb * 1024 * 1024,
+            "max_disk_bytes": args.cache_disk_mb * 1024 * 1024,
+        }
+
+    batches = batch_jobs(jobs)
+    print(f"🔄 Kombinacji do wyrenderowania: {len(jobs)} ({len(batches)} paczek)")
+    errors = []
+    records = []
+    done = 0
+    run_start = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=tracing.init_worker,
+                             initargs=(args.trace,)) as executor:
+        futures = [
+            executor.submit(render_batch, batch, templates_dir, args.mockup, settings, cache_options, journal_file)
+            for batch in batches
+        ]
+        cache_stats = dict.fromkeys(STAT_KEYS, 0)
+        for future in as_completed(futures):
+            results, batch_stats = future.result()
+            for output_path, mockup_file, status, seconds in results:
+                records.append({"output": output_path, "mockup": mockup_file, "status": status, "seconds": round(seconds, 3)})
+                if status != "OK":
+                    errors.append(f"{output_path}: {status}")
+            for key, value in (batch_stats or {}).items():
+                cache_stats[key] += value
+            done += 1
+            if done % 10 == 0 or done == len(batches):
+                print(f"   {done}/{len(batches)} paczek")
+
+    if not args.no_history:
+        update_history([(r["mockup"], r["seconds"]) for r in records if r["status"] == "OK"])
+    if args.report:
+        write_report(args.report, records, cache_stats if cache_options is not None else None, time.time() - run_start)
+        print(f"📝 Raport: {args.report}")
+
+    print(f"\n✅ Wyrenderowano {len(jobs) - len(errors)} z {len(jobs)} kombinacji")
+    if cache_options is not None:
+        print(f"🗄️  Pamięć podręczna grafik: {format_stats(cache_stats)}")
+    if errors:
+        print("❌ Błędy:")
+        for error in errors:
+            print(f"   - {error}")
+    trace_path = tracing.finish()
+    if trace_path:
+        print(f"🔍 Ślad: {trace_path} (otwórz w https://ui.perfetto.dev lub chrome://tracing)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dziennik przebiegu renderowania (output/render_journal.jsonl)
+
+Jedna linia JSON na zdarzenie, dopisywana od razu po każdej kombinacji, więc
+przerwany przebieg (awaria Photoshopa, uśpienie komputera) zostawia ślad aż
+do ostatniej ukończonej kombinacji:
+
+    {"event": "start", "output": "1_hoodie.jpg", "input": "...", "mockup": "hoodie.psd", "time": "..."}
+    {"event": "done",  "output": "1_hoodie.jpg", "seconds": 4.21, "time": "..."}
+    {"event": "error", "output": "1_hoodie.jpg", "message": "...", "time": "..."}
+
+Zdarzenia zapisują main_mockup_generator.jsx, main_artmockup_generator.jsx
+i render_mockups.py. Na ich podstawie plan_jobs.py --resume i
+render_mockups.py --resume pomijają kombinacje, które mają już poprawny
+wynik.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_NAME = "render_journal.jsonl"
+
+
+def journal_path(output_dir):
+    return Path(output_dir) / JOURNAL_NAME
+
+
+def append_event(path, event, output_name, **fields):
+    """
+    Dopisuje jedno zdarzenie do dziennika. Linia trafia do pliku jednym
+    zapisem w trybie dopisywania, więc procesy robocze render_mockups.py
+    mogą pisać do tego samego dziennika równolegle.
+    """
+    record = {"event": event, "output": output_name, "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    record.update(fields)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_journal(path):
+    """
+    Zwraca {nazwa pliku wynikowego: ostatnie zdarzenie}. Uszkodzona ostatnia
+    linia (przerwany zapis) jest pomijana.
+    """
+    last_events = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and "output" in record:
+                    last_events[Path(record["output"]).name] = record
+    except FileNotFoundError:
+        pass
+    return last_events
+
+
+def is_output_current(output_path, source_paths, last_event=None):
+    """
+    Wynik jest aktualny, gdy istnieje, nie jest pusty, jest nowszy niż wszystkie
+    źródła (wejście, szablon), a dziennik nie kończy się dla niego na 'start'
+    (przerwany zapis) ani 'error'.
+    """
+    if last_event and last_event.get("event") != "done":
+        return False
+    try:
+        output_stat = os.stat(output_path)
+    except FileNotFoundError:
+        return False
+    if output_stat.st_size == 0:
+        return False
+    for source_path in source_paths:
+        try:
+            if os.stat(source_path).st_mtime_ns > output_stat.st_mtime_ns:
+                return False
+        except FileNotFoundError:
+            continue  # np. mockup bez PSD, renderowany z gotowego szablonu
+    return True
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Podział przebiegu renderowania na shardy i koordynator procesów
+
+Dzieli kombinacje z config.json (lub gotowego jobs.json) na N shardów
+o zbliżonym szacowanym koszcie. Kombinacje jednego szablonu trafiają do
+tego samego sharda (szablon jest wczytywany raz), a tylko szablony droższe
+niż średni shard są dzielone na części.
+
+Koszt kombinacji to średni czas z historii renderowania
+(.cache/render_history.json, zapisywanej przez render_mockups.py), a dla
+szablonów bez historii - szacunek z rozmiaru dokumentu (template.json lub
+skompilowany meta.json) albo rozmiaru pliku PSD, przeskalowany do sekund na
+podstawie szablonów, które historię już mają.
+
+Shardy są zapisywane jako shards/shard_<n>.json w formacie jobs.json, więc
+każdy można wyrenderować osobno (także na innej maszynie):
+
+    python3 render_mockups.py --jobs shards/shard_1.json
+
+Z opcją --run skrypt sam uruchamia wszystkie shardy równolegle jako osobne
+procesy render_mockups.py (rdzenie dzielone po równo), a na koniec scala ich
+raporty w jeden plik. Czasy do historii renderowania zapisuje wtedy tylko
+koordynator, raz, ze scalonego raportu - równoległe shardy nie nadpisują
+sobie nawzajem pomiarów.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from asset_catalog import AssetCatalog
+from plan_jobs import ORDERS, compile_plan, iter_combinations, load_config, order_combinations, resolve_combinations
+from render_history import load_history, update_history
+from render_mockups import compile_stale_psd_templates
+
+# Ścieżki do plików
+project_folder = Path(__file__).resolve().parent
+config_file = project_folder / "config.json"
+input_folder = project_folder / "input"
+mockup_folder = project_folder / "mockup"
+templates_folder = mockup_folder / "templates"
+compiled_folder = mockup_folder / ".compiled"
+output_folder = project_folder / "output"
+shards_folder = project_folder / "shards"
+render_script = project_folder / "render_mockups.py"
+
+# Szacunek dla szablonów bez historii (przed kalibracją): sekundy na megapiksel dokumentu
+SECONDS_PER_MEGAPIXEL = 0.05
+# Dla PSD, którego rozmiaru nie znamy: ile bajtów pliku odpowiada jednemu megapikselowi
+PSD_BYTES_PER_MEGAPIXEL = 8 * 1024 * 1024
+# Koszt wczytania szablonu jako wielokrotność kosztu jednej kombinacji
+TEMPLATE_LOAD_FACTOR = 3.0
+
+
+# ============================================================================
+# SZACOWANIE KOSZTU
+# ============================================================================
+
+def template_megapixels(mockup_file, templates_dir=templates_folder, compiled_dir=compiled_folder,
+                        mockup_dir=mockup_folder):
+    """Rozmiar dokumentu szablonu w megapikselach albo None, gdy nie da się go ustalić"""
+    stem = Path(mockup_file).stem
+    for meta_path in (Path(templates_dir) / stem / "template.json", Path(compiled_dir) / stem / "meta.json"):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                size = json.load(f).get("size")
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        if size:
+            return size[0] * size[1] / 1e6
+    psd_path = Path(mockup_dir) / mockup_file
+    if psd_path.exists():
+        return psd_path.stat().st_size / PSD_BYTES_PER_MEGAPIXEL
+    return None
+
+
+def estimate_costs(mockup_files, history, **folders):
+    """
+    Szacuje czas jednej kombinacji (sekundy) dla każdego szablonu.
+    Szablony z historią dostają zmierzony czas; pozostałe - szacunek z rozmiaru
+    skalowany współczynnikiem dopasowanym do szablonów z historią.
+    """
+    megapixels = {mockup_file: template_megapixels(mockup_file, **folders) for mockup_file in mockup_files}
+
+    ratios = sorted(
+        history[mockup_file]["seconds"] / megapixels[mockup_file]
+        for mockup_file in mockup_files
+        if mockup_file in history and megapixels[mockup_file]
+    )
+    seconds_per_megapixel = ratios[len(ratios) // 2] if ratios else SECONDS_PER_MEGAPIXEL
+    fallback = (sum(entry["seconds"] for entry in history.values()) / len(history)) if history else None
+
+    costs = {}
+    for mockup_file in mockup_files:
+        if mockup_file in history:
+            costs[mockup_file] = history[mockup_file]["seconds"]
+        elif megapixels[mockup_file]:
+            costs[mockup_file] = megapixels[mockup_file] * seconds_per_megapixel
+        else:
+            costs[mockup_file] = fallback or SECONDS_PER_MEGAPIXEL
+    return costs
+
+
+# ============================================================================
+# PODZIAŁ NA SHARDY
+# ============================================================================
+
+def partition_jobs(jobs, shard_count, costs, load_factor=TEMPLATE_LOAD_FACTOR):
+    """
+    Dzieli zadania (słowniki z jobs.json) na shard_count list o zbliżonym koszcie.
+    Zadania są grupowane po szablonie; grupy droższe niż średni shard są cięte na
+    części, a części przydzielane zachłannie (najdroższa do najlżejszego sharda).
+    Zwraca (shardy, szacowany koszt każdego sharda).
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job["mockup"], []).append(job)
+
+    def chunk_cost(mockup_file, count):
+        return costs[mockup_file] * (count + load_factor)
+
+    total = sum(chunk_cost(mockup_file, len(group)) for mockup_file, group in groups.items())
+    target = total / shard_count if shard_count else total
+
+    chunks = []
+    for mockup_file, group in groups.items():
+        parts = 1
+        if chunk_cost(mockup_file, len(group)) > target:
+            parts = min(len(group), max(1, round(chunk_cost(mockup_file, len(group)) / target)))
+        size = -(-len(group) // parts)
+        for start in range(0, len(group), size):
+            part = group[start:start + size]
+            chunks.append((chunk_cost(mockup_file, len(part)), mockup_file, part))
+
+    # Najdroższe części najpierw; przy remisie kolejność nazw, żeby podział był powtarzalny
+    chunks.sort(key=lambda chunk: (-chunk[0], chunk[1]))
+    shards = [[] for _ in range(shard_count)]
+    loads = [0.0] * shard_count
+    heap = [(0.0, index) for index in range(shard_count)]
+    for cost, _, part in chunks:
+        load, index = heapq.heappop(heap)
+        shards[index].extend(part)
+        loads[index] = load + cost
+        heapq.heappush(heap, (loads[index], index))
+    return shards, loads
+
+
+def write_shards(plan, shards, loads, shards_dir):
+    """Zapisuje shardy w formacie jobs.json; zwraca listę ścieżek"""
+    shards_dir = Path(shards_dir)
+    shards_dir.mkdir(parents=True, exist_ok=True)
+    for old_shard in shards_dir.glob("shard_*.json"):
+        old_shard.unlink()
+
+    paths = []
+    for number, (shard, load) in enumerate(zip(shards, loads), start=1):
+        shard_plan = {key: value for key, value in plan.items() if key.startswith("_")}
+        shard_plan.update({
+            "_shard": number,
+            "_shardCount": len(shards),
+            "_estimatedSeconds": round(load, 2),
+            "_resolvedCombinations": len(shard),
+            "_uniqueTemplates": len({job["mockup"] for job in shard}),
+            "jobs": shard,
+        })
+        # Brakujące pliki raportuje tylko pierwszy shard
+        if number > 1:
+            shard_plan["_unresolvedInputs"] = []
+            shard_plan["_unresolvedMockups"] = []
+        path = shards_dir / f"shard_{number}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(shard_plan, f, indent=2, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def build_plan(args):
+    """Plan przebiegu z jobs.json albo config.json (mockupy z gotowym szablonem nie potrzebują PSD)"""
+    if args.jobs:
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    mappings = load_config(args.config)
+    catalog = None if args.no_catalog else AssetCatalog()
+    plan = compile_plan(mappings, args.order, args.input, args.mockup, catalog)
+    combinations = order_combinations(iter_combinations(mappings), args.order)
+    with_templates = {
+        mockup_file for _, mockup_file in combinations
+        if (Path(args.templates) / Path(mockup_file).stem / "template.json").exists()
+    }
+    if with_templates:
+        plan["jobs"], plan["_unresolvedInputs"], plan["_unresolvedMockups"] = resolve_combinations(
+            combinations, args.input, args.mockup, with_templates, catalog
+        )
+        plan["_resolvedCombinations"] = len(plan["jobs"])
+    if catalog:
+        catalog.close()
+    return plan
+
+
+# ============================================================================
+# KOORDYNATOR
+# ============================================================================
+
+def run_shards(shard_paths, args):
+    """
+    Uruchamia render_mockups.py dla każdego sharda równolegle i czeka na wszystkie.
+    Zwraca listę (ścieżka sharda, kod wyjścia, ścieżka raportu).
+    """
+    workers = max(1, (args.workers or os.cpu_count() or 1) // len(shard_paths))
+    reports_dir = Path(args.shards) / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+
+    processes = []
+    for shard_path in shard_paths:
+        report_path = reports_dir / f"{shard_path.stem}_report.json"
+        log_path = reports_dir / f"{shard_path.stem}.log"
+        command = [
+            sys.executable, str(render_script),
+            "--jobs", str(shard_path),
+            "--mockup", str(args.mockup),
+            "--templates", str(args.templates),
+            "--output", str(args.output),
+            "--workers", str(workers),
+            "--report", str(report_path),
+            "--no-history",
+        ]
+        if args.keep_transparency:
+            command.append("--keep-transparency")
+        if args.no_cache:
+            command.append("--no-cache")
+        log_file = open(log_path, "w", encoding="utf-8")
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+        processes.append((shard_path, process, log_file, report_path))
+        print(f"   ▶️  {shard_path.name}: PID {process.pid}, procesów: {workers}, log: {log_path}")
+
+    finished = []
+    for shard_path, process, log_file, report_path in processes:
+        return_code = process.wait()
+        log_file.close()
+        finished.append((shard_path, return_code, report_path))
+    return finished
+
+
+def merge_reports(finished, duration):
+    """Scala raporty shardów w jeden raport przebiegu"""
+    merged = {
+        "generatedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "durationSeconds": round(duration, 3),
+        "shards": [],
+        "totalCombinations": 0,
+        "rendered": 0,
+        "errors": [],
+        "results": [],
+    }
+    for shard_path, return_code, report_path in finished:
+        try:
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            report = {}
+        merged["shards"].append({
+            "shard": shard_path.name,
+            "returnCode": return_code,
+            "durationSeconds": report.get("durationSeconds"),
+            "rendered": report.get("rendered", 0),
+            "totalCombinations": report.get("totalCombinations", 0),
+        })
+        merged["totalCombinations"] += report.get("totalCombinations", 0)
+        merged["rendered"] += report.get("rendered", 0)
+        merged["errors"].extend(report.get("errors", []))
+        merged["results"].extend(report.get("results", []))
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dzieli przebieg renderowania na shardy o zbliżonym koszcie.")
+    parser.add_argument("--config", default=str(config_file), help="Ścieżka do config.json")
+    parser.add_argument("--jobs", default=None, help="Gotowy plan (jobs.json) zamiast config.json")
+    parser.add_argument("--input", default=str(input_folder), help="Folder z plikami wejściowymi")
+    parser.add_argument("--mockup", default=str(mockup_folder), help="Folder z plikami mockupów")
+    parser.add_argument("--templates", default=str(templates_folder), help="Folder z wyrenderowanymi szablonami")
+    parser.add_argument("--output", default=str(output_folder), help="Folder wyjściowy (dla --run)")
+    parser.add_argument("--shards", default=str(shards_folder), help="Folder na pliki shardów")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Liczba shardów (domyślnie liczba rdzeni)")
+    parser.add_argument("--order", choices=ORDERS, default="mockup", help="Kolejność zadań przed podziałem")
+    parser.add_argument("--run", action="store_true", help="Uruchom shardy równolegle i scal raporty")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Łączna liczba procesów dla --run (domyślnie liczba rdzeni)")
+    parser.add_argument("--report", default=None, help="Ścieżka scalonego raportu (domyślnie <shards>/report.json)")
+    parser.add_argument("--keep-transparency", action="store_true", help="Przekazywane do render_mockups.py")
+    parser.add_argument("--no-cache", action="store_true", help="Przekazywane do render_mockups.py")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Skanuj foldery zamiast korzystać z katalogu plików (asset_catalog.py)")
+    args = parser.parse_args()
+
+    print("🚀 Dzielenie przebiegu na shardy...")
+    print(f"📄 {'Zadania' if args.jobs else 'Config'}: {args.jobs or args.config}")
+
+    plan = build_plan(args)
+    for input_key in plan.get("_unresolvedInputs", []):
+        print(f"⚠️  Brak pliku wejściowego dla klucza: {input_key}")
+    for mockup_file in plan.get("_unresolvedMockups", []):
+        print(f"⚠️  Brak pliku mockupu: {mockup_file}")
+
+    jobs = plan["jobs"]
+    if not jobs:
+        print("❌ Brak kombinacji do podziału")
+        return
+
+    shard_count = max(1, min(args.count or os.cpu_count() or 1, len(jobs)))
+    history = load_history()
+    mockup_files = sorted({job["mockup"] for job in jobs})
+    costs = estimate_costs(mockup_files, history, templates_dir=args.templates,
+                           compiled_dir=Path(args.mockup) / ".compiled", mockup_dir=args.mockup)
+    shards, loads = partition_jobs(jobs, shard_count, costs)
+    # Mniej grup szablonów niż shardów - puste shardy są pomijane
+    shards, loads = zip(*[(shard, load) for shard, load in zip(shards, loads) if shard])
+    shard_paths = write_shards(plan, shards, loads, args.shards)
+
+    with_history = sum(1 for mockup_file in mockup_files if mockup_file in history)
+    print(f"🧩 Szablonów: {len(mockup_files)} (z historią czasów: {with_history})")
+    for shard_path, shard, load in zip(shard_paths, shards, loads):
+        templates = len({job["mockup"] for job in shard})
+        print(f"   📦 {shard_path.name}: {len(shard)} kombinacji, {templates} szablonów, ~{load:.1f} s")
+    balance = max(loads) / (sum(loads) / len(loads)) if sum(loads) else 1.0
+    print(f"⚖️  Najdłuższy shard / średnia: {balance:.2f}")
+
+    if not args.run:
+        print(f"✅ Zapisano {len(shard_paths)} shardów w: {args.shards}")
+        return
+
+    # Nieaktualne PSD kompilujemy raz tutaj; inaczej każdy shard kompilowałby wspólne szablony od nowa
+    failed_templates = compile_stale_psd_templates(mockup_files, args.templates, args.mockup, args.workers)
+    for mockup_file, status in sorted(failed_templates.items()):
+        print(f"⚠️  Nie udało się skompilować szablonu {mockup_file}: {status}")
+
+    print(f"\n🔄 Uruchamianie {len(shard_paths)} shardów...")
+    start = time.time()
+    finished = run_shards(shard_paths, args)
+    merged = merge_reports(finished, time.time() - start)
+    # Shardy działają z --no-history; czasy wszystkich shardów trafiają do historii jednym zapisem
+    update_history([(r["mockup"], r["seconds"]) for r in merged["results"] if r["status"] == "OK"])
+
+    report_path = Path(args.report) if args.report else Path(args.shards) / "report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
+
+    failed = [shard["shard"] for shard in merged["shards"] if shard["returnCode"] != 0]
+    for shard_name in failed:
+        print(f"❌ {shard_name} zakończył się błędem (sprawdź log w {Path(args.shards) / 'reports'})")
+    print(f"\n✅ Wyrenderowano {merged['rendered']} z {merged['totalCombinations']} kombinacji "
+          f"w {merged['durationSeconds']:.1f} s")
+    if merged["errors"]:
+        print(f"❌ Błędy: {len(merged['errors'])}")
+    print(f"📝 Raport: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
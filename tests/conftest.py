@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Skrypty nie są pakietem: testy importują je tak, jak robią to same skrypty
+project_folder = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_folder))
+sys.path.insert(0, str(project_folder / "convert to webp"))
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+from PIL import Image
+
+import asset_catalog
+from asset_catalog import AssetCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with AssetCatalog(tmp_path / "catalog.sqlite") as catalog:
+        yield catalog
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Counts the files whose content is hashed."""
+    paths = []
+    file_hash = asset_catalog.file_hash
+
+    def counting_hash(path):
+        paths.append(os.path.basename(path))
+        return file_hash(path)
+
+    monkeypatch.setattr(asset_catalog, "file_hash", counting_hash)
+    return paths
+
+
+def touch(path, content=b"data", mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_first_refresh_catalogs_files_with_header_dimensions(tmp_path, catalog):
+    folder = tmp_path / "input"
+    folder.mkdir()
+    Image.new("RGB", (30, 20)).save(folder / "100.png")
+    touch(folder / "notes.txt")
+    touch(folder / ".hidden.png")
+
+    stats = catalog.refresh(folder)
+
+    assert (stats["files"], stats["added"]) == (2, 2)
+    assert catalog.names(folder) == ["100.png", "notes.txt"]
+    info = catalog.info(folder, "100.png")
+    assert (info["key"], info["width"], info["height"], info["hash"]) == ("100", 30, 20, None)
+    assert catalog.info(folder, "notes.txt")["width"] is None
+
+
+def test_second_refresh_only_rereads_changed_files(tmp_path, catalog, hashed):
+    folder = tmp_path / "input"
+    touch(folder / "a.png", mtime_ns=1_000_000_000)
+    touch(folder / "b.png", mtime_ns=1_000_000_000)
+    touch(folder / "c.png", mtime_ns=1_000_000_000)
+    catalog.refresh(folder, hashes=True)
+    hashed.clear()
+
+    touch(folder / "b.png", b"edited", mtime_ns=2_000_000_000)
+    (folder / "c.png").unlink()
+    touch(folder / "d.png")
+    stats = catalog.refresh(folder, hashes=True)
+
+    assert (stats["added"], stats["updated"], stats["removed"], stats["hashed"]) == (1, 1, 1, 2)
+    assert sorted(hashed) == ["b.png", "d.png"]
+    assert catalog.names(folder) == ["a.png", "b.png", "d.png"]
+    assert catalog.refresh(folder, hashes=True)["hashed"] == 0
+
+
+def test_missing_hashes_are_filled_in_without_rereading_headers(tmp_path, catalog, hashed):
+    folder = tmp_path / "input"
+    touch(folder / "a.png")
+    catalog.refresh(folder)
+    assert hashed == []
+
+    stats = catalog.refresh(folder, hashes=True)
+
+    assert (stats["added"], stats["updated"], stats["hashed"]) == (0, 0, 1)
+    assert catalog.info(folder, "a.png")["hash"] == asset_catalog.hashlib.sha256(b"data").hexdigest()
+
+
+def test_flat_refresh_keeps_rows_of_subfolders(tmp_path, catalog):
+    folder = tmp_path / "input"
+    touch(folder / "a.png")
+    touch(folder / "sub" / "b.png")
+    catalog.refresh(folder, recursive=True)
+
+    assert catalog.refresh(folder)["removed"] == 0
+    assert catalog.names(folder, recursive=True) == ["a.png", "sub/b.png"]
+    assert catalog.names(folder) == ["a.png"]
+
+
+def test_find_by_keys_ignores_case_and_extension(tmp_path, catalog):
+    folder = tmp_path / "input"
+    touch(folder / "Hoodie.PNG")
+    touch(folder / "sub" / "hoodie.jpg")
+    touch(folder / "other.png")
+    catalog.refresh(folder, recursive=True)
+
+    assert catalog.find_by_keys(folder, ["HOODIE"]) == {"hoodie": ["Hoodie.PNG", "sub/hoodie.jpg"]}
+    assert catalog.find_by_keys(folder, ["hoodie"], recursive=False) == {"hoodie": ["Hoodie.PNG"]}
+    assert catalog.folder_index(folder).match_stem("hoodie.png") == "Hoodie.PNG"
+
+
+def test_schema_change_rebuilds_the_catalog(tmp_path, monkeypatch):
+    folder = tmp_path / "input"
+    touch(folder / "a.png")
+    with AssetCatalog(tmp_path / "catalog.sqlite") as catalog:
+        catalog.refresh(folder)
+
+    monkeypatch.setattr(asset_catalog, "SCHEMA_VERSION", asset_catalog.SCHEMA_VERSION + 1)
+    with AssetCatalog(tmp_path / "catalog.sqlite") as catalog:
+        assert catalog.names(folder) == []
+
+
+def test_converter_clean_matches_base_names_exactly(tmp_path, monkeypatch):
+    pytest.importorskip("wand.image", exc_type=ImportError)
+    import converter_clean
+
+    folder = tmp_path / "input"
+    for name in ["100_105.jpg", "sub/100_106.png", "100_107.JPG", "Hoodie.png", "100_108.txt"]:
+        touch(folder / name)
+    monkeypatch.setattr(converter_clean, "AssetCatalog", lambda: AssetCatalog(tmp_path / "catalog.sqlite"))
+
+    files, missing = converter_clean.find_source_files(folder, {"100_105", "100_106", "100_107", "hoodie", "100_108"})
+
+    assert sorted(files) == sorted(str(folder / name) for name in ["100_105.jpg", "sub/100_106.png", "100_107.JPG"])
+    assert sorted(missing) == ["100_108", "hoodie"]
@@ -0,0 +1,114 @@
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+psd_tools = pytest.importorskip("psd_tools")
+from psd_tools.api.layers import PixelLayer  # noqa: E402
+from psd_tools.constants import Tag  # noqa: E402
+from psd_tools.psd.descriptor import Descriptor, DescriptorBlock, DescriptorBlock2, Double, String  # noqa: E402
+
+import compile_templates  # noqa: E402
+
+SIZE = (64, 48)
+QUAD = (16.0, 8.0, 48.0, 8.0, 48.0, 32.0, 16.0, 32.0)
+CONTENT_SIZE = (320, 240)
+
+
+def make_psd(path, content_size=CONTENT_SIZE):
+    """Mały PSD: tło, smart obiekt 'Frame 1' (SoLd + PlLd jak z Photoshopa) i warstwa nad nim"""
+    psd = psd_tools.PSDImage.new("RGB", SIZE)
+    psd.append(PixelLayer.frompil(Image.new("RGB", SIZE, (200, 200, 200)), psd, "Background"))
+    frame = PixelLayer.frompil(Image.new("RGBA", (32, 24), (255, 0, 0, 255)), psd, "Frame 1", top=8, left=16)
+    config = DescriptorBlock()
+    config[b"Idnt"] = String("frame-1")
+    if content_size:
+        size = Descriptor(classID=b"Pnt ")
+        size[b"Wdth"] = Double(float(content_size[0]))
+        size[b"Hght"] = Double(float(content_size[1]))
+        config[b"Sz  "] = size
+    frame.tagged_blocks.set_data(Tag.SMART_OBJECT_LAYER_DATA1, data=config)
+    frame.tagged_blocks.set_data(Tag.PLACED_LAYER1, uuid=b"frame-1", transform=QUAD,
+                                 warp=DescriptorBlock2(classID=b"warp"))
+    psd.append(frame)
+    psd.append(PixelLayer.frompil(Image.new("RGBA", (8, 8), (0, 0, 255, 128)), psd, "Shadow", top=0, left=0))
+    psd.save(path)
+    return path
+
+
+def test_compile_template_writes_geometry_and_layers(tmp_path):
+    psd_path = make_psd(tmp_path / "t-shirt_black_front.psd")
+    compiled_dir = tmp_path / ".compiled"
+
+    target_dir = compile_templates.compile_template(psd_path, compiled_dir)
+
+    with open(target_dir / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["size"] == list(SIZE)
+    assert meta["frame"] == list(CONTENT_SIZE)
+    assert meta["quad"] == np.asarray(QUAD).reshape(4, 2).tolist()
+    assert np.load(target_dir / "under.npy").shape == (SIZE[1], SIZE[0], 3)
+    assert len(meta["overlays"]) == 1
+    assert compile_templates.is_compiled_fresh(psd_path, compiled_dir)
+
+    template = compile_templates.load_compiled_template(psd_path, compiled_dir, compile_stale=False)
+    assert template["frame"] == CONTENT_SIZE
+
+
+def test_frame_size_falls_back_to_corners(tmp_path):
+    psd_path = make_psd(tmp_path / "mockup.psd", content_size=None)
+
+    geometry = compile_templates.template_geometry(psd_path, compiled_dir=tmp_path / ".compiled")
+
+    assert geometry["source"] == "psd"
+    assert geometry["frame"] == [32, 24]
+
+
+def test_template_geometry_prefers_fresh_artifact(tmp_path):
+    psd_path = make_psd(tmp_path / "mockup.psd")
+    compiled_dir = tmp_path / ".compiled"
+
+    assert compile_templates.template_geometry(psd_path, compiled_dir=compiled_dir)["source"] == "psd"
+    compile_templates.compile_template(psd_path, compiled_dir)
+    geometry = compile_templates.template_geometry(psd_path, compiled_dir=compiled_dir)
+
+    assert geometry["source"] == "compiled"
+    assert geometry["size"] == list(SIZE)
+    assert geometry["frame"] == list(CONTENT_SIZE)
+
+
+def test_template_geometry_reports_missing_smart_object(tmp_path):
+    psd = psd_tools.PSDImage.new("RGB", SIZE)
+    psd.append(PixelLayer.frompil(Image.new("RGB", SIZE), psd, "Background"))
+    psd.save(tmp_path / "empty.psd")
+
+    with pytest.raises(ValueError, match="Frame 1"):
+        compile_templates.template_geometry(tmp_path / "empty.psd", compiled_dir=tmp_path / ".compiled")
+
+
+def _load_in_process(psd_path, compiled_dir):
+    try:
+        template = compile_templates.load_compiled_template(psd_path, compiled_dir)
+        return "OK" if template["frame"] == CONTENT_SIZE else f"zła ramka {template['frame']}"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def test_concurrent_loads_compile_once_without_errors(tmp_path):
+    # Jak pierwsze paczki jednego szablonu w kilku procesach renderera (albo shardach)
+    psd_path = make_psd(tmp_path / "mockup.psd")
+    with multiprocessing.get_context("fork").Pool(8) as pool:
+        for trial in range(5):
+            compiled_dir = tmp_path / f".compiled_{trial}"
+            results = pool.starmap(_load_in_process, [(psd_path, compiled_dir)] * 8)
+            assert results == ["OK"] * 8
+            # Dotknięty PSD: wszystkie procesy naraz liczą hash i odświeżają meta.json
+            stat = psd_path.stat()
+            os.utime(psd_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            results = pool.starmap(_load_in_process, [(psd_path, compiled_dir)] * 8)
+            assert results == ["OK"] * 8
+            leftovers = sorted(p.name for p in compiled_dir.iterdir() if not p.name.endswith(".lock"))
+            assert leftovers == ["mockup"]
@@ -0,0 +1,18 @@
+import pytest
+
+from decode import decoded_pixels
+
+WIDTH, HEIGHT = 6000, 4000
+
+
+@pytest.mark.parametrize("max_width, denominator", [
+    (6000, 1), (4000, 1), (3000, 2), (2000, 2), (1500, 4), (1200, 4), (1000, 4), (860, 4), (750, 8), (100, 8),
+])
+def test_decoded_pixels_uses_power_of_two_scales(max_width, denominator):
+    # 2000 (1/3), 1200 (1/5), 1000 (1/6) and 860 (~1/7) must not be estimated below the real decode
+    expected = (WIDTH // denominator) * (HEIGHT // denominator)
+    assert decoded_pixels("print.jpg", WIDTH, HEIGHT, max_width) == expected
+
+
+def test_decoded_pixels_is_full_size_for_png():
+    assert decoded_pixels("print.png", WIDTH, HEIGHT, 1000) == WIDTH * HEIGHT
@@ -0,0 +1,103 @@
+import os
+
+from PIL import Image
+
+import dedup
+import manifest
+from asset_catalog import AssetCatalog
+
+FINGERPRINT = manifest.settings_fingerprint({"format": "webp", "target_size_kb": 125})
+
+
+def job(input_path, mockup, output):
+    return {"inputPath": str(input_path), "mockup": mockup, "output": output}
+
+
+def test_dedup_jobs_renders_each_content_and_mockup_pair_once():
+    jobs = [
+        job("a.png", "hoodie.psd", "a_hoodie.jpg"),
+        job("b.png", "Hoodie.psd", "b_hoodie.jpg"),
+        job("b.png", "tee.psd", "b_tee.jpg"),
+        job("c.png", "hoodie.psd", "c_hoodie.jpg"),
+    ]
+    digests = {"a.png": "same", "b.png": "same", "c.png": "other"}
+
+    unique, duplicates = dedup.dedup_jobs(jobs, digests)
+
+    assert [j["output"] for j in unique] == ["a_hoodie.jpg", "b_tee.jpg", "c_hoodie.jpg"]
+    assert duplicates == {"b_hoodie.jpg": "a_hoodie.jpg"}
+
+
+def test_pixel_digests_match_reencoded_copies(tmp_path):
+    img = Image.new("RGB", (8, 6), (200, 10, 10))
+    img.save(tmp_path / "a.png")
+    img.save(tmp_path / "b.png", compress_level=0)
+    Image.new("RGB", (8, 6), (0, 0, 255)).save(tmp_path / "c.png")
+    jobs = [job(tmp_path / name, "hoodie.psd", name) for name in ["a.png", "b.png", "c.png"]]
+
+    exact = dedup.input_digests(jobs)
+    pixels = dedup.input_digests(jobs, "pixels", workers=1)
+
+    assert len(set(exact.values())) == 3
+    assert pixels[str(tmp_path / "a.png")] == pixels[str(tmp_path / "b.png")] != pixels[str(tmp_path / "c.png")]
+
+
+def test_exact_digests_come_from_the_catalog(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+    jobs = [job(tmp_path / "a.png", "hoodie.psd", "a"), job(tmp_path / "b.png", "hoodie.psd", "b")]
+
+    with AssetCatalog(tmp_path / "catalog.sqlite") as catalog:
+        digests = dedup.input_digests(jobs, catalog=catalog)
+
+    assert digests == dedup.input_digests(jobs)
+    assert len(set(digests.values())) == 1
+
+
+def test_link_file_hard_links_or_copies(tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_bytes(b"jpg")
+
+    assert dedup.link_file(source, tmp_path / "linked.jpg")
+    assert os.path.samefile(source, tmp_path / "linked.jpg")
+    assert not dedup.link_file(source, tmp_path / "linked.jpg")
+
+    assert dedup.link_file(source, tmp_path / "copied.jpg", copy=True)
+    assert (tmp_path / "copied.jpg").read_bytes() == b"jpg"
+    assert not os.path.samefile(source, tmp_path / "copied.jpg")
+
+
+def test_materialize_outputs_reports_unrendered_sources(tmp_path):
+    (tmp_path / "a_hoodie.jpg").write_bytes(b"jpg")
+
+    linked, missing = dedup.materialize_outputs({"b_hoodie.jpg": "a_hoodie.jpg", "d_tee.jpg": "c_tee.jpg"}, tmp_path)
+
+    assert (linked, missing) == (["b_hoodie.jpg"], ["c_tee.jpg"])
+    assert os.path.samefile(tmp_path / "a_hoodie.jpg", tmp_path / "b_hoodie.jpg")
+
+
+def test_materialize_webps_links_outputs_and_records_manifest_entries(tmp_path):
+    output_dir, webp_dir = tmp_path / "output", tmp_path / "webp"
+    output_dir.mkdir()
+    webp_dir.mkdir()
+    for name in ["a_hoodie.jpg", "b_hoodie.jpg", "c_hoodie.jpg"]:
+        (output_dir / name).write_bytes(b"rendered" if name != "c_hoodie.jpg" else b"different")
+    (webp_dir / "a_hoodie.webp").write_bytes(b"webp")
+    (webp_dir / "a_hoodie-600w.webp").write_bytes(b"small")
+    source = output_dir / "a_hoodie.jpg"
+    manifest.save_manifest(webp_dir, {"a_hoodie.jpg": manifest.make_entry(
+        source, manifest.source_hash_for(None, source), webp_dir / "a_hoodie.webp", webp_dir, FINGERPRINT,
+        "Success", [webp_dir / "a_hoodie-600w.webp"],
+    )})
+
+    linked, missing = dedup.materialize_webps(
+        {"b_hoodie.jpg": "a_hoodie.jpg", "c_hoodie.jpg": "a_hoodie.jpg"}, output_dir, webp_dir
+    )
+
+    assert (linked, missing) == (1, ["a_hoodie.jpg"])
+    assert os.path.samefile(webp_dir / "a_hoodie-600w.webp", webp_dir / "b_hoodie-600w.webp")
+    entry = manifest.load_manifest(webp_dir)["b_hoodie.jpg"]
+    assert (entry["output"], entry["variants"]) == ("b_hoodie.webp", {"b_hoodie-600w.webp": 5})
+    target = output_dir / "b_hoodie.jpg"
+    assert manifest.is_up_to_date(entry, manifest.source_hash_for(entry, target), webp_dir / "b_hoodie.webp",
+                                  FINGERPRINT)
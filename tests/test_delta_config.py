@@ -0,0 +1,70 @@
+import csv
+import json
+
+import delta_config
+from plan_jobs import load_config
+
+OLD = {"100.png": ["105.psd", "106.psd"], "200.png": ["105.psd"]}
+NEW = {"100.png": ["105.psd", "107.psd"], "300.jpg": ["105.psd"]}
+
+
+def test_diff_mappings_splits_added_removed_and_unchanged():
+    added, removed, unchanged = delta_config.diff_mappings(OLD, NEW)
+
+    assert added == [("100.png", "107.psd"), ("300.jpg", "105.psd")]
+    assert removed == [("100.png", "106.psd"), ("200.png", "105.psd")]
+    assert unchanged == [("100.png", "105.psd")]
+
+
+def test_diff_ignores_input_extension_and_mockup_case():
+    added, removed, unchanged = delta_config.diff_mappings({"100.png": ["Hoodie.psd"]}, {"100.jpg": ["hoodie.PSD"]})
+
+    assert (added, removed) == ([], [])
+    assert unchanged == [("100.jpg", "hoodie.PSD")]
+
+
+def test_unchanged_combinations_without_output_are_missing(tmp_path):
+    (tmp_path / "100_105.jpg").write_bytes(b"jpg")
+
+    missing = delta_config.missing_outputs([("100.png", "105.psd"), ("100.png", "106.psd")], tmp_path)
+
+    assert missing == [("100.png", "106.psd")]
+    assert delta_config.removed_outputs([("100.png", "105.psd"), ("200.png", "105.psd")], tmp_path) == [
+        tmp_path / "100_105.jpg"
+    ]
+
+
+def test_images_csv_lists_webp_names_per_input(tmp_path):
+    path = tmp_path / "delta_images.csv"
+
+    delta_config.write_images_csv([("100.png", "105.psd"), ("100.png", "107.psd"), ("300.jpg", "105.psd")], path)
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["Images"], ["100_105.webp, 100_107.webp"], ["300_105.webp"]]
+
+
+def test_snapshot_is_pending_until_committed(tmp_path):
+    pending, snapshot = tmp_path / "snapshot.pending.json", tmp_path / "snapshot.json"
+
+    assert not delta_config.commit_snapshot(pending, snapshot)
+
+    delta_config.save_snapshot(NEW, "export.csv", pending)
+    assert not snapshot.exists()
+    assert json.loads(pending.read_text(encoding="utf-8"))["_source"] == "export.csv"
+
+    assert delta_config.commit_snapshot(pending, snapshot)
+    assert not pending.exists()
+    assert load_config(snapshot) == NEW
+    assert delta_config.load_mappings(snapshot) == NEW
+
+
+def test_load_mappings_reads_csv_exports(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(
+        "Name,Images\n"
+        "Bluza,\"https://example.com/uploads/100_105.webp, https://example.com/uploads/100_107.webp\"\n",
+        encoding="utf-8",
+    )
+
+    assert delta_config.load_mappings(path) == {"100.png": ["105.psd", "107.psd"]}
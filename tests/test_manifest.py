@@ -0,0 +1,92 @@
+import os
+
+import manifest
+
+FINGERPRINT = manifest.settings_fingerprint({"format": "webp", "target_size_kb": 125})
+
+
+def convert(input_dir, output_dir, name, content=b"jpeg bytes", variants=()):
+    """Writes a source and its outputs and returns the manifest entry the converter would record."""
+    source = input_dir / name
+    source.parent.mkdir(parents=True, exist_ok=True)
+    if not source.exists():
+        source.write_bytes(content)
+    output = (output_dir / name).with_suffix(".webp")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(b"webp")
+    variant_paths = []
+    for variant in variants:
+        variant_path = output.with_name(f"{output.stem}_{variant}.webp")
+        variant_path.write_bytes(b"small")
+        variant_paths.append(variant_path)
+    source_hash = manifest.source_hash_for(None, source)
+    return manifest.make_entry(source, source_hash, output, output_dir, FINGERPRINT, "Success", variant_paths)
+
+
+def test_unchanged_source_is_up_to_date(tmp_path):
+    entry = convert(tmp_path / "in", tmp_path / "out", "a.jpg", variants=["600w"])
+    source, output = tmp_path / "in" / "a.jpg", tmp_path / "out" / "a.webp"
+
+    source_hash = manifest.source_hash_for(entry, source)
+
+    assert manifest.is_up_to_date(entry, source_hash, output, FINGERPRINT)
+    assert not manifest.is_up_to_date(entry, source_hash, output, "other-settings")
+    assert not manifest.is_up_to_date(None, source_hash, output, FINGERPRINT)
+
+
+def test_touched_source_reuses_the_stored_hash_only_while_size_and_mtime_match(tmp_path, monkeypatch):
+    entry = convert(tmp_path / "in", tmp_path / "out", "a.jpg")
+    source = tmp_path / "in" / "a.jpg"
+    monkeypatch.setattr(manifest, "file_digest", lambda path: "rehashed")
+
+    assert manifest.source_hash_for(entry, source) == entry["source_hash"]
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert manifest.source_hash_for(entry, source) == "rehashed"
+
+
+def test_changed_content_or_missing_output_needs_a_new_encode(tmp_path):
+    entry = convert(tmp_path / "in", tmp_path / "out", "a.jpg", variants=["600w"])
+    source, output = tmp_path / "in" / "a.jpg", tmp_path / "out" / "a.webp"
+
+    source.write_bytes(b"edited jpeg bytes")
+    assert not manifest.is_up_to_date(entry, manifest.source_hash_for(entry, source), output, FINGERPRINT)
+
+    entry = convert(tmp_path / "in", tmp_path / "out", "a.jpg", variants=["600w"])
+    (tmp_path / "out" / "a_600w.webp").unlink()
+    assert not manifest.is_up_to_date(entry, manifest.source_hash_for(entry, source), output, FINGERPRINT)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    entries = {"sub/a.jpg": convert(tmp_path / "in", tmp_path / "out", "sub/a.jpg")}
+
+    manifest.save_manifest(tmp_path / "out", entries)
+
+    assert manifest.load_manifest(tmp_path / "out") == entries
+    assert manifest.load_manifest(tmp_path / "empty") == {}
+
+
+def test_prune_removes_outputs_of_deleted_sources(tmp_path):
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    entries = {
+        "a.jpg": convert(input_dir, output_dir, "a.jpg", variants=["600w"]),
+        "b.jpg": convert(input_dir, output_dir, "b.jpg", variants=["600w"]),
+    }
+    (input_dir / "b.jpg").unlink()
+
+    removed = manifest.prune_orphans(entries, input_dir, output_dir)
+
+    assert sorted(os.path.basename(path) for path in removed) == ["b.webp", "b_600w.webp"]
+    assert list(entries) == ["a.jpg"]
+    assert sorted(path.name for path in output_dir.iterdir()) == ["a.webp", "a_600w.webp"]
+
+
+def test_replaced_outputs_are_removed(tmp_path):
+    output_dir = tmp_path / "out"
+    old_entry = convert(tmp_path / "in", output_dir, "a.jpg", variants=["600w", "thumb"])
+    new_entry = dict(old_entry, variants={"a_600w.webp": 5})
+
+    removed = manifest.remove_replaced_outputs(old_entry, new_entry, output_dir)
+
+    assert [os.path.basename(path) for path in removed] == ["a_thumb.webp"]
+    assert (output_dir / "a_600w.webp").exists()
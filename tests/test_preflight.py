@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("psd_tools")
+
+import preflight  # noqa: E402
+from test_compile_templates import CONTENT_SIZE, SIZE, make_psd  # noqa: E402
+
+
+def test_inspect_template_reads_frame_from_psd(tmp_path):
+    make_psd(tmp_path / "hoodie_navy_front.psd")
+
+    info = preflight.inspect_template("hoodie_navy_front.psd", tmp_path, tmp_path / "templates")
+
+    assert info["errors"] == []
+    assert info["source"] == "psd"
+    assert info["size"] == list(SIZE)
+    assert info["frame"] == list(CONTENT_SIZE)
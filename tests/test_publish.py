@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import publish
+
+
+def write_outputs(output_dir, files):
+    for relative, content in files.items():
+        path = output_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+@pytest.fixture
+def local_target(tmp_path):
+    return publish.LocalTarget(tmp_path / "uploads")
+
+
+@pytest.fixture
+def s3_target(monkeypatch):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    for name, value in (("AWS_ACCESS_KEY_ID", "test"), ("AWS_SECRET_ACCESS_KEY", "test"),
+                        ("AWS_DEFAULT_REGION", "us-east-1")):
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        boto3.client("s3").create_bucket(Bucket="media")
+        yield publish.open_target("s3://media/my-images/art")
+
+
+@pytest.fixture(params=["local_target", "s3_target"])
+def target(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_upload_then_skip_unchanged(tmp_path, target):
+    output_dir = tmp_path / "output_webp"
+    write_outputs(output_dir, {"a.webp": b"aaaa", "sub/b.avif": b"bb", "log.txt": b"local only"})
+
+    first = publish.publish(output_dir, target, workers=2)
+    second = publish.publish(output_dir, target, workers=2)
+
+    assert first["uploaded"] == 2 and first["bytes"] == 6
+    assert target.list() == {"a.webp": 4, "sub/b.avif": 2}
+    assert second["uploaded"] == 0 and second["unchanged"] == 2
+
+
+def test_changed_file_is_uploaded_again(tmp_path, target):
+    output_dir = tmp_path / "output_webp"
+    write_outputs(output_dir, {"a.webp": b"aaaa", "b.webp": b"bb"})
+    publish.publish(output_dir, target, workers=2)
+
+    write_outputs(output_dir, {"a.webp": b"AAAAAA"})
+    stats = publish.publish(output_dir, target, workers=2)
+
+    assert stats["to_upload"] == ["a.webp"]
+    assert target.list()["a.webp"] == 6
+
+
+def test_delete_prunes_files_without_a_local_output(tmp_path, target):
+    output_dir = tmp_path / "output_webp"
+    write_outputs(output_dir, {"a.webp": b"aaaa", "b.webp": b"bb"})
+    publish.publish(output_dir, target, workers=2)
+    (output_dir / "b.webp").unlink()
+
+    kept = publish.publish(output_dir, target, workers=2)
+    assert kept["deleted"] == 0 and "b.webp" in target.list()
+
+    pruned = publish.publish(output_dir, target, workers=2, delete=True)
+    assert pruned["deleted"] == 1
+    assert target.list() == {"a.webp": 4}
+    assert sorted(publish.load_manifest(target)) == ["a.webp"]
+
+
+def test_remote_manifest_lists_published_files(tmp_path, target):
+    output_dir = tmp_path / "output_webp"
+    write_outputs(output_dir, {"a.webp": b"aaaa"})
+    publish.publish(output_dir, target, workers=2)
+
+    manifest = json.loads(target.read_manifest())["files"]
+
+    assert manifest == {"a.webp": {"size": 4, "sha256": publish.file_digest(output_dir / "a.webp")}}
+    # The manifest itself is not a published image
+    assert ".publish_manifest.json" not in target.list()
+
+
+def test_verify_resends_files_missing_on_the_target(tmp_path, target):
+    output_dir = tmp_path / "output_webp"
+    write_outputs(output_dir, {"a.webp": b"aaaa", "b.webp": b"bb"})
+    publish.publish(output_dir, target, workers=2)
+    target.delete("b.webp")
+
+    trusting = publish.publish(output_dir, target, workers=2, dry_run=True)
+    verified = publish.publish(output_dir, target, workers=2, verify=True)
+
+    assert trusting["to_upload"] == []
+    assert verified["to_upload"] == ["b.webp"]
+    assert "b.webp" in target.list()
+
+
+def test_s3_calls_are_retried_by_one_layer_only(s3_target):
+    assert s3_target.client.meta.config.retries["total_max_attempts"] == 1
+
+
+def test_with_retries_gives_up_after_the_last_attempt(monkeypatch):
+    monkeypatch.setattr(publish.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise OSError("unreachable")
+
+    with pytest.raises(OSError):
+        publish.with_retries(failing)
+    assert len(calls) == publish.RETRIES
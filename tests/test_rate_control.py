@@ -0,0 +1,93 @@
+import pytest
+
+import rate_control
+from rate_control import build_quality_ladder, encode_to_target, search_ladder
+
+LADDER = build_quality_ladder(14)
+
+
+class FakeImage:
+    """Just enough of a Wand image for rate control: size, clone and resize."""
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+
+    def clone(self):
+        return FakeImage(self.width, self.height)
+
+    def resize(self, width, height, filter=None):
+        self.width, self.height = width, height
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeEncoder:
+    """Output size grows with quality and pixel count; lossless is 3x quality 95."""
+
+    name = "fake"
+    supports_lossless = True
+
+    def encode(self, img, quality=None, lossless=False):
+        bytes_per_pixel = 0.3 if lossless else quality / 1000
+        return b"x" * int(img.width * img.height * bytes_per_pixel)
+
+
+def linear_search(fits, size):
+    found = -1
+    for index in range(size):
+        if fits(index):
+            found = index
+    return found
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 14])
+def test_search_ladder_matches_the_linear_search(size):
+    for boundary in range(-1, size):
+        fits = lambda index: index <= boundary  # noqa: E731
+        for start in range(-1, size + 1):
+            assert search_ladder(fits, size, start) == linear_search(fits, size) == boundary
+
+
+def test_search_ladder_returns_minus_one_when_nothing_fits():
+    probes = []
+
+    def fits(index):
+        probes.append(index)
+        return False
+
+    assert search_ladder(fits, len(LADDER), len(LADDER) // 2) == -1
+    assert len(probes) < len(LADDER)
+
+
+@pytest.mark.parametrize("width, height", [(400, 300), (2000, 1500)])
+@pytest.mark.parametrize("target_kb", [20, 40, 60, 125, 400, 2000])
+def test_bisect_chooses_what_the_linear_ladder_chooses(width, height, target_kb):
+    img = FakeImage(width, height)
+    target_bytes = target_kb * 1024
+
+    ladder = encode_to_target(img, target_bytes, LADDER, "ladder", encoder=FakeEncoder())
+    bisect = encode_to_target(img, target_bytes, LADDER, "bisect", encoder=FakeEncoder())
+
+    assert (bisect.quality, bisect.lossless, bisect.fits) == (ladder.quality, ladder.lossless, ladder.fits)
+    assert bisect.blob == ladder.blob
+    assert bisect.encodes <= ladder.encodes
+
+
+@pytest.mark.parametrize("mode", rate_control.SEARCH_MODES)
+def test_nothing_fits_returns_the_smallest_encode(mode):
+    img = FakeImage(2000, 1500)
+
+    result = encode_to_target(img, 1024, LADDER, mode, encoder=FakeEncoder())
+
+    assert not result.fits and not result.lossless
+    assert result.quality == min(LADDER)
+    assert len(result.blob) == len(FakeEncoder().encode(img, quality=min(LADDER)))
+
+
+def test_unknown_search_mode_is_rejected():
+    with pytest.raises(ValueError):
+        encode_to_target(FakeImage(10, 10), 1024, LADDER, "greedy", encoder=FakeEncoder())
@@ -0,0 +1,155 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import render_mockups
+from run_journal import load_journal
+
+SIZE = (40, 30)
+RECT = [10, 5, 20, 16]
+
+
+def make_template(templates_dir, mockup_file="mockup.psd"):
+    """Ręcznie wyrenderowany szablon: szara baza i prostokątne miejsce na grafikę"""
+    template_dir = templates_dir / mockup_file.rsplit(".", 1)[0]
+    template_dir.mkdir(parents=True)
+    Image.new("RGB", SIZE, (128, 128, 128)).save(template_dir / "base.png")
+    with open(template_dir / "template.json", "w", encoding="utf-8") as f:
+        json.dump({"frame": RECT[2:], "rect": RECT}, f)
+    return mockup_file
+
+
+def test_render_batch_journals_each_combination(tmp_path):
+    mockup_file = make_template(tmp_path / "templates")
+    art_path = tmp_path / "art.png"
+    Image.new("RGBA", (10, 8), (255, 0, 0, 255)).save(art_path)
+    batch = [
+        (art_path, mockup_file, tmp_path / "out" / "1_mockup.jpg"),
+        (tmp_path / "missing.png", mockup_file, tmp_path / "out" / "2_mockup.jpg"),
+    ]
+    journal_file = tmp_path / "out" / "render_journal.jsonl"
+
+    results, _ = render_mockups.render_batch(
+        batch, tmp_path / "templates", tmp_path / "mockup", render_mockups.SMART_OBJECT_SETTINGS,
+        journal_file=journal_file,
+    )
+
+    assert results[0][2] == "OK"
+    journal = load_journal(journal_file)
+    assert journal["1_mockup.jpg"]["event"] == "done"
+    assert journal["2_mockup.jpg"]["event"] == "error"
+    assert journal["2_mockup.jpg"]["mockup"] == mockup_file
+
+
+def solid_art(width, height, value=1.0):
+    """Nieprzezroczysta grafika float32 RGBA (premultiplied) w jednym kolorze"""
+    art = np.full((height, width, 4), value, dtype=np.float32)
+    art[..., 3] = 1.0
+    return art
+
+
+def test_homography_maps_the_corners():
+    src = np.asarray([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float64)
+    dst = np.asarray([[5, 5], [25, 3], [22, 18], [4, 15]], dtype=np.float64)
+
+    matrix = render_mockups.homography(src, dst)
+
+    for (x, y), expected in zip(src, dst):
+        u, v, w = matrix @ [x, y, 1.0]
+        assert np.allclose([u / w, v / w], expected)
+
+
+def test_axis_aligned_frame_is_a_plain_offset():
+    art = solid_art(20, 16)
+
+    layer, offset = render_mockups.warp_into_quad(art, render_mockups._quad_from_spec({"rect": RECT}), SIZE)
+
+    assert offset == (10, 5)
+    assert layer is art or np.shares_memory(layer, art)
+
+
+def test_scaled_rect_keeps_the_art_orientation():
+    # Ćwiartki 2x2: czerwona (LG), zielona (PG), niebieska (LD); brzegi są rozmyte, więc sprawdzane są środki
+    art = np.zeros((4, 4, 4), dtype=np.float32)
+    art[..., 3] = 1.0
+    art[:2, :2, 0] = art[:2, 2:, 1] = art[2:, :2, 2] = 1.0
+    quad = render_mockups._quad_from_spec({"rect": [0, 0, 8, 8]})
+
+    layer, offset = render_mockups.warp_into_quad(art, quad, (8, 8))
+
+    assert offset == (0, 0) and layer.shape == (8, 8, 4)
+    assert np.allclose(layer[2, 2], [1, 0, 0, 1])
+    assert np.allclose(layer[2, 5], [0, 1, 0, 1])
+    assert np.allclose(layer[5, 2], [0, 0, 1, 1])
+
+
+def test_perspective_quad_covers_only_its_inside():
+    quad = np.asarray([[5, 5], [25, 5], [20, 15], [10, 15]], dtype=np.float64)
+
+    layer, (x0, y0) = render_mockups.warp_into_quad(solid_art(10, 10), quad, (30, 20))
+
+    assert (x0, y0) == (5, 5) and layer.shape == (10, 20, 4)
+    assert np.allclose(layer[5, 10], [1, 1, 1, 1])
+    assert np.allclose(layer[9, 0], 0)
+    assert np.allclose(layer[9, 19], 0)
+
+
+def test_quad_outside_the_canvas_gives_an_empty_layer():
+    quad = render_mockups._quad_from_spec({"rect": [50, 50, 10, 10]})
+
+    layer, _ = render_mockups.warp_into_quad(solid_art(10, 10), quad, SIZE)
+
+    assert layer.size == 0
+
+
+def template(mask=None, overlays=()):
+    base = np.full((SIZE[1], SIZE[0], 3), 128, dtype=np.uint8)
+    return {"size": SIZE, "frame": tuple(RECT[2:]), "quad": render_mockups._quad_from_spec({"rect": RECT}),
+            "base": base, "mask": mask, "overlays": list(overlays)}
+
+
+def test_composite_places_the_art_inside_the_frame_only():
+    canvas = render_mockups.composite(template(), solid_art(20, 16, 1.0))
+
+    x, y, w, h = RECT
+    assert np.allclose(canvas[y:y + h, x:x + w], 1.0)
+    assert np.allclose(canvas[0, 0], 128 / 255)
+    assert np.allclose(canvas[y + h, x], 128 / 255)
+
+
+@pytest.mark.parametrize("coverage, expected", [(0, 128 / 255), (255, 1.0)])
+def test_composite_mask_limits_the_art(coverage, expected):
+    mask = np.full((SIZE[1], SIZE[0]), coverage, dtype=np.uint8)
+
+    canvas = render_mockups.composite(template(mask), solid_art(20, 16, 1.0))
+
+    assert np.allclose(canvas[RECT[1], RECT[0]], expected)
+
+
+@pytest.mark.parametrize("mode, expected", [("normal", 0.5), ("multiply", 0.25), ("screen", 0.75)])
+def test_overlay_blend_modes(mode, expected):
+    overlay = np.zeros((SIZE[1], SIZE[0], 4), dtype=np.uint8)
+    overlay[..., :3] = 255 // 2
+    overlay[..., 3] = 255
+    base = template(overlays=[(overlay, mode, 1.0)])
+    base["base"][:] = 255 // 2
+
+    transparent = solid_art(20, 16, 0.0)
+    transparent[..., 3] = 0.0
+    canvas = render_mockups.composite(base, transparent)
+
+    assert np.allclose(canvas[0, 0], expected, atol=0.01)
+
+
+@pytest.mark.parametrize("resize, size", [("fill", (40, 40)), ("fit", (20, 20)), (False, (10, 10))])
+def test_fit_art_to_frame_scales_like_the_jsx_engine(resize, size):
+    art = Image.new("RGBA", (10, 10), (255, 0, 0, 255))
+
+    fitted = render_mockups.fit_art_to_frame(art, (40, 20), "left top", resize)
+
+    assert fitted.size == (40, 20)
+    bbox = fitted.getchannel("A").getbbox()
+    assert (bbox[2] - bbox[0], bbox[3] - bbox[1]) == (min(size[0], 40), min(size[1], 20))
+    assert bbox[:2] == (0, 0)
@@ -0,0 +1,79 @@
+import csv
+import json
+
+import pytest
+
+from run_report import CSV_FIELDS, RunReport, make_record, percentile, summarize
+
+
+def output(path, fmt="webp", size=100, quality=80, lossless=False, fits=True):
+    return {"path": path, "variant": "full", "width": 800, "format": fmt, "bytes": size,
+            "quality": quality, "lossless": lossless, "fits": fits, "target_kb": 125}
+
+
+def records():
+    return [
+        make_record("a.jpg", "Success", 1000, [output("a.webp", size=200), output("a.avif", "avif", 150)],
+                    encodes=4, encode_seconds=1.0, peak_rss_bytes=300),
+        make_record("b.jpg", "Warning: oversize", 500, [output("b.webp", size=400, lossless=True, fits=False)],
+                    encodes=9, encode_seconds=3.0, peak_rss_bytes=500),
+        make_record("c.jpg", "Skipped (up to date)", 700),
+        make_record("d.jpg", "Error: corrupt", 900),
+    ]
+
+
+@pytest.mark.parametrize("pct, expected", [(1, 1), (50, 5), (90, 9), (99, 10), (100, 10)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile(list(range(10, 0, -1)), pct) == expected
+
+
+def test_percentile_of_nothing_is_zero():
+    assert percentile([], 50) == 0
+
+
+def test_summary_counts_only_converted_files_towards_savings():
+    summary = summarize(records(), wall_seconds=2.5)
+
+    assert (summary["files"], summary["converted"], summary["skipped"], summary["errors"]) == (4, 2, 1, 1)
+    assert summary["oversize"] == 1
+    assert (summary["bytes_in"], summary["bytes_out"], summary["bytes_saved"]) == (1500, 750, 750)
+    assert summary["savings_percent"] == 50.0
+    assert summary["encodes"] == 13
+    assert summary["formats"] == {"webp": 2, "avif": 1}
+    assert (summary["encode_seconds_p50"], summary["encode_seconds_p99"]) == (1.0, 3.0)
+    assert (summary["peak_rss_bytes_p50"], summary["peak_rss_bytes_max"]) == (300, 500)
+
+
+def test_jsonl_report_has_one_line_per_file_then_the_summary(tmp_path):
+    report = RunReport(tmp_path / "report.jsonl")
+    for record in records():
+        report.add(record)
+    report.close()
+
+    lines = [json.loads(line) for line in (tmp_path / "report.jsonl").read_text(encoding="utf-8").splitlines()]
+
+    assert [line["type"] for line in lines] == ["file"] * 4 + ["summary"]
+    assert lines[0]["outputs"][1]["path"] == "a.avif"
+    assert lines[-1]["converted"] == 2
+
+
+def test_csv_report_flattens_outputs_and_writes_the_summary_alongside(tmp_path):
+    report = RunReport(tmp_path / "report.csv")
+    for record in records():
+        report.add(record)
+    summary = report.close()
+
+    with open(tmp_path / "report.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert list(rows[0]) == CSV_FIELDS
+    assert [row["source"] for row in rows] == ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+    assert (rows[0]["outputs"], rows[0]["formats"], rows[0]["qualities"]) == ("a.webp;a.avif", "webp;avif", "80;80")
+    assert rows[1]["qualities"] == "lossless"
+    assert rows[2]["outputs"] == ""
+    assert json.loads((tmp_path / "report.summary.json").read_text(encoding="utf-8")) == summary
+
+
+def test_unknown_report_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RunReport(tmp_path / "report.txt", fmt="xml")
@@ -0,0 +1,141 @@
+from concurrent.futures import Future
+
+import pytest
+
+import scheduler
+from scheduler import LOOKAHEAD, MemoryScheduler, estimate_peak_bytes
+
+MEGAPIXEL = 1_000_000
+
+
+@pytest.fixture
+def pixels(monkeypatch):
+    """Header sizes by path (default 1 MP); records every header read."""
+    sizes = {}
+    pinged = []
+
+    def fake_image_pixels(path, max_width=None, max_height=None):
+        pinged.append(path)
+        return sizes.get(path, MEGAPIXEL)
+
+    monkeypatch.setattr(scheduler, "image_pixels", fake_image_pixels)
+    return sizes, pinged
+
+
+class FakePool:
+    """Collects submitted paths; the test finishes their futures by hand."""
+
+    def __init__(self):
+        self.futures = {}
+
+    def submit(self, path):
+        future = Future()
+        self.futures[path] = future
+        return future
+
+    def finish(self, path):
+        self.futures[path].set_result(path)
+
+
+def cost(megapixels=1, formats=1, variants=False):
+    return estimate_peak_bytes(megapixels * MEGAPIXEL, formats, variants)
+
+
+def test_only_files_that_fit_the_budget_run_together(pixels):
+    pool = FakePool()
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost() * 2, max_in_flight=8)
+    for path in "abcd":
+        queue.add(path)
+
+    assert queue.wait(timeout=0) == []
+    assert list(pool.futures) == ["a", "b"]
+    assert queue.committed == cost() * 2
+
+    pool.finish("a")
+    assert [future.result() for future in queue.wait(timeout=0)] == ["a"]
+    assert list(pool.futures) == ["a", "b", "c"]
+    assert queue.peak_committed == cost() * 2
+
+
+def test_small_files_skip_ahead_of_one_that_does_not_fit_yet(pixels):
+    sizes, _ = pixels
+    sizes["big"] = 3 * MEGAPIXEL
+    pool = FakePool()
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost() * 2, max_in_flight=8)
+    for path in ["a", "big", "c"]:
+        queue.add(path)
+
+    queue.wait(timeout=0)
+    assert list(pool.futures) == ["a", "c"]
+
+    pool.finish("a")
+    pool.finish("c")
+    queue.wait(timeout=0)
+    assert list(pool.futures) == ["a", "c", "big"]
+
+
+def test_file_larger_than_the_budget_runs_alone(pixels):
+    sizes, _ = pixels
+    sizes["huge"] = 50 * MEGAPIXEL
+    pool = FakePool()
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost(2), max_in_flight=8)
+    queue.add("huge")
+    queue.add("a")
+
+    queue.wait(timeout=0)
+    assert list(pool.futures) == ["a"]
+
+    pool.finish("a")
+    queue.wait(timeout=0)
+    queue.add("b")
+    queue.wait(timeout=0)
+    assert list(pool.futures) == ["a", "huge"]
+
+    pool.finish("huge")
+    queue.wait(timeout=0)
+    assert list(pool.futures) == ["a", "huge", "b"]
+
+
+def test_in_flight_cap_and_priorities(pixels):
+    pool = FakePool()
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost(100), max_in_flight=2)
+    queue.add("bulk-1", priority=20)
+    queue.add("bulk-2", priority=20)
+    queue.add("urgent", priority=0)
+    queue.add("normal", priority=10)
+
+    queue.wait(timeout=0)
+
+    assert list(pool.futures) == ["urgent", "normal"]
+    assert len(queue) == 4
+
+
+def test_headers_are_read_only_near_the_head_of_the_queue(pixels):
+    _, pinged = pixels
+    pool = FakePool()
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost(100), max_in_flight=2)
+    for index in range(10 * LOOKAHEAD):
+        queue.add(f"{index}.jpg")
+
+    assert pinged == []
+    queue.wait(timeout=0)
+    assert len(pinged) <= LOOKAHEAD
+    assert sorted(set(pinged)) == sorted(pinged)
+
+
+def test_per_file_settings_override_the_defaults(pixels):
+    pool = FakePool()
+    limits = []
+
+    def size_limits(path):
+        limits.append(path)
+        return (600, None)
+
+    queue = MemoryScheduler(pool.submit, budget_bytes=cost(100), max_in_flight=8, size_limits=size_limits)
+    queue.add("default.jpg")
+    queue.add("avif.jpg", formats=2, variants=True, limits=(1200, None))
+
+    queue.wait(timeout=0)
+
+    assert list(queue.running.values()) == [cost(), cost(formats=2, variants=True)]
+    assert limits == ["default.jpg"]
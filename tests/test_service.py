@@ -0,0 +1,129 @@
+import time
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("wand.image", exc_type=ImportError)
+import manifest  # noqa: E402
+import service  # noqa: E402
+
+ENCODE_SECONDS = 0.3
+
+
+def _fake_process_image(path, input_dir, output_dir, search, entry, force, variants, formats, profile):
+    # Stands in for converter.process_image in the pool; returns the same tuple shape
+    time.sleep(ENCODE_SECONDS)
+    return path, "Converted", 10, 1, 0, {"output": path.rsplit("/", 1)[-1] + ".webp"}, None
+
+
+@pytest.fixture
+def conversion_service(monkeypatch):
+    monkeypatch.setattr(service, "process_image", _fake_process_image)
+    conversion_service = service.ConversionService(workers=1)
+    yield conversion_service
+    conversion_service.close()
+
+
+def make_inputs(input_dir, names):
+    input_dir.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        Image.new("RGB", (8, 8)).save(input_dir / name)
+    return names
+
+
+def wait_finished(*jobs, timeout=15):
+    deadline = time.time() + timeout
+    while not all(job.finished_at for job in jobs):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.05)
+
+
+def test_urgent_job_overtakes_queued_bulk_files(conversion_service, tmp_path):
+    make_inputs(tmp_path / "bulk", [f"b{i}.jpg" for i in range(4)])
+    make_inputs(tmp_path / "urgent", ["u0.jpg", "u1.jpg"])
+    order = []
+    collect = conversion_service._collect
+
+    def recording_collect(future):
+        order.append(conversion_service.running[future][0].priority)
+        collect(future)
+
+    conversion_service._collect = recording_collect
+    bulk = conversion_service.submit_job(
+        {"input_dir": str(tmp_path / "bulk"), "output_dir": str(tmp_path / "out"), "priority": "bulk"})
+    urgent = conversion_service.submit_job(
+        {"input_dir": str(tmp_path / "urgent"), "output_dir": str(tmp_path / "out"), "priority": "urgent"})
+    wait_finished(bulk, urgent)
+
+    # Only the bulk file already being encoded finishes before the urgent job
+    urgent_priority, bulk_priority = service.PRIORITIES["urgent"], service.PRIORITIES["bulk"]
+    assert order == [bulk_priority] + [urgent_priority] * 2 + [bulk_priority] * 3
+    assert bulk.counts["converted"] == 4 and urgent.counts["converted"] == 2
+
+
+def test_cancel_skips_files_not_started(conversion_service, tmp_path):
+    make_inputs(tmp_path / "in", [f"{i}.jpg" for i in range(5)])
+    job = conversion_service.submit_job({"input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out")})
+    conversion_service.cancel(job.id)
+    wait_finished(job)
+
+    assert job.status == "cancelled"
+    assert job.done == 5
+    assert job.counts["cancelled"] >= 4
+
+
+def test_stream_yields_every_result_then_stops(conversion_service, tmp_path):
+    names = make_inputs(tmp_path / "in", ["a.jpg", "b.jpg"])
+    job = conversion_service.submit_job({"input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out")})
+
+    streamed = list(conversion_service.stream(job.id))
+
+    assert sorted(result["source"].rsplit("/", 1)[-1] for result in streamed) == names
+    assert job.status == "done"
+
+
+def test_finished_job_merges_into_the_manifest_on_disk(conversion_service, tmp_path):
+    make_inputs(tmp_path / "in", ["a.jpg", "b.jpg"])
+    output_dir = tmp_path / "out"
+    job = conversion_service.submit_job({"input_dir": str(tmp_path / "in"), "output_dir": str(output_dir)})
+    # Written while the job runs, e.g. by converter.py or another job
+    manifest.save_manifest(output_dir, {"other.jpg": {"output": "other.webp"}})
+    wait_finished(job)
+
+    assert sorted(manifest.load_manifest(output_dir)) == ["a.jpg", "b.jpg", "other.jpg"]
+
+
+def test_scheduler_estimates_use_the_job_settings(conversion_service, tmp_path):
+    make_inputs(tmp_path / "in", ["a.jpg"])
+    added = []
+    add = conversion_service.scheduler.add
+
+    def recording_add(path, priority, payload, formats, variants, limits):
+        added.append((formats, variants, limits))
+        add(path, priority, payload, formats, variants, limits)
+
+    conversion_service.scheduler.add = recording_add
+    job = conversion_service.submit_job({
+        "input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out"), "variants": "640:60",
+    })
+    wait_finished(job)
+
+    assert added == [(len(job.formats), True, (640, None))]
+
+
+@pytest.mark.parametrize("request_fields, message", [
+    ({"priority": True}, "boolean"),
+    ({"priority": "asap"}, "Unknown priority"),
+    ({"csv": "missing.csv"}, "Cannot read CSV"),
+    ({"csv": "products.csv", "column": "Photos"}, "Cannot read CSV"),
+])
+def test_invalid_requests_are_rejected(conversion_service, tmp_path, request_fields, message):
+    make_inputs(tmp_path / "in", ["a.jpg"])
+    (tmp_path / "products.csv").write_text("Name,Images\nHoodie,https://example.com/a.webp\n", encoding="utf-8")
+    if "csv" in request_fields:
+        request_fields = dict(request_fields, csv=str(tmp_path / request_fields["csv"]))
+
+    with pytest.raises(ValueError, match=message):
+        conversion_service.submit_job({"input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out"),
+                                       **request_fields})
+    assert conversion_service.jobs == {}
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+import variants
+from variants import Variant, encode_cascade, parse_variants, variant_path
+
+TARGET_KB = 125
+
+
+class FakeImage:
+    """Records the resize chain: every clone remembers the width it was made from."""
+
+    def __init__(self, width, height, parent_width=None):
+        self.width, self.height = width, height
+        self.parent_width = parent_width
+        self.closed = False
+        self.clones = []
+
+    def clone(self):
+        clone = FakeImage(self.width, self.height, self.width)
+        self.clones.append(clone)
+        return clone
+
+    def resize(self, width, height, filter=None):
+        self.width, self.height = width, height
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Replaces the rate-controlled encode; returns the images it was given."""
+    images = []
+
+    def fake_encode_smallest(img, target_bytes, ladder, encoders, mode, allow_lossless):
+        images.append((img.width, img.parent_width, target_bytes // 1024))
+        return encoders[0], None
+
+    monkeypatch.setattr(variants, "encode_smallest", fake_encode_smallest)
+    return images
+
+
+def cascade(source_width, spec):
+    img = FakeImage(source_width, source_width // 2)
+    return [(variant.name, variant.width) for variant, _, _ in
+            encode_cascade(img, parse_variants(spec, TARGET_KB), ladder=[])], img
+
+
+def test_parse_variants_sorts_widest_first_with_budgets():
+    parsed = parse_variants("thumb, 600, full, 2048:300", TARGET_KB)
+
+    assert parsed == [
+        Variant("full", None, TARGET_KB),
+        Variant("2048w", 2048, 300),
+        Variant("600w", 600, variants.budget_for_width(600, TARGET_KB)),
+        Variant("thumb", 320, 20),
+    ]
+    assert parsed[2].target_kb < TARGET_KB
+
+
+@pytest.mark.parametrize("spec", ["", "huge", "600,600", "600:0", "600:big"])
+def test_parse_variants_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_variants(spec, TARGET_KB)
+
+
+def test_variant_paths():
+    output = Path("out/1_hoodie.webp")
+
+    assert variant_path(output, Variant("full", 3000, TARGET_KB)) == output
+    assert variant_path(output, Variant("600w", 600, 40)) == Path("out/1_hoodie-600w.webp")
+    assert variant_path(output, Variant("thumb", 320, 20)) == Path("out/1_hoodie-thumb.webp")
+
+
+def test_each_variant_is_downscaled_from_the_previous_one(encoded):
+    outputs, img = cascade(3000, "full,2048,600,thumb")
+
+    assert outputs == [("full", 3000), ("2048w", 2048), ("600w", 600), ("thumb", 320)]
+    assert [(width, parent) for width, parent, _ in encoded] == [(3000, None), (2048, 3000), (600, 2048), (320, 600)]
+    # Intermediate images are closed, the caller's image is not
+    assert img.clones[0].closed and not img.closed
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("2048,1200", [("1500w", 1500), ("1200w", 1200)]),
+    ("3000,2048,600", [("1500w", 1500), ("600w", 600)]),
+    ("full,2048,600", [("full", 1500), ("600w", 600)]),
+    ("1500,600", [("1500w", 1500), ("600w", 600)]),
+])
+def test_oversized_profiles_are_named_after_the_source_width(encoded, spec, expected):
+    outputs, _ = cascade(1500, spec)
+
+    assert outputs == expected
+    # No upscaling: the source-width output is encoded from the source itself
+    assert encoded[0][:2] == (1500, None)
+
+
+def test_renamed_profile_keeps_its_budget(encoded):
+    cascade(1500, "2048:300")
+
+    assert encoded == [(1500, None, 300)]
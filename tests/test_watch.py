@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+from watch import watch_for_images
+
+SETTLE = 5.0
+
+
+def write(path, content=b"jpeg", age=60.0):
+    path.write_bytes(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    return watch_for_images(tmp_path, poll_interval=0, settle_seconds=SETTLE)
+
+
+def test_image_is_yielded_once_after_two_identical_polls(tmp_path, watcher):
+    path = write(tmp_path / "1_hoodie.jpg")
+
+    assert next(watcher) == []
+    assert next(watcher) == [path]
+    assert next(watcher) == []
+
+
+def test_growing_or_fresh_images_wait(tmp_path, watcher):
+    growing = write(tmp_path / "growing.jpg", b"a")
+    fresh = write(tmp_path / "fresh.jpg", age=0)
+
+    next(watcher)
+    write(tmp_path / "growing.jpg", b"ab")
+    assert next(watcher) == []
+    assert next(watcher) == [growing]
+
+    assert fresh not in next(watcher)
+    write(tmp_path / "fresh.jpg", age=60)
+    next(watcher)
+    assert next(watcher) == [fresh]
+
+
+def test_temporary_names_and_hidden_files_are_ignored_until_renamed(tmp_path, watcher):
+    write(tmp_path / "1_hoodie.jpg.tmp")
+    write(tmp_path / ".partial.jpg")
+    next(watcher)
+    assert next(watcher) == []
+
+    os.rename(tmp_path / "1_hoodie.jpg.tmp", tmp_path / "1_hoodie.jpg")
+    next(watcher)
+    assert next(watcher) == [str(tmp_path / "1_hoodie.jpg")]
+
+
+def test_new_stop_file_ends_the_watch_after_pending_images(tmp_path):
+    write(tmp_path / "generation_report_old.txt")
+    watcher = watch_for_images(tmp_path, poll_interval=0, settle_seconds=SETTLE)
+    assert next(watcher) == []
+    assert next(watcher) == []
+
+    late = write(tmp_path / "late.jpg")
+    write(tmp_path / "abandoned.jpg", b"")
+    write(tmp_path / "generation_report_new.txt")
+
+    yielded = [path for ready in watcher for path in ready]
+
+    assert yielded == [late]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Konwerter logu spanów z Photoshopa do formatu Chrome Trace
+
+main_mockup_generator.jsx i main_artmockup_generator.jsx (z ustawionym
+spanLogPath) dopisują linie "B"/"E" z czasem w milisekundach wokół całego
+przebiegu i każdej kombinacji. Ten skrypt paruje je w spany "X" - ten sam
+format, który zapisuje --trace w narzędziach Pythona (tracing.py) - i może
+dołączyć do nich inne ślady, żeby cały potok (plan, Photoshop, konwersja
+WebP) był na jednej osi czasu:
+
+    python3 trace_convert.py output/render_spans.jsonl -o output/photoshop_trace.json
+    python3 trace_convert.py output/render_spans.jsonl -o pipeline.json --merge plan.json webp.json
+
+Kombinacja przerwana awarią Photoshopa (linia "B" bez "E") kończy się na
+ostatnim zapisanym czasie i dostaje status "unfinished".
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# Photoshop nie podaje PID skryptu; stały numer procesu na osi czasu
+JSX_PID = 1
+JSX_PROCESS_NAME = "Photoshop (JSX)"
+
+
+def load_span_log(log_path):
+    """Wczytuje linie logu spanów (pomija uszkodzone, np. uciętą ostatnią linię)"""
+    records = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("ph") in ("B", "E") and "ts" in record:
+                records.append(record)
+    return records
+
+
+def spans_from_log(records, pid=JSX_PID):
+    """Paruje linie B/E w zdarzenia Chrome Trace typu "X" (czas w mikrosekundach)"""
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": JSX_PROCESS_NAME}}]
+    open_spans = []
+    last_ts = 0
+    for record in records:
+        ts = int(record["ts"]) * 1000
+        last_ts = max(last_ts, ts)
+        args = {key: value for key, value in record.items() if key not in ("ph", "name", "cat", "ts")}
+        if record["ph"] == "B":
+            open_spans.append((record["name"], record.get("cat", "stage"), ts, args))
+            continue
+        # Linia "E" zamyka ostatni otwarty span o tej nazwie
+        for index in range(len(open_spans) - 1, -1, -1):
+            if open_spans[index][0] == record["name"]:
+                name, category, start, begin_args = open_spans.pop(index)
+                events.append({
+                    "name": name, "cat": category, "ph": "X", "ts": start, "dur": ts - start,
+                    "pid": pid, "tid": 1, "args": {**begin_args, **args},
+                })
+                break
+    for name, category, start, begin_args in open_spans:
+        events.append({
+            "name": name, "cat": category, "ph": "X", "ts": start, "dur": last_ts - start,
+            "pid": pid, "tid": 1, "args": {**begin_args, "status": "unfinished"},
+        })
+    return events
+
+
+def load_trace_events(trace_path):
+    """Zdarzenia z pliku Chrome Trace (obiekt z traceEvents albo sama lista)"""
+    with open(trace_path, "r", encoding="utf-8") as f:
+        trace = json.load(f)
+    return trace["traceEvents"] if isinstance(trace, dict) else trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zamienia log spanów z JSX na plik Chrome/Perfetto trace.")
+    parser.add_argument("span_log", help="Log spanów zapisany przez JSX (spanLogPath)")
+    parser.add_argument("-o", "--output", default=None, help="Plik wynikowy (domyślnie <log>.trace.json)")
+    parser.add_argument("--merge", nargs="*", default=[], help="Inne ślady (--trace z narzędzi Pythona) do dołączenia")
+    args = parser.parse_args()
+
+    log_path = Path(args.span_log)
+    if not log_path.exists():
+        print(f"❌ Nie znaleziono logu spanów: {log_path}")
+        return
+
+    events = spans_from_log(load_span_log(log_path))
+    spans = sum(1 for event in events if event["ph"] == "X")
+    unfinished = sum(1 for event in events if event.get("args", {}).get("status") == "unfinished")
+    for trace_path in args.merge:
+        events.extend(load_trace_events(trace_path))
+
+    output = Path(args.output) if args.output else log_path.with_suffix(".trace.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    print(f"✅ Zapisano ślad: {output}")
+    print(f"   🎨 Spanów z Photoshopa: {spans}" + (f" (niedokończonych: {unfinished})" if unfinished else ""))
+    if args.merge:
+        print(f"   🔗 Dołączone ślady: {', '.join(args.merge)}")
+    print("   💡 Otwórz w https://ui.perfetto.dev lub chrome://tracing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opcjonalne śledzenie etapów (spany) z eksportem do formatu Chrome Trace
+
+Włączane flagą --trace out.json w render_mockups.py, plan_jobs.py oraz
+w konwerterach WebP. Każdy etap (skan folderów, dekodowanie, próba
+bezstratna, pętla jakości, zapis...) jest zapisywany jako span z PID i
+wątkiem procesu, który go wykonał, więc pracę procesów roboczych i przestoje
+widać na jednej osi czasu w chrome://tracing lub https://ui.perfetto.dev.
+
+Procesy robocze zapisują swoje zdarzenia do plików <out.json>.<pid>.part
+(inicjalizator puli: init_worker), a proces główny scala je w finish().
+Znaczniki czasu to czas zegara systemowego w mikrosekundach, więc ślady
+z różnych narzędzi (także log spanów z JSX, patrz trace_convert.py) można
+połączyć w jedną oś czasu.
+
+Wyłączone śledzenie kosztuje jedno sprawdzenie warunku na span.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_NULL_SPAN = nullcontext()
+_state = {"path": None, "events": [], "depth": 0, "pid": None}
+# Konwerter koduje kilka formatów naraz w wątkach jednego procesu
+_lock = threading.Lock()
+
+
+def enabled():
+    return _state["path"] is not None
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+def _part_path(path, pid):
+    return Path(f"{path}.{pid}.part")
+
+
+def _start(path, process_name):
+    _state.update(path=str(path), events=[], depth=0, pid=os.getpid())
+    _state["events"].append({
+        "name": "process_name", "ph": "M", "pid": _state["pid"], "tid": 0,
+        "args": {"name": f"{process_name} ({_state['pid']})"},
+    })
+
+
+def enable(path, process_name="main"):
+    """Włącza śledzenie w procesie głównym; zdarzenia trafią do path"""
+    # Pliki częściowe po przerwanym przebiegu nie mogą trafić do nowego śladu
+    path = Path(path)
+    for part in path.parent.glob(f"{path.name}.*.part"):
+        part.unlink()
+    _start(path, process_name)
+
+
+def init_worker(path):
+    """Inicjalizator puli procesów: śledzenie w procesie roboczym (None = wyłączone)"""
+    if path:
+        _start(path, "worker")
+    else:
+        _state.update(path=None, events=[], depth=0, pid=None)
+
+
+def _flush():
+    """Dopisuje zebrane zdarzenia do pliku częściowego tego procesu"""
+    if not _state["events"]:
+        return
+    with open(_part_path(_state["path"], _state["pid"]), "a", encoding="utf-8") as f:
+        for event in _state["events"]:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _state["events"] = []
+
+
+@contextmanager
+def _span(name, category, args):
+    start = _now_us()
+    with _lock:
+        _state["depth"] += 1
+    try:
+        yield
+    finally:
+        event = {
+            "name": name, "cat": category, "ph": "X", "ts": start, "dur": _now_us() - start,
+            "pid": _state["pid"], "tid": threading.get_native_id(), "args": args,
+        }
+        with _lock:
+            _state["depth"] -= 1
+            _state["events"].append(event)
+            # Procesy robocze puli kończą się bez atexit, więc zapis po każdym spanie najwyższego poziomu
+            if _state["depth"] == 0:
+                _flush()
+
+
+def span(name, category="stage", **args):
+    """Kontekst mierzący etap; bez włączonego śledzenia nic nie robi"""
+    if _state["path"] is None:
+        return _NULL_SPAN
+    return _span(name, category, args)
+
+
+def finish():
+    """
+    Scala zdarzenia wszystkich procesów w jeden plik Chrome Trace i usuwa
+    pliki częściowe. Zwraca ścieżkę pliku albo None, gdy śledzenie jest wyłączone.
+    """
+    if _state["path"] is None:
+        return None
+    _flush()
+    path = Path(_state["path"])
+    events = []
+    for part in sorted(path.parent.glob(f"{path.name}.*.part")):
+        with open(part, "r", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+        part.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    _state["path"] = None
+    return path